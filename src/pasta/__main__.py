@@ -33,7 +33,6 @@ def main() -> None:
         sys.exit(1)
 
     # Initialize components
-    clipboard_manager = ClipboardManager()
     keyboard_engine = PastaKeyboardEngine()
 
     # Use default database location
@@ -50,6 +49,9 @@ def main() -> None:
 
     storage_manager = StorageManager(db_path)
 
+    # Older clipboard content beyond the memory budget is reloaded from storage
+    clipboard_manager = ClipboardManager(content_loader=storage_manager.get_content_by_hash)
+
     # Create settings manager
     settings_manager = SettingsManager()
     settings_manager.load()  # Load saved settings
@@ -1,105 +1,1260 @@
 """Clipboard monitoring and management module."""
 
+import contextlib
+import ctypes
+import ctypes.util
 import hashlib
+import io
+import os
+import re
+import select
+import sys
 import threading
 import time
-from collections.abc import Callable
-from datetime import datetime
-from typing import Any
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, overload
 
 import pyperclip
 
+from pasta.utils.security import RateLimiter
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ClipboardEntry(Mapping[str, Any]):
+    """A captured clipboard entry.
+
+    Entries are immutable and slotted, so they are cheap to keep in
+    history and safe to share between threads. The capture time is held
+    as integer microseconds since the epoch, and the ISO timestamp and
+    byte size are only computed when first asked for.
+
+    An entry is also a read-only mapping with the keys of the dicts it
+    replaces: ``content``, ``timestamp`` (the ISO string), ``hash`` and
+    ``content_type``, plus ``thumbnail`` for images. Code that indexes
+    entries keeps working, and they compare equal to the corresponding
+    dicts.
+
+    Attributes:
+        content: Clipboard text, the PNG data of an image, or None once
+            dropped from memory
+        content_hash: Hash of the content
+        content_type: Detected content type, interned
+        epoch_us: Capture time in microseconds since the epoch
+        thumbnail: Small PNG preview of an image, or None
+    """
+
+    content: str | bytes | None
+    content_hash: str
+    content_type: str
+    epoch_us: int
+    thumbnail: bytes | None = None
+    _timestamp: str | None = field(default=None, init=False, repr=False)
+    _size: int | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Intern the content type, of which there are only a few."""
+        object.__setattr__(self, "content_type", sys.intern(self.content_type))
+
+    @classmethod
+    def capture(cls, content: str, content_hash: str, content_type: str) -> "ClipboardEntry":
+        """Create an entry captured now.
+
+        Args:
+            content: Clipboard text
+            content_hash: Hash of the content
+            content_type: Detected content type
+
+        Returns:
+            New entry
+        """
+        return cls(content, content_hash, content_type, cls.now_us())
+
+    @staticmethod
+    def now_us() -> int:
+        """Get the current time as entries record it.
+
+        Returns:
+            Microseconds since the epoch
+        """
+        return time.time_ns() // 1000
+
+    @property
+    def captured_at(self) -> datetime:
+        """Get the capture time as a naive local datetime."""
+        seconds, micros = divmod(self.epoch_us, 1_000_000)
+        return datetime.fromtimestamp(seconds) + timedelta(microseconds=micros)
+
+    @property
+    def timestamp(self) -> str:
+        """Get the capture time in ISO format."""
+        timestamp = self._timestamp
+        if timestamp is None:
+            timestamp = self.captured_at.isoformat()
+            object.__setattr__(self, "_timestamp", timestamp)
+        return timestamp
+
+    @property
+    def size(self) -> int:
+        """Get the UTF-8 size of the content in bytes, 0 if it was dropped."""
+        size = self._size
+        if size is None:
+            content = self.content
+            size = len(content.encode() if isinstance(content, str) else content or b"")
+            object.__setattr__(self, "_size", size)
+        return size
+
+    def without_content(self) -> "ClipboardEntry":
+        """Get a copy that doesn't hold the content.
+
+        Returns:
+            Entry with the same metadata and no content
+        """
+        return replace(self, content=None)
+
+    def with_content(self, content: str | bytes) -> "ClipboardEntry":
+        """Get a copy holding content loaded back by hash.
+
+        Args:
+            content: Content of the entry
+
+        Returns:
+            Entry with the same metadata and the content
+        """
+        return replace(self, content=content)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the plain dict format.
+
+        Returns:
+            Dictionary with the mapping keys
+        """
+        return dict(self)
+
+    def __getitem__(self, key: str) -> Any:
+        """Get a field by its dict key."""
+        if key == "content" and self.content is not None:
+            return self.content
+        if key == "timestamp":
+            return self.timestamp
+        if key == "hash":
+            return self.content_hash
+        if key == "content_type":
+            return self.content_type
+        if key == "thumbnail" and self.thumbnail is not None:
+            return self.thumbnail
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the dict keys present."""
+        if self.content is not None:
+            yield "content"
+        yield from ("timestamp", "hash", "content_type")
+        if self.thumbnail is not None:
+            yield "thumbnail"
+
+    def __len__(self) -> int:
+        """Get the number of dict keys present."""
+        return 3 + (self.content is not None) + (self.thumbnail is not None)
+
+
+class ClipboardWatcher:
+    """Change notification backend for clipboard monitoring.
+
+    A watcher tells the monitor *when* the clipboard may have changed, so
+    the clipboard only has to be read after a change instead of on every
+    poll. This base class delivers no notifications, which leaves the
+    monitor polling.
+
+    Attributes:
+        name: Short name of the backend
+    """
+
+    name = "poll"
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        """Start delivering change notifications.
+
+        Args:
+            on_change: Called, possibly from another thread, after each change
+
+        Returns:
+            True if notifications will be delivered, False if the backend
+            isn't available here
+        """
+        _ = on_change
+        return False
+
+    def stop(self) -> None:
+        """Stop delivering change notifications."""
+
+    def is_alive(self) -> bool:
+        """Check that a started watcher is still delivering notifications.
+
+        Returns:
+            False once notifications have stopped for good, e.g. because
+            the connection to the window system was lost
+        """
+        return True
+
+
+class XFixesClipboardWatcher(ClipboardWatcher):
+    """Watches X11 selection ownership through the XFixes extension.
+
+    Every copy makes the copying application the owner of the CLIPBOARD
+    selection, which XFixes reports as an event. Events are read on a
+    private display connection by a thread that sleeps in ``select()``
+    until the X server or ``stop()`` wakes it.
+    """
+
+    name = "xfixes"
+
+    # XFixesSetSelectionOwnerNotifyMask, and XFixesSelectionNotify relative to the event base
+    SET_SELECTION_OWNER_NOTIFY_MASK = 1
+    SELECTION_NOTIFY = 0
+
+    def __init__(self, selection: bytes = b"CLIPBOARD") -> None:
+        """Initialize the watcher.
+
+        Args:
+            selection: Name of the X selection to watch
+        """
+        self.selection = selection
+        self._thread: threading.Thread | None = None
+        self._wake_fds: tuple[int, int] | None = None
+
+    @staticmethod
+    def _load_library(name: str) -> Any:
+        """Load a shared library by its short name.
+
+        Args:
+            name: Library name without prefix or suffix, e.g. "X11"
+
+        Returns:
+            Loaded library, or None if it can't be found
+        """
+        path = ctypes.util.find_library(name)
+        if path is None:
+            return None
+        try:
+            return ctypes.CDLL(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _declare(libx11: Any, libxfixes: Any) -> None:
+        """Declare the signatures of the Xlib and XFixes functions used.
+
+        Args:
+            libx11: Xlib library
+            libxfixes: XFixes library
+        """
+        display, window, atom = ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong
+        int_p = ctypes.POINTER(ctypes.c_int)
+        signatures = [
+            (libx11.XOpenDisplay, [ctypes.c_char_p], display),
+            (libx11.XCloseDisplay, [display], ctypes.c_int),
+            (libx11.XDefaultRootWindow, [display], window),
+            (libx11.XInternAtom, [display, ctypes.c_char_p, ctypes.c_int], atom),
+            (libx11.XFlush, [display], ctypes.c_int),
+            (libx11.XConnectionNumber, [display], ctypes.c_int),
+            (libx11.XPending, [display], ctypes.c_int),
+            (libx11.XNextEvent, [display, ctypes.c_void_p], ctypes.c_int),
+            (libxfixes.XFixesQueryExtension, [display, int_p, int_p], ctypes.c_int),
+            (libxfixes.XFixesSelectSelectionInput, [display, window, atom, ctypes.c_ulong], None),
+        ]
+        for function, argtypes, restype in signatures:
+            function.argtypes = argtypes
+            function.restype = restype
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        """Subscribe to selection owner changes and start the event thread.
+
+        Args:
+            on_change: Called from the event thread after each change
+
+        Returns:
+            True if XFixes events are being delivered
+        """
+        if self._thread is not None or not os.environ.get("DISPLAY"):
+            return self._thread is not None
+
+        libx11 = self._load_library("X11")
+        libxfixes = self._load_library("Xfixes")
+        if libx11 is None or libxfixes is None:
+            return False
+        self._declare(libx11, libxfixes)
+
+        display = libx11.XOpenDisplay(None)
+        if not display:
+            return False
+
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not libxfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            libx11.XCloseDisplay(display)
+            return False
+
+        root = libx11.XDefaultRootWindow(display)
+        selection = libx11.XInternAtom(display, self.selection, 0)
+        libxfixes.XFixesSelectSelectionInput(display, root, selection, self.SET_SELECTION_OWNER_NOTIFY_MASK)
+        libx11.XFlush(display)
+
+        # Writing to the pipe wakes the event thread so it can exit
+        self._wake_fds = os.pipe()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(libx11, display, event_base.value + self.SELECTION_NOTIFY, on_change, self._wake_fds[0]),
+            name="pasta-xfixes-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, libx11: Any, display: int, notify_type: int, on_change: Callable[[], None], wake_fd: int) -> None:
+        """Event thread: report selection notifications until woken by ``stop()``.
+
+        Args:
+            libx11: Xlib library
+            display: Display connection owned by this thread
+            notify_type: Event type of XFixesSelectionNotify
+            on_change: Change callback
+            wake_fd: Read end of the wake-up pipe
+        """
+        x_fd = libx11.XConnectionNumber(display)
+        # XEvent is a union padded to 24 longs; its first member is the int type
+        event = (ctypes.c_long * 24)()
+        try:
+            while True:
+                # Events already read from the socket don't make it readable again
+                while libx11.XPending(display):
+                    libx11.XNextEvent(display, event)
+                    if ctypes.c_int.from_buffer(event).value == notify_type:
+                        on_change()
+
+                readable, _, _ = select.select([x_fd, wake_fd], [], [])
+                if wake_fd in readable:
+                    return
+        except (OSError, ValueError):
+            # Connection to the X server lost
+            return
+        finally:
+            libx11.XCloseDisplay(display)
+            os.close(wake_fd)
+
+    def is_alive(self) -> bool:
+        """Check that the event thread is running.
+
+        Returns:
+            False once the thread has ended
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        """Stop the event thread and close its display connection."""
+        thread, self._thread = self._thread, None
+        fds, self._wake_fds = self._wake_fds, None
+        if thread is None or fds is None:
+            return
+
+        with contextlib.suppress(OSError):
+            os.write(fds[1], b"x")
+        thread.join(timeout=1.0)
+        os.close(fds[1])
+
+
+class QtClipboardWatcher(ClipboardWatcher):
+    """Watches the clipboard through ``QClipboard.dataChanged``.
+
+    Needs a running Qt GUI application, and must be started from its
+    thread. Notifications are delivered on that thread.
+    """
+
+    name = "qt"
+
+    def __init__(self) -> None:
+        """Initialize the watcher."""
+        self._clipboard: Any = None
+        self._on_change: Callable[[], None] | None = None
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        """Connect to the application clipboard's change signal.
+
+        Args:
+            on_change: Called on the GUI thread after each change
+
+        Returns:
+            True if a Qt GUI application is available
+        """
+        try:
+            from PySide6.QtGui import QGuiApplication
+        except ImportError:
+            return False
+
+        if not isinstance(QGuiApplication.instance(), QGuiApplication):
+            return False
+
+        self.stop()
+        self._clipboard = QGuiApplication.clipboard()
+        self._on_change = on_change
+        self._clipboard.dataChanged.connect(on_change)
+        return True
+
+    def stop(self) -> None:
+        """Disconnect from the clipboard."""
+        if self._clipboard is not None and self._on_change is not None:
+            with contextlib.suppress(RuntimeError, TypeError):
+                self._clipboard.dataChanged.disconnect(self._on_change)
+        self._clipboard = None
+        self._on_change = None
+
+
+class ChangeCountWatcher(ClipboardWatcher):
+    """Watches the platform's clipboard change counter.
+
+    macOS and Windows count clipboard changes, and reading the counter is
+    a cheap system call. Polling it finds changes quickly without reading
+    or hashing the clipboard contents.
+    """
+
+    name = "change-count"
+
+    def __init__(self, counter: Callable[[], int] | None = None, interval: float = 0.25) -> None:
+        """Initialize the watcher.
+
+        Args:
+            counter: Returns the current change count, or None for the
+                platform's counter
+            interval: Seconds between counter reads
+        """
+        self.counter = counter
+        self.interval = interval
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def platform_counter() -> Callable[[], int] | None:
+        """Get the clipboard change counter of this platform.
+
+        Returns:
+            Function returning the current count, or None if the platform
+            has no counter or it isn't accessible
+        """
+        # Read through a variable so type checkers don't prune the other platforms
+        platform = sys.platform
+        if platform == "darwin":
+            try:
+                import AppKit  # type: ignore[import-untyped, unused-ignore]
+            except ImportError:
+                # PyObjC not available
+                return None
+            pasteboard = AppKit.NSPasteboard.generalPasteboard()
+            return lambda: int(pasteboard.changeCount())
+
+        if platform == "win32":
+            try:
+                # mypy on non-Windows platforms doesn't know about windll
+                user32 = ctypes.windll.user32  # type: ignore[attr-defined, unused-ignore]
+            except (AttributeError, OSError):
+                return None
+            user32.GetClipboardSequenceNumber.restype = ctypes.c_uint32
+            return lambda: int(user32.GetClipboardSequenceNumber())
+
+        return None
+
+    def start(self, on_change: Callable[[], None]) -> bool:
+        """Start polling the change counter.
+
+        Args:
+            on_change: Called from the polling thread after each change
+
+        Returns:
+            True if a change counter is available
+        """
+        if self._thread is not None:
+            return True
+
+        counter = self.counter or self.platform_counter()
+        if counter is None:
+            return False
+        try:
+            count = counter()
+        except Exception:
+            return False
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(counter, count, on_change, self._stopped),
+            name="pasta-change-count-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, counter: Callable[[], int], count: int, on_change: Callable[[], None], stopped: threading.Event) -> None:
+        """Polling thread: report counter changes until stopped.
+
+        Args:
+            counter: Change counter
+            count: Count at start
+            on_change: Change callback
+            stopped: Set to end the thread
+        """
+        while not stopped.wait(self.interval):
+            try:
+                current = counter()
+            except Exception:
+                # Transient failures, e.g. another process holding the clipboard
+                continue
+            if current != count:
+                count = current
+                on_change()
+
+    def is_alive(self) -> bool:
+        """Check that the polling thread is running.
+
+        Returns:
+            False once the thread has ended
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        """Stop polling the counter."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopped.set()
+        thread.join(timeout=1.0)
+
+
+def default_clipboard_watchers() -> list[ClipboardWatcher]:
+    """Get the watchers to try on this platform, most preferred first.
+
+    Returns:
+        Watchers; an empty list means the clipboard is polled
+    """
+    # Read through a variable so type checkers don't prune the other platforms
+    platform = sys.platform
+    if platform == "darwin":
+        # Qt only sees other applications' copies when Pasta is activated
+        return [ChangeCountWatcher()]
+    if platform.startswith("linux"):
+        if os.environ.get("WAYLAND_DISPLAY"):
+            # XFixes under XWayland misses copies made by Wayland clients
+            return [QtClipboardWatcher(), XFixesClipboardWatcher()]
+        return [XFixesClipboardWatcher(), QtClipboardWatcher()]
+    if platform == "win32":
+        return [QtClipboardWatcher(), ChangeCountWatcher()]
+    return [QtClipboardWatcher()]
+
+
+class PollScheduler:
+    """Decides when the clipboard is read next.
+
+    Polling tightens to ``min_interval`` right after a change, when more
+    copies are likely to follow, and backs off exponentially up to
+    ``max_interval`` while the clipboard stays unchanged. Reads are held
+    back while the ``clipboard_read`` budget of the rate limiter is used
+    up, whether they were scheduled or triggered by a watcher.
+
+    Attributes:
+        min_interval: Seconds between polls right after a change
+        max_interval: Upper bound for the idle interval
+        backoff: Factor the interval grows by after each unchanged poll
+        rate_limiter: Limiter whose read budget is respected, or None
+        interval: Current interval between polls
+    """
+
+    RATE_LIMIT_ACTION = "clipboard_read"
+    METRICS_WINDOW = 60.0
+
+    def __init__(
+        self,
+        min_interval: float = 0.1,
+        max_interval: float = 2.0,
+        backoff: float = 1.5,
+        rate_limiter: RateLimiter | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            min_interval: Seconds between polls right after a change
+            max_interval: Upper bound for the idle interval
+            backoff: Factor the interval grows by after each unchanged poll
+            rate_limiter: Limiter whose read budget is respected, or None
+            clock: Monotonic time source
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Poll intervals must satisfy 0 < min_interval <= max_interval")
+        if backoff < 1:
+            raise ValueError("Backoff factor must be at least 1")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.rate_limiter = rate_limiter
+        self.interval = min_interval
+        self._clock = clock
+        self._last_read: float | None = None
+        self._reads: deque[float] = deque()
+        self._latencies: deque[float] = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Get the current time of the scheduler's clock.
+
+        Returns:
+            Current time in seconds
+        """
+        return self._clock()
+
+    def next_delay(self) -> float:
+        """Get how long to wait before the next poll.
+
+        Returns:
+            Seconds until the next poll
+        """
+        return self.interval
+
+    def budget_delay(self) -> float:
+        """Get how long reads have to be held back for the rate limit.
+
+        Returns:
+            Seconds until a read is allowed, 0.0 if allowed now
+        """
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.get_retry_after(self.RATE_LIMIT_ACTION)
+
+    def record_read(self, changed: bool, notified_at: float | None = None) -> None:
+        """Record a clipboard read and adapt the interval.
+
+        Args:
+            changed: Whether the read found new content
+            notified_at: When a watcher reported the change, if one did
+        """
+        now = self._clock()
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_request(self.RATE_LIMIT_ACTION)
+
+        with self._lock:
+            self._reads.append(now)
+            self._trim(now)
+
+            if changed:
+                if notified_at is not None:
+                    self._latencies.append(now - notified_at)
+                elif self._last_read is not None:
+                    # The change happened some time since the last poll; on average halfway
+                    self._latencies.append((now - self._last_read) / 2)
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            self._last_read = now
+
+    def reset(self) -> None:
+        """Start over at the shortest interval."""
+        with self._lock:
+            self.interval = self.min_interval
+            self._last_read = None
+
+    def get_metrics(self) -> dict[str, float]:
+        """Get polling metrics.
+
+        Returns:
+            Dictionary with reads over the last minute, the current
+            interval, and mean and max detection latency in seconds
+        """
+        with self._lock:
+            self._trim(self._clock())
+            latencies = list(self._latencies)
+            return {
+                "polls_per_minute": len(self._reads) * 60.0 / self.METRICS_WINDOW,
+                "interval": self.interval,
+                "detection_latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                "detection_latency_max": max(latencies, default=0.0),
+            }
+
+    def _trim(self, now: float) -> None:
+        """Drop reads older than the metrics window.
+
+        Args:
+            now: Current time
+        """
+        cutoff = now - self.METRICS_WINDOW
+        while self._reads and self._reads[0] <= cutoff:
+            self._reads.popleft()
+
+
+class ClipboardHistory(Sequence[Mapping[str, Any]]):
+    """Clipboard entries, newest first, indexed by content hash.
+
+    Entries are kept in an OrderedDict from oldest to newest, so adding an
+    entry, moving a duplicate to the front and dropping the oldest entry
+    are all O(1). Reading the newest or oldest entry is O(1) as well.
+
+    Content held in memory can be limited to a byte budget. Past it, the
+    oldest entries are spilled: they are replaced by copies without
+    ``content``, and their ``hash`` is the handle to load it back. The
+    newest entry always keeps its content.
+
+    Not thread-safe; ClipboardManager guards it with its lock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty history."""
+        self._entries: OrderedDict[str, Mapping[str, Any]] = OrderedDict()
+        # Hashes of entries holding content, oldest first, with its size in bytes
+        self._resident: OrderedDict[str, int] = OrderedDict()
+        self._resident_bytes = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        """Get the memory held by entry content, in bytes."""
+        return self._resident_bytes
+
+    @staticmethod
+    def is_spilled(entry: Mapping[str, Any]) -> bool:
+        """Check whether an entry's content was dropped from memory.
+
+        Args:
+            entry: Entry from the history
+
+        Returns:
+            True if the content has to be loaded by hash
+        """
+        return "content" not in entry
+
+    def add(self, entry: Mapping[str, Any], max_size: int | None = None, max_bytes: int | None = None) -> None:
+        """Add an entry as the newest, replacing one with the same hash.
+
+        Args:
+            entry: Entry to add
+            max_size: Drop the oldest entries beyond this many, or None to keep all
+            max_bytes: Spill the oldest content beyond this many bytes, or None
+                to keep all content in memory
+        """
+        key = entry["hash"]
+        self._release(key)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if not self.is_spilled(entry):
+            size = sys.getsizeof(entry["content"])
+            self._resident[key] = size
+            self._resident_bytes += size
+
+        if max_size is not None:
+            while len(self._entries) > max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                self._release(oldest)
+
+        if max_bytes is not None:
+            while self._resident_bytes > max_bytes and len(self._resident) > 1:
+                oldest, size = self._resident.popitem(last=False)
+                self._resident_bytes -= size
+                # A copy, since the entry may still be queued for storage elsewhere;
+                # reassigning an existing key keeps its position
+                self._entries[oldest] = self._without_content(self._entries[oldest])
+
+    @staticmethod
+    def _without_content(entry: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Copy an entry without its content.
+
+        Args:
+            entry: Entry holding content
+
+        Returns:
+            Entry with the same metadata
+        """
+        if isinstance(entry, ClipboardEntry):
+            return entry.without_content()
+        return {key: value for key, value in entry.items() if key != "content"}
+
+    def _release(self, key: str) -> None:
+        """Stop accounting for an entry's content.
+
+        Args:
+            key: Hash of the entry
+        """
+        size = self._resident.pop(key, None)
+        if size is not None:
+            self._resident_bytes -= size
+
+    def get(self, content_hash: str) -> Mapping[str, Any] | None:
+        """Get the entry with a content hash.
+
+        Args:
+            content_hash: Hash of the entry's content
+
+        Returns:
+            The entry, or None if it isn't in the history
+        """
+        return self._entries.get(content_hash)
+
+    def newest(self, limit: int | None = None) -> list[Mapping[str, Any]]:
+        """Get the newest entries without walking the rest.
+
+        Args:
+            limit: Maximum number of entries, or None for all
+
+        Returns:
+            Entries, newest first
+        """
+        return list(islice(reversed(self._entries.values()), limit))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._resident.clear()
+        self._resident_bytes = 0
+
+    def __len__(self) -> int:
+        """Get the number of entries."""
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        """Iterate over entries, newest first."""
+        return reversed(self._entries.values())
+
+    @overload
+    def __getitem__(self, index: int) -> Mapping[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Mapping[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> Mapping[str, Any] | list[Mapping[str, Any]]:
+        """Get an entry by position, 0 being the newest.
+
+        Positions are reached by walking from the nearer end, so both ends
+        are O(1).
+        """
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        size = len(self._entries)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+
+        values = self._entries.values()
+        if index < size // 2:
+            return next(islice(reversed(values), index, None))
+        return next(islice(iter(values), size - 1 - index, None))
+
+    def __eq__(self, other: object) -> bool:
+        """Compare entries in order with another history or a list."""
+        if isinstance(other, ClipboardHistory | list | tuple):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Get a representation listing the entries."""
+        return f"ClipboardHistory({list(self)!r})"
+
 
 class ClipboardManager:
     """Manages clipboard monitoring and history.
 
     This class provides clipboard monitoring functionality with history
-    tracking and change detection.
+    tracking and change detection. The clipboard is read when a watcher
+    reports a change, or when the poll scheduler says so if no watcher is
+    available.
 
     Attributes:
-        history: List of clipboard entries
+        history: Clipboard entries, newest first
         history_size: Maximum number of entries to keep
+        history_bytes: Memory budget for entry content; older content
+            beyond it is dropped and loaded by hash when needed
         monitoring: Whether monitoring is active
+        scheduler: Poll timing and read budget
+        active_watcher: Watcher delivering change notifications, or None
     """
 
-    def __init__(self, history_size: int = 100) -> None:
+    # Characters compared at each end of the content, and samples taken in between
+    FINGERPRINT_EDGE = 256
+    FINGERPRINT_SAMPLES = 64
+
+    # Bounding box of image thumbnails kept in history
+    THUMBNAIL_SIZE = (128, 128)
+
+    # Content types whose content isn't text; history keeps them without it
+    BINARY_TYPES = frozenset({"image"})
+
+    # Seconds between checks that the active watcher is still alive
+    WATCHER_CHECK_INTERVAL = 1.0
+
+    HTML_START = re.compile(r"\s*<(?:!doctype\s+html|html|head|body|div|span|p|table|ul|ol|h[1-6]|meta|style)[\s>/]", re.IGNORECASE)
+
+    def __init__(
+        self,
+        history_size: int = 100,
+        watchers: list[ClipboardWatcher] | None = None,
+        scheduler: PollScheduler | None = None,
+        history_bytes: int = 64 * 1024 * 1024,
+        content_loader: Callable[[str], str | bytes | None] | None = None,
+    ) -> None:
         """Initialize the ClipboardManager.
 
         Args:
             history_size: Maximum number of clipboard entries to store
+            watchers: Change notification backends to try in order, or None
+                for the platform defaults; an empty list always polls
+            scheduler: Poll scheduler, or None for one with the default
+                ``clipboard_read`` rate limit
+            history_bytes: Memory budget for entry content in bytes
+            content_loader: Loads spilled content by hash, e.g.
+                ``StorageManager.get_content_by_hash``
         """
-        self.history: list[dict[str, Any]] = []
+        self.history = ClipboardHistory()
         self.history_size = history_size
+        self.history_bytes = history_bytes
+        self.content_loader = content_loader
         self.monitoring = False
         self.callbacks: list[Callable] = []
+        self.scheduler = scheduler or PollScheduler(rate_limiter=RateLimiter())
+        self.watchers = watchers
+        self.active_watcher: ClipboardWatcher | None = None
         self._last_hash = ""
+        self._last_fingerprint: tuple[Any, ...] | None = None
+        self._capture_executor: ThreadPoolExecutor | None = None
         self._monitor_thread: threading.Thread | None = None
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+        self._notified_at: float | None = None
+        # Whether a watcher reported a change since the last read; the
+        # fingerprint shortcut is only trusted when polling blindly
+        self._change_reported = False
         self._lock = threading.Lock()  # Thread safety
 
     def start_monitoring(self) -> None:
-        """Start monitoring clipboard for changes."""
+        """Start monitoring clipboard for changes.
+
+        Call from the GUI thread if a Qt watcher may be used.
+        """
         if self.monitoring:
             return
 
         self.monitoring = True
+        self._changed.clear()
+        self._stopping.clear()
+        self.scheduler.reset()
+        self.active_watcher = self._start_watcher()
         self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._monitor_thread.start()
 
     def stop_monitoring(self) -> None:
         """Stop monitoring clipboard."""
         self.monitoring = False
+        if self.active_watcher is not None:
+            self.active_watcher.stop()
+            self.active_watcher = None
+        # Wake the monitor thread so it notices
+        self._stopping.set()
+        self._changed.set()
         if self._monitor_thread:
             self._monitor_thread.join(timeout=1.0)
+        if self._capture_executor is not None:
+            # Let a pending image finish so it isn't lost
+            self._capture_executor.shutdown(wait=True)
+            self._capture_executor = None
+
+    def _start_watcher(self) -> ClipboardWatcher | None:
+        """Start the first watcher that works on this system.
+
+        Returns:
+            The started watcher, or None to poll
+        """
+        watchers = default_clipboard_watchers() if self.watchers is None else self.watchers
+        for watcher in watchers:
+            try:
+                if watcher.start(self._on_change_notified):
+                    return watcher
+            except Exception:
+                # A broken backend just means falling back to the next one
+                continue
+        return None
+
+    def _on_change_notified(self) -> None:
+        """Watcher callback: wake the monitor thread for a read."""
+        if self._notified_at is None:
+            self._notified_at = self.scheduler.now()
+        self._changed.set()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get clipboard monitoring metrics.
+
+        Returns:
+            Scheduler metrics plus the name of the change detection backend
+        """
+        metrics: dict[str, Any] = dict(self.scheduler.get_metrics())
+        metrics["watcher"] = self.active_watcher.name if self.active_watcher else ClipboardWatcher.name
+        return metrics
 
     def _monitor_loop(self) -> None:
         """Background monitoring loop."""
         while self.monitoring:
-            try:  # noqa: SIM105
-                self._monitor_iteration()
+            notified_at, self._notified_at = self._notified_at, None
+            self._change_reported = notified_at is not None
+            try:
+                changed = self._monitor_iteration()
             except Exception:
                 # Silently handle errors to keep monitoring alive
+                changed = False
+            self.scheduler.record_read(changed, notified_at)
+            self._wait_for_change()
+
+    def _wait_for_change(self) -> None:
+        """Block until the clipboard may have changed and may be read, or monitoring stops."""
+        if self.active_watcher is not None:
+            # Without notifications from a dead watcher, read right away and poll from then on
+            while not self._changed.wait(self.WATCHER_CHECK_INTERVAL) and self._watcher_alive():
                 pass
-            time.sleep(0.5)
+        else:
+            self._changed.wait(self.scheduler.next_delay())
+        # A change arriving after this is caught by the next wait; the read
+        # that follows sees anything that arrived before it
+        self._changed.clear()
+
+        delay = self.scheduler.budget_delay()
+        if delay > 0:
+            self._stopping.wait(delay)
+
+    def _watcher_alive(self) -> bool:
+        """Check the active watcher, falling back to polling if it died.
+
+        Returns:
+            True if the active watcher still delivers notifications
+        """
+        watcher = self.active_watcher
+        if watcher is None or not self.monitoring:
+            return False
+        if watcher.is_alive():
+            return True
+
+        print(f"Clipboard watcher '{watcher.name}' stopped; polling the clipboard instead")
+        with contextlib.suppress(Exception):
+            watcher.stop()
+        self.active_watcher = None
+        return False
+
+    def _monitor_iteration(self) -> bool:
+        """Single iteration of monitoring.
+
+        Text is read first. Only if there is none is the clipboard checked
+        for an image or a list of copied files.
 
-    def _monitor_iteration(self) -> None:
-        """Single iteration of monitoring."""
+        Returns:
+            True if new clipboard content was captured
+        """
         try:
             content = pyperclip.paste()
 
             # Skip empty or whitespace-only content
-            if not content or not content.strip():
-                return
+            if not content or content.isspace():
+                return self._capture_rich()
 
-            content_hash = hashlib.md5(content.encode()).hexdigest()
+            return self._capture_text(content)
 
-            # Skip if content hasn't changed
-            if content_hash == self._last_hash:
-                return
+        except Exception:
+            # Handle clipboard access errors
+            return False
 
-            self._last_hash = content_hash
+    def _capture_text(self, content: str, content_type: str | None = None) -> bool:
+        """Capture clipboard text if it changed.
 
-            # Create entry
-            entry = {
-                "content": content,
-                "timestamp": datetime.now().isoformat(),
-                "hash": content_hash,
-                "content_type": self._detect_content_type(content),
-            }
+        Args:
+            content: Clipboard text
+            content_type: Content type, or None to detect it
+
+        Returns:
+            True if the text was new
+        """
+        # Cheap check first: unchanged length and samples mean unchanged
+        # content, without hashing what may be megabytes. A watcher's report
+        # outweighs it, since an edit between the samples keeps the fingerprint
+        fingerprint = self._fingerprint(content)
+        if self._last_hash and fingerprint == self._last_fingerprint and not self._change_reported:
+            return False
+        self._last_fingerprint = fingerprint
+
+        content_hash = self._content_hash(content)
+
+        # Skip if content hasn't changed
+        if content_hash == self._last_hash:
+            return False
 
-            # Add to history
-            self._add_to_history(entry)
+        self._last_hash = content_hash
 
-            # Notify callbacks
-            for callback in self.callbacks:
-                try:  # noqa: SIM105
-                    callback(entry)
-                except Exception:
-                    # Don't let callback errors stop monitoring
-                    pass
+        entry = ClipboardEntry.capture(content, content_hash, content_type or self._detect_content_type(content))
+        self._add_to_history(entry)
+        self._notify(entry)
+        return True
 
+    def _capture_rich(self) -> bool:
+        """Capture an image or file list from the clipboard if it changed.
+
+        Only the change check runs here. Encoding the image and making its
+        thumbnail are left to the capture thread, so large screenshots
+        don't hold up monitoring. With a watcher, the clipboard is only
+        grabbed after it reported a change.
+
+        Returns:
+            True if new content was found
+        """
+        # Grabbing decodes the whole image. A live watcher reports every
+        # change, so without a report the clipboard still holds what was last read
+        if self._last_hash and self.active_watcher is not None and not self._change_reported:
+            return False
+
+        grabbed = self._grab_clipboard()
+        if isinstance(grabbed, list):
+            paths = [str(path) for path in grabbed if path]
+            return bool(paths) and self._capture_text("\n".join(paths), "files")
+        if grabbed is None or not hasattr(grabbed, "tobytes"):
+            return False
+
+        fingerprint = self._image_fingerprint(grabbed)
+        if self._last_hash and fingerprint == self._last_fingerprint and not self._change_reported:
+            return False
+        self._last_fingerprint = fingerprint
+
+        # Hash the pixels rather than an encoding, which may differ between reads
+        pixel_hash = hashlib.blake2b(grabbed.tobytes(), digest_size=16, person=grabbed.mode.encode()[:16]).hexdigest()
+        if pixel_hash == self._last_hash:
+            return False
+        self._last_hash = pixel_hash
+
+        if self._capture_executor is None:
+            self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pasta-capture")
+        self._capture_executor.submit(self._capture_image, grabbed, ClipboardEntry.now_us())
+        return True
+
+    def _capture_image(self, image: Any, epoch_us: int) -> None:
+        """Capture thread: encode an image and record it.
+
+        History keeps only the thumbnail; the full image goes to the
+        callbacks for storage and is loaded from there when pasted.
+
+        Args:
+            image: PIL image from the clipboard
+            epoch_us: When the image was found
+        """
+        try:
+            png = self._encode_png(image)
+            preview = image.copy()
+            preview.thumbnail(self.THUMBNAIL_SIZE)
+            thumbnail = self._encode_png(preview)
         except Exception:
-            # Handle clipboard access errors
-            pass
+            # Unsupported image mode or similar; nothing to record
+            return
+
+        entry = ClipboardEntry(png, self._content_hash(png), "image", epoch_us, thumbnail)
+        self._add_to_history(entry.without_content())
+        self._notify(entry)
+
+    def _notify(self, entry: ClipboardEntry) -> None:
+        """Pass a new entry to the registered callbacks.
+
+        Args:
+            entry: Captured entry
+        """
+        for callback in self.callbacks:
+            try:  # noqa: SIM105
+                callback(entry)
+            except Exception:
+                # Don't let callback errors stop monitoring
+                pass
+
+    @staticmethod
+    def _grab_clipboard() -> Any:
+        """Read non-text clipboard content through Pillow.
+
+        Returns:
+            A PIL image, a list of file paths, or None if there is neither
+            or the platform isn't supported
+        """
+        try:
+            from PIL import ImageGrab
+
+            return ImageGrab.grabclipboard()
+        except Exception:
+            # No clipboard tool on Linux, clipboard busy, or undecodable data
+            return None
+
+    @staticmethod
+    def _encode_png(image: Any) -> bytes:
+        """Encode a PIL image as PNG.
+
+        Args:
+            image: PIL image
+
+        Returns:
+            PNG data
+        """
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    @classmethod
+    def _image_fingerprint(cls, image: Any) -> tuple[Any, ...]:
+        """Get a fingerprint of an image that is cheap to compute.
+
+        Args:
+            image: PIL image
+
+        Returns:
+            Mode, size and a grid of sampled pixels
+        """
+        width, height = image.size
+        steps = 8
+        samples = tuple(
+            image.getpixel((x * (width - 1) // (steps - 1), y * (height - 1) // (steps - 1))) for x in range(steps) for y in range(steps)
+        )
+        return image.mode, image.size, samples
+
+    @classmethod
+    def _fingerprint(cls, content: str) -> tuple[int, str, str, str]:
+        """Get a fingerprint of content that is cheap to compute.
+
+        Content up to twice ``FINGERPRINT_EDGE`` characters is covered
+        completely. For longer content, an edit in the middle that keeps
+        the length and misses every sample goes unnoticed.
+
+        Args:
+            content: Clipboard text
+
+        Returns:
+            Length, prefix, suffix and evenly spaced samples of the content
+        """
+        edge = cls.FINGERPRINT_EDGE
+        if len(content) <= 2 * edge:
+            return len(content), content, "", ""
+        step = max(1, (len(content) - 2 * edge) // cls.FINGERPRINT_SAMPLES)
+        return len(content), content[:edge], content[-edge:], content[edge:-edge:step]
+
+    @staticmethod
+    def _content_hash(content: str | bytes) -> str:
+        """Hash clipboard content for change detection and deduplication.
+
+        Matches the blob key storage uses, so content can be loaded back
+        by this hash.
+
+        Args:
+            content: Clipboard text or image data
+
+        Returns:
+            Hex digest of the content
+        """
+        raw = content.encode() if isinstance(content, str) else content
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
 
     def _detect_content_type(self, content: str) -> str:
         """Detect type of clipboard content.
@@ -112,6 +1267,8 @@ class ClipboardManager:
         """
         if content.startswith(("http://", "https://")):
             return "url"
+        elif self.HTML_START.match(content) and "</" in content:
+            return "html"
         elif "\t" in content or "\n" in content:
             return "multiline"
         elif len(content) > 500:
@@ -119,22 +1276,16 @@ class ClipboardManager:
         else:
             return "text"
 
-    def _add_to_history(self, entry: dict[str, Any]) -> None:
+    def _add_to_history(self, entry: Mapping[str, Any]) -> None:
         """Add entry to history with deduplication.
 
         Args:
             entry: Entry to add
         """
         with self._lock:
-            # Remove duplicates
-            self.history = [e for e in self.history if e["hash"] != entry["hash"]]
-
-            # Add new entry at beginning
-            self.history.insert(0, entry)
-
-            # Trim history to size limit
-            if len(self.history) > self.history_size:
-                self.history = self.history[: self.history_size]
+            # Moves a duplicate to the front, drops the oldest beyond the size
+            # limit and spills the oldest content beyond the byte budget
+            self.history.add(entry, self.history_size, self.history_bytes)
 
     def register_callback(self, callback: Callable) -> None:
         """Register callback for clipboard changes.
@@ -144,22 +1295,49 @@ class ClipboardManager:
         """
         self.callbacks.append(callback)
 
-    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+    def get_history(self, limit: int | None = None) -> list[Mapping[str, Any]]:
         """Get clipboard history.
 
         Args:
             limit: Maximum number of entries to return
 
         Returns:
-            List of clipboard entries
+            List of clipboard entries, newest first. Spilled content is
+            loaded back; entries whose content can't be loaded are left out.
         """
         with self._lock:
-            if limit is None:
-                return self.history.copy()
-            return self.history[:limit].copy()
+            entries = self.history.newest(limit)
+
+        # Load outside the lock so storage reads don't hold up monitoring
+        return [loaded for entry in entries if (loaded := self._load_spilled(entry)) is not None]
+
+    def _load_spilled(self, entry: Mapping[str, Any]) -> Mapping[str, Any] | None:
+        """Get an entry with its content, loading it if it was spilled.
+
+        Args:
+            entry: Entry from the history
+
+        Returns:
+            Entry with content, or None if the content isn't available
+        """
+        if not ClipboardHistory.is_spilled(entry) or entry.get("content_type") in self.BINARY_TYPES:
+            # Images are only loaded when pasted
+            return entry
+        if self.content_loader is None:
+            return None
+        try:
+            content = self.content_loader(entry["hash"])
+        except Exception:
+            return None
+        if content is None:
+            return None
+        if isinstance(entry, ClipboardEntry):
+            return entry.with_content(content)
+        return {**entry, "content": content}
 
     def clear_history(self) -> None:
         """Clear all clipboard history."""
         with self._lock:
             self.history.clear()
             self._last_hash = ""
+            self._last_fingerprint = None
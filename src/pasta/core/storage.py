@@ -1,17 +1,220 @@
 """Persistent storage for clipboard history."""
 
+import base64
 import contextlib
+import hashlib
 import json
+import lzma
 import os
+import queue
 import sqlite3
+import struct
 import threading
+import time
+import zlib
+from collections.abc import Callable, Generator, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
-from pasta.utils.security import SecurityManager
+from pasta.core.clipboard import ClipboardEntry
+from pasta.utils.security import SecretCache, SecurityManager
+
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections.
+
+    All modifications go through a single writer connection guarded by
+    ``write_lock``, while queries are served from a small set of reader
+    connections. The database runs in WAL mode so readers see the last
+    committed state and never wait on the writer.
+
+    Attributes:
+        db_path: Path to the SQLite database
+        max_readers: Maximum number of reader connections
+        write_lock: Lock serializing use of the writer connection
+    """
+
+    # Pragmas applied to every connection in the pool
+    PRAGMAS: dict[str, str | int] = {
+        "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+        "cache_size": -8192,  # 8 MiB page cache
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
+
+    def __init__(self, db_path: str, max_readers: int = 4, on_connect: Callable[[sqlite3.Connection], None] | None = None) -> None:
+        """Initialize the pool.
+
+        Args:
+            db_path: Path to SQLite database file
+            max_readers: Maximum number of reader connections
+            on_connect: Optional callback run on every new connection, e.g.
+                to register SQL functions
+        """
+        self.db_path = db_path
+        self.on_connect = on_connect
+        # Every connection to ":memory:" is a separate database, so readers
+        # have to share the writer connection there
+        self.max_readers = 0 if db_path == ":memory:" else max_readers
+        self.write_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+        self._readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._reader_count = 0
+        self._pool_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new connection with the pool pragmas applied.
+
+        Args:
+            read_only: Whether to open the connection as query-only
+
+        Returns:
+            SQLite connection
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        """Get the shared writer connection, opening it on first use.
+
+        Callers must hold ``write_lock`` while using the connection.
+
+        Returns:
+            SQLite connection
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection pool.")
+        if self._writer is None:
+            self._writer = self._connect()
+            self._writer.execute("PRAGMA journal_mode = WAL")
+        return self._writer
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection for the duration of the block.
+
+        Yields:
+            SQLite connection for queries
+        """
+        if self.max_readers == 0:
+            with self.write_lock:
+                yield self.writer
+            return
+
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed connection pool.")
+
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._release_reader(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take an idle reader, opening a new one if the pool has room.
+
+        Returns:
+            SQLite connection
+        """
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            can_open = self._reader_count < self.max_readers
+            if can_open:
+                self._reader_count += 1
+
+        if can_open:
+            try:
+                return self._connect(read_only=True)
+            except sqlite3.Error:
+                with self._pool_lock:
+                    self._reader_count -= 1
+                raise
+
+        return self._readers.get()
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        """Return a reader to the pool.
+
+        Args:
+            conn: Reader connection to return
+        """
+        if self._closed:
+            conn.close()
+            return
+        self._readers.put(conn)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self.write_lock:
+            self._closed = True
+            if self._writer is not None:
+                with contextlib.suppress(sqlite3.Error):
+                    self._writer.execute("PRAGMA optimize")
+                self._writer.close()
+                self._writer = None
+
+        while True:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed."""
+        return self._closed
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedBlob:
+    """Content made ready for storage outside the write lock.
+
+    Attributes:
+        hash: Hash of the plaintext content
+        content: Plaintext content or binary payload
+        stored: Value for blobs.content, or None if the content was already
+            stored when it was prepared
+        encrypted: Whether ``stored`` is encrypted
+        size: Size of the plaintext in bytes
+        codec: Value for blobs.codec
+        stored_size: Size of ``stored`` in bytes
+        preview: Value for blobs.preview
+        thumbnail: Small preview image of binary content
+        rescan: Whether to finish the sensitive data scan in the background
+        cipher: Cipher ``stored`` was encrypted with, if encrypted
+    """
+
+    hash: str
+    content: str | bytes
+    stored: str | bytes | None = None
+    encrypted: bool = False
+    size: int = 0
+    codec: str = "none"
+    stored_size: int = 0
+    preview: str = ""
+    thumbnail: bytes | None = None
+    rescan: bool = False
+    cipher: MultiFernet | None = None
 
 
 class StorageManager:
@@ -20,32 +223,145 @@ class StorageManager:
     This class handles SQLite database operations for storing
     and retrieving clipboard history with encryption support.
 
+    Observers are called with an event name and a payload after each
+    committed change: ``"inserted"`` with the summaries of new entries,
+    ``"deleted"`` with the IDs of removed entries, and ``"cleared"`` with
+    an empty list. They may be called from any thread that writes.
+
+    Content is hashed, compressed, checked for sensitive data and
+    encrypted before the write lock is taken, on a small worker pool for
+    batches, so the lock only covers the INSERT statements.
+
     Attributes:
         db_path: Path to the SQLite database
         encryption_key: Key for encrypting sensitive data
+        observers: List of change observer callbacks
     """
 
-    def __init__(self, db_path: str, encryption_key: bytes | None = None) -> None:
+    # Schema version this code expects; older databases are upgraded by _migrate()
+    SCHEMA_VERSION = 7
+
+    # Value of blobs.codec for content stored uncompressed
+    CODEC_NONE = "none"
+
+    # Value of blobs.codec for binary payloads such as images, stored as-is
+    CODEC_BINARY = "binary"
+
+    # Compression codecs by the name recorded in blobs.codec: (compress, decompress)
+    CODECS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+        "zlib": (zlib.compress, zlib.decompress),
+        "lzma": (lzma.compress, lzma.decompress),
+    }
+
+    # Number of characters of unencrypted content kept in blobs.preview
+    PREVIEW_LENGTH = 200
+
+    # What to do with content whose sensitive-data scan runs over budget:
+    # encrypt it, or encrypt it and finish the scan in the background
+    OVER_BUDGET_POLICIES = ("encrypt", "background")
+
+    # Encrypted blobs re-encrypted per transaction by rotate_encryption_key()
+    ROTATION_BATCH_SIZE = 500
+
+    # Columns of a full entry: history row joined with its content blob
+    ENTRY_SELECT = """
+        SELECT h.*, b.content, b.encrypted, b.codec, b.thumbnail
+        FROM clipboard_history AS h
+        JOIN blobs AS b ON b.id = h.blob_id
+    """
+
+    # Columns of an entry summary, which never needs to decrypt or decompress
+    SUMMARY_COLUMNS = "h.id, h.content_type, h.timestamp, h.epoch_us, b.preview, b.size, b.encrypted, b.thumbnail"
+    SUMMARY_SELECT = f"""
+        SELECT {SUMMARY_COLUMNS}
+        FROM clipboard_history AS h
+        JOIN blobs AS b ON b.id = h.blob_id
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        encryption_key: bytes | None = None,
+        max_readers: int = 4,
+        compression_threshold: int = 4096,
+        compression_codec: str | None = "zlib",
+        scan_time_budget: float | None = 0.1,
+        scan_size_budget: int | None = None,
+        over_budget_policy: str = "background",
+        prepare_workers: int = 2,
+        decrypted_cache_bytes: int = 1 << 20,
+        decrypted_cache_ttl: float = 60.0,
+    ) -> None:
         """Initialize the StorageManager.
 
         Args:
             db_path: Path to SQLite database file
             encryption_key: Optional encryption key for sensitive data
+            max_readers: Maximum number of pooled reader connections
+            compression_threshold: Size in bytes from which content is compressed
+            compression_codec: Codec from ``CODECS`` used for large content,
+                or None to store everything uncompressed
+            scan_time_budget: Seconds a save may spend looking for sensitive
+                data in one content, or None for no limit
+            scan_size_budget: Characters a save may scan for sensitive data
+                in one content, or None for no limit
+            over_budget_policy: Policy from ``OVER_BUDGET_POLICIES`` for
+                content not fully scanned within budget. Such content is
+                always encrypted; with "background" it is scanned in full
+                later and stored unencrypted if nothing was found.
+            prepare_workers: Number of threads preparing the content of a
+                batch of entries for storage
+            decrypted_cache_bytes: Size of the cache of decrypted content,
+                or 0 to decrypt on every read
+            decrypted_cache_ttl: Seconds decrypted content is cached
+
+        Raises:
+            ValueError: If ``compression_codec`` or ``over_budget_policy``
+                is not known
         """
         # Suppress unused argument warning - for future use
         _ = encryption_key  # noqa: F841
         self.db_path = db_path
-        self._lock = threading.Lock()
+
+        if compression_codec is not None and compression_codec not in self.CODECS:
+            raise ValueError(f"Unknown compression codec: {compression_codec}")
+        self.compression_threshold = compression_threshold
+        self.compression_codec = compression_codec
+
+        if over_budget_policy not in self.OVER_BUDGET_POLICIES:
+            raise ValueError(f"Unknown over-budget policy: {over_budget_policy}")
+        self.scan_time_budget = scan_time_budget
+        self.scan_size_budget = scan_size_budget
+        self.over_budget_policy = over_budget_policy
+        self._rescan_executor: ThreadPoolExecutor | None = None
+        # Blobs stored over budget, rescanned once their transaction commits
+        self._pending_rescans: list[tuple[int, str]] = []
+        self.prepare_workers = prepare_workers
+        self._prepare_executor: ThreadPoolExecutor | None = None
+        # Decrypted content keyed by a digest of its token, so a new key
+        # or reused blob ID can never return stale content
+        self._decrypted = SecretCache(max_bytes=decrypted_cache_bytes, ttl=decrypted_cache_ttl)
+
+        # Long-lived connections; writes are serialized by the pool's lock
+        self._pool = ConnectionPool(db_path, max_readers=max_readers, on_connect=self._register_functions)
+        self._lock = self._pool.write_lock
 
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize encryption
-        self.cipher = Fernet(self._get_or_create_key())
+        # Initialize encryption; an in-memory database is gone once closed,
+        # so its keys are never written next to the working directory
+        self._memory_keys: list[bytes] | None = [] if db_path == ":memory:" else None
+        self.cipher = self._make_cipher(self._load_keys())
 
         # Use SecurityManager for sensitive data detection
         self._security_manager = SecurityManager()
 
+        # Set by _init_fts() when the SQLite build provides FTS5
+        self.fts_enabled = False
+
+        self.observers: list[Callable[[str, list[Any]], None]] = []
+
         # Initialize database
         self._init_database()
 
@@ -53,24 +369,69 @@ class StorageManager:
         """Get or create encryption key.
 
         Returns:
-            Encryption key bytes
+            Encryption key bytes that new content is encrypted with
         """
+        return self._load_keys()[0]
+
+    def _load_keys(self) -> list[bytes]:
+        """Read the encryption keys, creating a key if there is none.
+
+        The key file holds one key per line, newest first. It holds more
+        than one only while a key rotation is unfinished.
+
+        Returns:
+            Encryption keys, newest first
+        """
+        if self._memory_keys:
+            return list(self._memory_keys)
+
         key_file = Path(self.db_path).parent / ".pasta_key"
 
-        if key_file.exists():
+        if self._memory_keys is None and key_file.exists():
             with open(key_file, "rb") as f:
-                return f.read()
-        else:
-            key: bytes = Fernet.generate_key()
-            with open(key_file, "wb") as f:
-                f.write(key)
-            # Set restrictive permissions
-            os.chmod(key_file, 0o600)
-            return key
+                keys = f.read().split()
+            if keys:
+                return keys
+
+        key: bytes = Fernet.generate_key()
+        self._write_keys([key])
+        return [key]
+
+    def _write_keys(self, keys: list[bytes]) -> None:
+        """Replace the key file in one step.
+
+        Args:
+            keys: Encryption keys, newest first
+        """
+        if self._memory_keys is not None:
+            self._memory_keys = list(keys)
+            return
+
+        key_file = Path(self.db_path).parent / ".pasta_key"
+        temp_file = key_file.with_name(key_file.name + ".tmp")
+        # Set restrictive permissions before any key is written
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\n".join(keys))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, key_file)
+
+    @staticmethod
+    def _make_cipher(keys: list[bytes]) -> MultiFernet:
+        """Create a cipher that encrypts with the first key and decrypts with any.
+
+        Args:
+            keys: Encryption keys, newest first
+
+        Returns:
+            Cipher
+        """
+        return MultiFernet([Fernet(key) for key in keys])
 
     def _init_database(self) -> None:
         """Initialize database schema."""
-        with self._get_connection() as conn:
+        with self._lock, self._get_connection() as conn:
             # Create main table
             conn.execute(
                 """
@@ -101,20 +462,511 @@ class StorageManager:
 
             # Set initial version
             cursor = conn.execute("SELECT version FROM schema_version")
-            if cursor.fetchone() is None:
+            row = cursor.fetchone()
+            if row is None:
                 conn.execute("INSERT INTO schema_version (version) VALUES (1)")
 
+            self._migrate(conn, 1 if row is None else row[0])
+            self.fts_enabled = self._init_fts(conn)
+
+            conn.commit()
+
+    def _migrate(self, conn: sqlite3.Connection, version: int) -> None:
+        """Upgrade the database schema one version at a time.
+
+        All steps run in a single transaction, so a failed upgrade leaves
+        the database at its old version rather than half-migrated.
+
+        Args:
+            conn: Writer connection
+            version: Current schema version of the database
+        """
+        if version >= self.SCHEMA_VERSION:
+            return
+
+        # sqlite3 only opens transactions implicitly for DML, not for ALTER/CREATE
+        if conn.in_transaction:
             conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while version < self.SCHEMA_VERSION:
+                version += 1
+                getattr(self, f"_migrate_to_v{version}")(conn)
+                conn.execute("UPDATE schema_version SET version = ?", (version,))
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _migrate_to_v2(self, conn: sqlite3.Connection) -> None:
+        """Add the integer epoch timestamp used for ordering and paging.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute("ALTER TABLE clipboard_history ADD COLUMN epoch_us INTEGER NOT NULL DEFAULT 0")
+
+        # Backfill from the ISO timestamps with the same conversion used on insert
+        conn.create_function("pasta_epoch_us", 1, self._epoch_us_or_zero, deterministic=True)
+        conn.execute("UPDATE clipboard_history SET epoch_us = pasta_epoch_us(timestamp)")
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_epoch_id ON clipboard_history(epoch_us DESC, id DESC)")
+
+    def _migrate_to_v3(self, conn: sqlite3.Connection) -> None:
+        """Move entry content into deduplicated, content-addressed blobs.
+
+        Each distinct payload is stored once in ``blobs``, keyed by the hash
+        of its plaintext, and history rows reference it by ``blob_id``.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute(
+            """
+            CREATE TABLE blobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash TEXT NOT NULL UNIQUE,
+                content TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0
+            )
+        """
+        )
+        conn.execute("CREATE INDEX idx_blobs_orphaned ON blobs(refcount) WHERE refcount <= 0")
+
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history_v3 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                blob_id INTEGER NOT NULL REFERENCES blobs(id),
+                timestamp DATETIME NOT NULL,
+                epoch_us INTEGER NOT NULL DEFAULT 0,
+                content_type TEXT NOT NULL,
+                hash TEXT NOT NULL
+            )
+        """
+        )
+
+        blob_ids: dict[str, int] = {}
+        rows = conn.execute("SELECT * FROM clipboard_history ORDER BY id")
+        for row in rows:
+            plaintext = row["content"]
+            if row["encrypted"]:
+                # Undecryptable content is kept as-is and keyed by its ciphertext
+                with contextlib.suppress(Exception):
+                    plaintext = self.cipher.decrypt(row["content"].encode()).decode()
+
+            blob_hash = self._content_hash(plaintext)
+            blob_id = blob_ids.get(blob_hash)
+            if blob_id is None:
+                cursor = conn.execute(
+                    "INSERT INTO blobs (hash, content, encrypted, size) VALUES (?, ?, ?, ?)",
+                    (blob_hash, row["content"], row["encrypted"], len(plaintext)),
+                )
+                blob_id = blob_ids[blob_hash] = cursor.lastrowid or 0
+
+            conn.execute(
+                """
+                INSERT INTO clipboard_history_v3 (id, blob_id, timestamp, epoch_us, content_type, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (row["id"], blob_id, row["timestamp"], row["epoch_us"], row["content_type"], row["hash"]),
+            )
+
+        # The old full-text index points at clipboard_history.content; _init_fts() rebuilds it
+        with contextlib.suppress(sqlite3.OperationalError):
+            conn.execute("DROP TABLE IF EXISTS clipboard_fts")
+        conn.execute("DROP TABLE clipboard_history")
+        conn.execute("ALTER TABLE clipboard_history_v3 RENAME TO clipboard_history")
+
+        conn.execute("CREATE INDEX idx_timestamp ON clipboard_history(timestamp)")
+        conn.execute("CREATE INDEX idx_hash ON clipboard_history(hash)")
+        conn.execute("CREATE INDEX idx_content_type ON clipboard_history(content_type)")
+        conn.execute("CREATE INDEX idx_epoch_id ON clipboard_history(epoch_us DESC, id DESC)")
+        conn.execute("CREATE INDEX idx_blob_id ON clipboard_history(blob_id)")
+
+        # Reference counts follow history rows; orphans are removed by _collect_garbage()
+        conn.execute("UPDATE blobs SET refcount = (SELECT COUNT(*) FROM clipboard_history WHERE blob_id = blobs.id)")
+        conn.execute(
+            """
+            CREATE TRIGGER blobs_ref_insert AFTER INSERT ON clipboard_history BEGIN
+                UPDATE blobs SET refcount = refcount + 1 WHERE id = new.blob_id;
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER blobs_ref_delete AFTER DELETE ON clipboard_history BEGIN
+                UPDATE blobs SET refcount = refcount - 1 WHERE id = old.blob_id;
+            END
+        """
+        )
+
+    def _migrate_to_v4(self, conn: sqlite3.Connection) -> None:
+        """Record how each blob is encoded so large content can be compressed.
+
+        Sizes are tracked in bytes from this version on. Existing unencrypted
+        content above the compression threshold is compressed in place.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute(f"ALTER TABLE blobs ADD COLUMN codec TEXT NOT NULL DEFAULT '{self.CODEC_NONE}'")
+        conn.execute("ALTER TABLE blobs ADD COLUMN stored_size INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            """
+            UPDATE blobs SET
+                stored_size = length(CAST(content AS BLOB)),
+                size = CASE WHEN encrypted = 0 THEN length(CAST(content AS BLOB)) ELSE size END
+        """
+        )
+
+        # The full-text index now reads content through pasta_decode(); _init_fts() rebuilds it
+        for trigger in ("clipboard_fts_insert", "clipboard_fts_delete", "clipboard_fts_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        with contextlib.suppress(sqlite3.OperationalError):
+            conn.execute("DROP TABLE IF EXISTS clipboard_fts")
+
+        rows = conn.execute(
+            "SELECT id, content FROM blobs WHERE encrypted = 0 AND size >= ?",
+            (self.compression_threshold,),
+        ).fetchall()
+        for row in rows:
+            stored, codec = self._compress(row["content"].encode())
+            if codec != self.CODEC_NONE:
+                conn.execute(
+                    "UPDATE blobs SET content = ?, codec = ?, stored_size = ? WHERE id = ?",
+                    (stored, codec, len(stored), row["id"]),
+                )
+
+    def _migrate_to_v5(self, conn: sqlite3.Connection) -> None:
+        """Store a plaintext preview of each blob for list views.
+
+        Encrypted blobs get an empty preview so sensitive content is never
+        stored in the clear.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute("ALTER TABLE blobs ADD COLUMN preview TEXT NOT NULL DEFAULT ''")
+        conn.execute(
+            "UPDATE blobs SET preview = substr(pasta_decode(content, codec, encrypted), 1, ?) WHERE encrypted = 0",
+            (self.PREVIEW_LENGTH,),
+        )
+
+    def _migrate_to_v6(self, conn: sqlite3.Connection) -> None:
+        """Add small previews of binary content such as images.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute("ALTER TABLE blobs ADD COLUMN thumbnail BLOB")
+
+    def _migrate_to_v7(self, conn: sqlite3.Connection) -> None:
+        """Add the progress record of an unfinished key rotation.
+
+        Args:
+            conn: Writer connection
+        """
+        conn.execute(
+            """
+            CREATE TABLE key_rotation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_blob_id INTEGER NOT NULL
+            )
+        """
+        )
+
+    def _register_functions(self, conn: sqlite3.Connection) -> None:
+        """Register the SQL functions used by the schema on a new connection.
+
+        Args:
+            conn: Newly opened connection
+        """
+        conn.create_function("pasta_decode", 3, self._sql_decode, deterministic=True)
+
+    @classmethod
+    def _sql_decode(cls, content: str | bytes | None, codec: str, encrypted: int) -> str | None:
+        """Decode stored blob content for SQL, e.g. for the full-text index.
+
+        Args:
+            content: Stored content
+            codec: Codec the content was compressed with
+            encrypted: Whether the content is encrypted
+
+        Returns:
+            Plaintext, or None for encrypted, binary or undecodable content
+        """
+        if encrypted or content is None or codec == cls.CODEC_BINARY:
+            return None
+        if codec == cls.CODEC_NONE:
+            return content if isinstance(content, str) else content.decode(errors="replace")
+        try:
+            raw = cls.CODECS[codec][1](content.encode() if isinstance(content, str) else content)
+        except (KeyError, zlib.error, lzma.LZMAError):
+            return None
+        return raw.decode(errors="replace")
+
+    def _compress(self, raw: bytes) -> tuple[bytes, str]:
+        """Compress content if it is large enough and compression pays off.
+
+        Args:
+            raw: UTF-8 encoded content
+
+        Returns:
+            Tuple of (payload, codec), where codec is ``CODEC_NONE`` if
+            the payload is ``raw`` unchanged
+        """
+        if self.compression_codec is None or len(raw) < self.compression_threshold:
+            return raw, self.CODEC_NONE
+
+        compressed = self.CODECS[self.compression_codec][0](raw)
+        if len(compressed) >= len(raw):
+            return raw, self.CODEC_NONE
+        return compressed, self.compression_codec
+
+    def _decode_content(self, content: str | bytes, codec: str, encrypted: bool) -> str | bytes:
+        """Turn stored blob content back into plaintext.
+
+        Args:
+            content: Stored content
+            codec: Codec the content was compressed with
+            encrypted: Whether the content is encrypted
+
+        Returns:
+            Plaintext content, or the payload bytes of binary content
+        """
+        if codec == self.CODEC_BINARY:
+            return content
+        if encrypted:
+            token = content.encode() if isinstance(content, str) else content
+            key = self._decrypted_key(token)
+            plaintext = self._decrypted.get(key)
+            if plaintext is None:
+                plaintext = self.cipher.decrypt(token)
+                if codec != self.CODEC_NONE:
+                    plaintext = self.CODECS[codec][1](plaintext)
+                self._decrypted.put(key, plaintext)
+            return plaintext.decode()
+        data = content
+        if codec != self.CODEC_NONE:
+            data = self.CODECS[codec][1](data.encode() if isinstance(data, str) else data)
+        return data.decode() if isinstance(data, bytes) else data
+
+    @staticmethod
+    def _decrypted_key(token: str | bytes) -> bytes:
+        """Get the decrypted content cache key of an encryption token.
+
+        Args:
+            token: Stored encrypted content
+
+        Returns:
+            Cache key
+        """
+        return hashlib.blake2b(token.encode() if isinstance(token, str) else token, digest_size=16).digest()
+
+    @staticmethod
+    def _content_hash(content: str | bytes) -> str:
+        """Hash content to its blob key.
+
+        Args:
+            content: Plaintext content or binary payload
+
+        Returns:
+            Hex digest identifying the content
+        """
+        raw = content.encode() if isinstance(content, str) else content
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _binary_preview(payload: bytes) -> str:
+        """Describe a binary payload for list views.
+
+        Args:
+            payload: Binary content
+
+        Returns:
+            Image dimensions for PNG payloads, otherwise the size
+        """
+        # PNG signature followed by the IHDR chunk, which starts with width and height
+        if payload[:8] == b"\x89PNG\r\n\x1a\n" and payload[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", payload[16:24])
+            return f"[Image {width}×{height}]"
+        return f"[Binary data, {len(payload)} bytes]"
+
+    @staticmethod
+    def _epoch_us(timestamp: Any) -> int:
+        """Convert an entry timestamp to microseconds since the epoch.
+
+        Args:
+            timestamp: datetime, ISO format string or Unix timestamp
+
+        Returns:
+            Microseconds since the epoch
+        """
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if isinstance(timestamp, int | float):
+            return round(timestamp * 1_000_000)
+        # Naive datetimes are treated as local time
+        seconds: float = timestamp.timestamp()
+        return round(seconds * 1_000_000)
+
+    @classmethod
+    def _epoch_us_or_zero(cls, timestamp: Any) -> int:
+        """Convert a stored timestamp, mapping unparseable values to 0.
+
+        Args:
+            timestamp: Value from the timestamp column
+
+        Returns:
+            Microseconds since the epoch, or 0
+        """
+        try:
+            return cls._epoch_us(timestamp)
+        except (TypeError, ValueError, OverflowError):
+            return 0
+
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the full-text index over unencrypted history content.
+
+        The index is an external-content FTS5 table kept in sync with
+        ``blobs`` by triggers, so each distinct payload is indexed once.
+        It reads content through the ``blob_text`` view, which decompresses
+        blobs with ``pasta_decode()``. Encrypted blobs are never indexed.
+
+        Args:
+            conn: Writer connection
+
+        Returns:
+            True if full-text search is available
+        """
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clipboard_fts'").fetchone()
+        if exists:
+            return True
+
+        conn.execute(
+            """
+            CREATE VIEW IF NOT EXISTS blob_text AS
+            SELECT id, pasta_decode(content, codec, encrypted) AS content FROM blobs
+        """
+        )
+
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE clipboard_fts USING fts5(
+                    content,
+                    content = 'blob_text',
+                    content_rowid = 'id',
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            """
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 - search falls back to LIKE
+            return False
+
+        conn.execute(
+            """
+            CREATE TRIGGER clipboard_fts_insert AFTER INSERT ON blobs
+            WHEN new.encrypted = 0 BEGIN
+                INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, pasta_decode(new.content, new.codec, 0));
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER clipboard_fts_delete AFTER DELETE ON blobs
+            WHEN old.encrypted = 0 BEGIN
+                INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+                    VALUES ('delete', old.id, pasta_decode(old.content, old.codec, 0));
+            END
+        """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER clipboard_fts_update AFTER UPDATE OF content, encrypted, codec ON blobs BEGIN
+                INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+                    SELECT 'delete', old.id, pasta_decode(old.content, old.codec, 0) WHERE old.encrypted = 0;
+                INSERT INTO clipboard_fts (rowid, content)
+                    SELECT new.id, pasta_decode(new.content, new.codec, 0) WHERE new.encrypted = 0;
+            END
+        """
+        )
+
+        # Index existing history
+        conn.execute("INSERT INTO clipboard_fts (rowid, content) SELECT id, content FROM blob_text WHERE content IS NOT NULL")
+        return True
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection.
+        """Get the shared writer connection.
+
+        Callers must hold ``self._lock``. Queries that don't modify the
+        database should borrow a connection from ``self._pool.reader()``.
 
         Returns:
             SQLite connection
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self._pool.writer
+
+    def close(self) -> None:
+        """Close all database connections."""
+        if self._rescan_executor is not None:
+            self._rescan_executor.shutdown(wait=True, cancel_futures=True)
+            self._rescan_executor = None
+        if self._prepare_executor is not None:
+            self._prepare_executor.shutdown(wait=True)
+            self._prepare_executor = None
+        self._decrypted.clear()
+        self._pool.close()
+
+    def add_observer(self, callback: Callable[[str, list[Any]], None]) -> None:
+        """Add observer for history changes.
+
+        Args:
+            callback: Function called with the event name and payload
+        """
+        self.observers.append(callback)
+
+    def remove_observer(self, callback: Callable[[str, list[Any]], None]) -> None:
+        """Remove observer.
+
+        Args:
+            callback: Observer to remove
+        """
+        if callback in self.observers:
+            self.observers.remove(callback)
+
+    def _notify_observers(self, event: str, payload: list[Any]) -> None:
+        """Notify all observers of a committed change.
+
+        Must be called without holding ``self._lock``.
+
+        Args:
+            event: "inserted", "deleted" or "cleared"
+            payload: Summaries of inserted entries or IDs of deleted ones
+        """
+        # Copy, since observers may be added or removed from another thread
+        for observer in list(self.observers):
+            try:
+                observer(event, payload)
+            except Exception as e:
+                print(f"Error notifying observer: {e}")
+
+    def _notify_inserted(self, ids: list[int | None]) -> None:
+        """Notify observers of newly inserted entries.
+
+        Args:
+            ids: IDs of inserted entries, with None for failed inserts
+        """
+        saved = [entry_id for entry_id in ids if entry_id is not None]
+        if not self.observers or not saved:
+            return
+
+        self._notify_observers("inserted", self.get_summaries_by_id(saved))
 
     def is_sensitive(self, content: str) -> bool:
         """Check if content contains sensitive data.
@@ -127,7 +979,7 @@ class StorageManager:
         """
         return self._security_manager.is_sensitive(content)
 
-    def save_entry(self, entry: dict[str, Any]) -> int | None:
+    def save_entry(self, entry: Mapping[str, Any]) -> int | None:
         """Save clipboard entry to database.
 
         Args:
@@ -137,34 +989,282 @@ class StorageManager:
             ID of saved entry or None on error
         """
         try:
-            with self._lock:
-                content = entry["content"]
-                encrypted = self.is_sensitive(content)
+            prepared = self._prepare_blob(entry["content"], entry.get("thumbnail"))
+            with self._lock, self._get_connection() as conn:
+                entry_id = self._insert_entry(conn, entry, prepared)
+        except sqlite3.Error:
+            return None
+        finally:
+            self._submit_rescans()
 
-                if encrypted:
-                    # Encrypt sensitive content
-                    content = self.cipher.encrypt(content.encode()).decode()
+        self._notify_inserted([entry_id])
+        return entry_id
 
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        """
-                        INSERT INTO clipboard_history
-                        (content, timestamp, content_type, encrypted, hash)
-                        VALUES (?, ?, ?, ?, ?)
-                        """,
-                        (
-                            content,
-                            entry["timestamp"],
-                            entry["content_type"],
-                            int(encrypted),
-                            entry["hash"],
-                        ),
-                    )
-                    conn.commit()
-                    return cursor.lastrowid
+    def save_entries(self, entries: Sequence[Mapping[str, Any]]) -> list[int | None]:
+        """Save several clipboard entries in a single transaction.
+
+        Entries that can't be inserted are skipped without aborting the
+        rest of the batch. Their content is prepared on the worker pool
+        first, and then all entries are inserted in order.
+
+        Args:
+            entries: Clipboard entries to save
+
+        Returns:
+            IDs of saved entries, with None for entries that failed
+        """
+        if not entries:
+            return []
+
+        try:
+            if len(entries) == 1 or self.prepare_workers <= 1:
+                prepared = [self._try_prepare(entry) for entry in entries]
+            else:
+                if self._prepare_executor is None:
+                    self._prepare_executor = ThreadPoolExecutor(max_workers=self.prepare_workers, thread_name_prefix="pasta-prepare")
+                prepared = list(self._prepare_executor.map(self._try_prepare, entries))
+
+            with self._lock, self._get_connection() as conn:
+                ids: list[int | None] = []
+                for entry, blob in zip(entries, prepared, strict=True):
+                    try:
+                        ids.append(None if blob is None else self._insert_entry(conn, entry, blob))
+                    except (KeyError, TypeError, sqlite3.IntegrityError, sqlite3.InterfaceError):
+                        ids.append(None)
         except sqlite3.Error:
+            return [None] * len(entries)
+        finally:
+            self._submit_rescans()
+
+        self._notify_inserted(ids)
+        return ids
+
+    def _try_prepare(self, entry: Mapping[str, Any]) -> PreparedBlob | None:
+        """Prepare the content of an entry of a batch.
+
+        Args:
+            entry: Clipboard entry
+
+        Returns:
+            Prepared content, or None if the entry is malformed
+        """
+        try:
+            return self._prepare_blob(entry["content"], entry.get("thumbnail"))
+        except (KeyError, TypeError, AttributeError):
             return None
 
+    def _insert_entry(self, conn: sqlite3.Connection, entry: Mapping[str, Any], prepared: PreparedBlob) -> int | None:
+        """Insert a single entry using an open writer connection.
+
+        Args:
+            conn: Writer connection, with ``self._lock`` held
+            entry: Clipboard entry to insert
+            prepared: The entry's content, from ``_prepare_blob``
+
+        Returns:
+            ID of the inserted row
+        """
+        blob_id = self._store_blob(conn, prepared)
+        if isinstance(entry, ClipboardEntry):
+            timestamp: Any = entry.timestamp
+            epoch_us = entry.epoch_us
+        else:
+            timestamp = entry["timestamp"]
+            epoch_us = self._epoch_us_or_zero(timestamp)
+
+        cursor = conn.execute(
+            """
+            INSERT INTO clipboard_history
+            (blob_id, timestamp, epoch_us, content_type, hash)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                blob_id,
+                timestamp,
+                epoch_us,
+                entry["content_type"],
+                entry["hash"],
+            ),
+        )
+        return cursor.lastrowid
+
+    def _prepare_blob(self, content: str | bytes, thumbnail: bytes | None = None) -> PreparedBlob:
+        """Hash, compress, classify and encrypt content, without the write lock.
+
+        Content that is already stored will be referenced rather than
+        stored again, so it skips sensitive-data detection and encryption.
+        Binary payloads are stored as-is: they are usually compressed
+        already, aren't searched, and aren't checked for sensitive data.
+
+        Args:
+            content: Plaintext content or binary payload
+            thumbnail: Small preview image of binary content
+
+        Returns:
+            Content ready for ``_store_blob``
+        """
+        blob_hash = self._content_hash(content)
+        with self._pool.reader() as conn:
+            if conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (blob_hash,)).fetchone():
+                return PreparedBlob(blob_hash, content)
+        return self._encode_blob(blob_hash, content, thumbnail)
+
+    def _encode_blob(self, blob_hash: str, content: str | bytes, thumbnail: bytes | None = None) -> PreparedBlob:
+        """Turn content into the values stored in the blobs table.
+
+        Args:
+            blob_hash: Hash of the content
+            content: Plaintext content or binary payload
+            thumbnail: Small preview image of binary content
+
+        Returns:
+            Content ready for ``_store_blob``
+        """
+        if isinstance(content, bytes):
+            return PreparedBlob(
+                blob_hash,
+                content,
+                stored=content,
+                size=len(content),
+                codec=self.CODEC_BINARY,
+                stored_size=len(content),
+                preview=self._binary_preview(content),
+                thumbnail=thumbnail,
+            )
+
+        raw = content.encode()
+        payload, codec = self._compress(raw)
+        stored: str | bytes = content if codec == self.CODEC_NONE else payload
+
+        verdict = self._security_manager.is_sensitive_within(content, self.scan_time_budget, self.scan_size_budget)
+        # Content not fully scanned in time is encrypted to be safe
+        encrypted = verdict is not False
+        cipher = self.cipher
+        if encrypted:
+            # Encrypt sensitive content; compression has to come first
+            stored = cipher.encrypt(payload).decode()
+
+        return PreparedBlob(
+            blob_hash,
+            content,
+            stored=stored,
+            encrypted=encrypted,
+            size=len(raw),
+            codec=codec,
+            stored_size=len(stored) if isinstance(stored, bytes) else len(stored.encode()),
+            preview="" if encrypted else content[: self.PREVIEW_LENGTH],
+            rescan=verdict is None and self.over_budget_policy == "background",
+            cipher=cipher if encrypted else None,
+        )
+
+    def _store_blob(self, conn: sqlite3.Connection, prepared: PreparedBlob) -> int:
+        """Get the blob holding prepared content, storing it if it's new.
+
+        Args:
+            conn: Writer connection, with ``self._lock`` held
+            prepared: Content from ``_prepare_blob``
+
+        Returns:
+            ID of the blob
+        """
+        row = conn.execute("SELECT id FROM blobs WHERE hash = ?", (prepared.hash,)).fetchone()
+        if row:
+            blob_id: int = row[0]
+            return blob_id
+        if prepared.stored is None:
+            # Deleted since it was prepared; rare enough to encode under the lock
+            prepared = self._encode_blob(prepared.hash, prepared.content, prepared.thumbnail)
+        elif prepared.cipher is not None and prepared.cipher is not self.cipher and isinstance(prepared.stored, str):
+            # The key was rotated since the content was encrypted
+            token = self.cipher.encrypt(prepared.cipher.decrypt(prepared.stored.encode())).decode()
+            prepared = replace(prepared, stored=token, stored_size=len(token), cipher=self.cipher)
+
+        cursor = conn.execute(
+            """
+            INSERT INTO blobs (hash, content, encrypted, size, codec, stored_size, preview, thumbnail)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                prepared.hash,
+                prepared.stored,
+                int(prepared.encrypted),
+                prepared.size,
+                prepared.codec,
+                prepared.stored_size,
+                prepared.preview,
+                prepared.thumbnail,
+            ),
+        )
+        blob_id = cursor.lastrowid or 0
+        if prepared.rescan:
+            # Not visible to the rescan's reader until the transaction commits
+            self._pending_rescans.append((blob_id, prepared.hash))
+        return blob_id
+
+    def _submit_rescans(self) -> None:
+        """Hand blobs stored over budget to the background rescan.
+
+        Called once the transaction that stored them has ended. Blobs whose
+        transaction was rolled back are no longer found by the rescan.
+        """
+        with self._lock:
+            pending, self._pending_rescans = self._pending_rescans, []
+            if not pending:
+                return
+            if self._rescan_executor is None:
+                self._rescan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pasta-rescan")
+            for blob_id, blob_hash in pending:
+                self._rescan_executor.submit(self._rescan_blob, blob_id, blob_hash)
+
+    def _rescan_blob(self, blob_id: int, blob_hash: str) -> None:
+        """Background thread: finish scanning content encrypted over budget.
+
+        If no sensitive data is found, the content is stored unencrypted,
+        which also adds it to the search index.
+
+        Args:
+            blob_id: ID of the blob
+            blob_hash: Hash of its content, in case the ID was reused
+        """
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT content, codec FROM blobs WHERE id = ? AND hash = ? AND encrypted = 1", (blob_id, blob_hash)
+                ).fetchone()
+            if row is None:
+                return
+
+            payload = self.cipher.decrypt(row["content"].encode())
+            codec = row["codec"]
+            content = (payload if codec == self.CODEC_NONE else self.CODECS[codec][1](payload)).decode()
+            if self._security_manager.is_sensitive_within(content) is not False:
+                return
+
+            stored: str | bytes = content if codec == self.CODEC_NONE else payload
+            with self._lock, self._get_connection() as conn:
+                conn.execute(
+                    """
+                    UPDATE blobs SET content = ?, encrypted = 0, stored_size = ?, preview = ?
+                    WHERE id = ? AND hash = ? AND encrypted = 1
+                    """,
+                    (stored, len(payload), content[: self.PREVIEW_LENGTH], blob_id, blob_hash),
+                )
+        except (sqlite3.Error, InvalidToken):
+            # Closed meanwhile, or the key was rotated; the content stays encrypted
+            pass
+
+    def _collect_garbage(self, conn: sqlite3.Connection) -> int:
+        """Delete blobs no longer referenced by any history entry.
+
+        Args:
+            conn: Writer connection, with ``self._lock`` held
+
+        Returns:
+            Number of blobs deleted
+        """
+        cursor = conn.execute("DELETE FROM blobs WHERE refcount <= 0")
+        return cursor.rowcount
+
     def get_entry(self, entry_id: int) -> dict[str, Any] | None:
         """Get a specific entry by ID.
 
@@ -174,14 +1274,33 @@ class StorageManager:
         Returns:
             Entry dict or None if not found
         """
-        with self._lock, self._get_connection() as conn:
-            cursor = conn.execute("SELECT * FROM clipboard_history WHERE id = ?", (entry_id,))
+        with self._pool.reader() as conn:
+            cursor = conn.execute(f"{self.ENTRY_SELECT} WHERE h.id = ?", (entry_id,))
             row = cursor.fetchone()
 
             if row:
                 return self._row_to_dict(row)
             return None
 
+    def get_content_by_hash(self, content_hash: str) -> str | bytes | None:
+        """Get stored content by its hash.
+
+        Args:
+            content_hash: Content hash, as in the ``hash`` of clipboard entries
+
+        Returns:
+            Decrypted, decompressed content, the payload of binary content,
+            or None if none is stored
+        """
+        with self._pool.reader() as conn:
+            row = conn.execute("SELECT content, encrypted, codec FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return self._decode_content(row["content"], row["codec"], bool(row["encrypted"]))
+        except Exception:
+            return None
+
     def get_entries(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
         """Get multiple entries.
 
@@ -192,11 +1311,11 @@ class StorageManager:
         Returns:
             List of entry dicts
         """
-        with self._lock, self._get_connection() as conn:
+        with self._pool.reader() as conn:
             cursor = conn.execute(
-                """
-                    SELECT * FROM clipboard_history
-                    ORDER BY timestamp DESC
+                f"""
+                    {self.ENTRY_SELECT}
+                    ORDER BY h.epoch_us DESC, h.id DESC
                     LIMIT ? OFFSET ?
                     """,
                 (limit, offset),
@@ -204,6 +1323,125 @@ class StorageManager:
 
             return [self._row_to_dict(row) for row in cursor]
 
+    def get_entries_after(self, cursor: tuple[int, int] | None = None, limit: int = 100) -> list[dict[str, Any]]:
+        """Get the page of entries that follows a cursor, newest first.
+
+        Unlike ``get_entries`` with an offset, each page is a single index
+        seek, so paging deep into a large history costs the same as
+        reading the first page.
+
+        Args:
+            cursor: ``page_cursor()`` of the last entry of the previous
+                page, or None for the first page
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of entry dicts
+        """
+        with self._pool.reader() as conn:
+            if cursor is None:
+                rows = conn.execute(
+                    f"{self.ENTRY_SELECT} ORDER BY h.epoch_us DESC, h.id DESC LIMIT ?",
+                    (limit,),
+                )
+            else:
+                rows = conn.execute(
+                    f"""
+                    {self.ENTRY_SELECT}
+                    WHERE (h.epoch_us, h.id) < (?, ?)
+                    ORDER BY h.epoch_us DESC, h.id DESC
+                    LIMIT ?
+                    """,
+                    (cursor[0], cursor[1], limit),
+                )
+
+            return [self._row_to_dict(row) for row in rows]
+
+    def get_summaries(self, limit: int = 100, cursor: tuple[int, int] | None = None) -> list[dict[str, Any]]:
+        """Get lightweight entry summaries for list views, newest first.
+
+        Summaries carry ``id``, ``preview``, ``content_type``, ``timestamp``
+        (as stored), ``epoch_us``, ``size`` in bytes and the ``encrypted``
+        flag, but no content. Nothing is decrypted or decompressed, and
+        encrypted entries have an empty preview; use ``get_entry`` to load
+        the full content of a single entry.
+
+        Args:
+            limit: Maximum number of summaries to return
+            cursor: ``page_cursor()`` of the last summary of the previous
+                page, or None for the first page
+
+        Returns:
+            List of summary dicts
+        """
+        with self._pool.reader() as conn:
+            if cursor is None:
+                rows = conn.execute(
+                    f"{self.SUMMARY_SELECT} ORDER BY h.epoch_us DESC, h.id DESC LIMIT ?",
+                    (limit,),
+                )
+            else:
+                rows = conn.execute(
+                    f"""
+                    {self.SUMMARY_SELECT}
+                    WHERE (h.epoch_us, h.id) < (?, ?)
+                    ORDER BY h.epoch_us DESC, h.id DESC
+                    LIMIT ?
+                    """,
+                    (cursor[0], cursor[1], limit),
+                )
+
+            return [dict(row) for row in rows]
+
+    def get_summaries_by_id(self, ids: Sequence[int]) -> list[dict[str, Any]]:
+        """Get the summaries of specific entries, newest first.
+
+        Args:
+            ids: Entry IDs; IDs of entries that no longer exist are ignored
+
+        Returns:
+            List of summary dicts, as returned by ``get_summaries``
+        """
+        if not ids:
+            return []
+
+        with self._pool.reader() as conn:
+            placeholders = ", ".join("?" * len(ids))
+            rows = conn.execute(
+                f"{self.SUMMARY_SELECT} WHERE h.id IN ({placeholders}) ORDER BY h.epoch_us DESC, h.id DESC",
+                list(ids),
+            )
+            return [dict(row) for row in rows]
+
+    @staticmethod
+    def page_cursor(entry: dict[str, Any]) -> tuple[int, int]:
+        """Get the pagination cursor for an entry.
+
+        Args:
+            entry: Entry or summary returned by this StorageManager
+
+        Returns:
+            Cursor to pass to ``get_entries_after``
+        """
+        return (entry["epoch_us"], entry["id"])
+
+    def iter_entries(self, page_size: int = 500) -> Iterator[dict[str, Any]]:
+        """Iterate over all entries, newest first, one page at a time.
+
+        Args:
+            page_size: Number of entries fetched per query
+
+        Yields:
+            Entry dicts
+        """
+        cursor = None
+        while True:
+            page = self.get_entries_after(cursor, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            cursor = self.page_cursor(page[-1])
+
     def _row_to_dict(self, row: sqlite3.Row) -> dict[str, Any]:
         """Convert database row to dictionary.
 
@@ -214,12 +1452,13 @@ class StorageManager:
             Entry dictionary
         """
         entry = dict(row)
+        codec = entry.pop("codec", self.CODEC_NONE)
 
-        # Decrypt if necessary
-        if entry["encrypted"]:
+        # Decrypt and decompress if necessary
+        if entry["encrypted"] or codec != self.CODEC_NONE:
             with contextlib.suppress(Exception):
-                # Decryption failed, return as-is
-                entry["content"] = self.cipher.decrypt(entry["content"].encode()).decode()
+                # Decoding failed, return as-is
+                entry["content"] = self._decode_content(entry["content"], codec, entry["encrypted"])
 
         # Convert timestamp string to datetime
         if isinstance(entry["timestamp"], str):
@@ -237,28 +1476,181 @@ class StorageManager:
             True if deleted, False otherwise
         """
         with self._lock, self._get_connection() as conn:
-            cursor = conn.execute("DELETE FROM clipboard_history WHERE id = ?", (entry_id,))
+            row = conn.execute(
+                "SELECT h.blob_id, b.encrypted, b.content FROM clipboard_history AS h JOIN blobs AS b ON b.id = h.blob_id WHERE h.id = ?",
+                (entry_id,),
+            ).fetchone()
+            if row is None:
+                return False
+
+            conn.execute("DELETE FROM clipboard_history WHERE id = ?", (entry_id,))
+            # Don't keep deleted content around until the next cleanup
+            blob_deleted = conn.execute("DELETE FROM blobs WHERE id = ? AND refcount <= 0", (row["blob_id"],)).rowcount > 0
             conn.commit()
-            return cursor.rowcount > 0
+        if blob_deleted and row["encrypted"]:
+            self._decrypted.discard(self._decrypted_key(row["content"]))
+
+        self._notify_observers("deleted", [entry_id])
+        return True
 
-    def search_entries(self, query: str) -> list[dict[str, Any]]:
+    def search_entries(self, query: str, limit: int | None = None, markers: tuple[str, str] = ("[", "]")) -> list[dict[str, Any]]:
         """Search entries by content.
 
+        Bare words match as prefixes and text in double quotes matches as a
+        phrase, so ``pyth "hello world"`` finds entries containing a word
+        starting with "pyth" and the exact phrase "hello world". Results are
+        ranked by relevance and carry a ``snippet`` with the matches wrapped
+        in ``markers``. Encrypted entries are never searched.
+
         Args:
             query: Search query
+            limit: Maximum number of results, or None for all
+            markers: Strings placed before and after each match in snippets
 
         Returns:
             List of matching entries
         """
-        with self._lock, self._get_connection() as conn:
+        if self.fts_enabled:
+            fts_query = self._build_fts_query(query)
+            if not fts_query:
+                return []
+
+            try:
+                with self._pool.reader() as conn:
+                    cursor = conn.execute(
+                        """
+                        SELECT h.*, b.content, b.encrypted, b.codec, b.thumbnail, snippet(clipboard_fts, 0, ?, ?, '...', 16) AS snippet
+                        FROM clipboard_fts
+                        JOIN blobs AS b ON b.id = clipboard_fts.rowid
+                        JOIN clipboard_history AS h ON h.blob_id = b.id
+                        WHERE clipboard_fts MATCH ?
+                        ORDER BY rank, h.epoch_us DESC
+                        LIMIT ?
+                        """,
+                        (markers[0], markers[1], fts_query, -1 if limit is None else limit),
+                    )
+                    return [self._row_to_dict(row) for row in cursor]
+            except sqlite3.OperationalError:
+                # Malformed FTS query - fall back to a plain substring search
+                pass
+
+        return self._search_entries_like(query, limit)
+
+    def iter_search_summaries(self, query: str, batch_size: int = 200) -> Generator[list[dict[str, Any]], None, None]:
+        """Stream summaries of entries matching a search, in batches.
+
+        Matching works as in ``search_entries`` and covers the full content
+        of every unencrypted entry, but only summaries are returned, so
+        nothing is decrypted or decompressed for the results. Each batch
+        is read with its own query and no connection is held between
+        batches, so a slow or abandoned consumer never blocks other readers
+        or writers. Close the iterator to abandon a search early.
+
+        Args:
+            query: Search query
+            batch_size: Number of summaries per batch
+
+        Yields:
+            Lists of summary dicts, best matches first
+        """
+        if self.fts_enabled:
+            fts_query = self._build_fts_query(query)
+            if not fts_query:
+                return
+
+            # New entries change the statistics ranking is based on, so the
+            # rank order can't be resumed between batches; only the matching
+            # IDs are read up front, and their summaries a batch at a time
+            try:
+                with self._pool.reader() as conn:
+                    rows = conn.execute(
+                        """
+                        SELECT h.id
+                        FROM clipboard_fts
+                        JOIN clipboard_history AS h ON h.blob_id = clipboard_fts.rowid
+                        WHERE clipboard_fts MATCH ?
+                        ORDER BY rank, h.epoch_us DESC
+                        """,
+                        (fts_query,),
+                    )
+                    ids = [row[0] for row in rows]
+            except sqlite3.OperationalError:
+                # Malformed FTS query - fall back to a plain substring search
+                pass
+            else:
+                for start in range(0, len(ids), batch_size):
+                    page = ids[start : start + batch_size]
+                    summaries = {summary["id"]: summary for summary in self.get_summaries_by_id(page)}
+                    # Entries deleted since the IDs were read are skipped
+                    if batch := [summaries[entry_id] for entry_id in page if entry_id in summaries]:
+                        yield batch
+                return
+
+        cursor: tuple[int, int] | None = None
+        while True:
+            keyset = "" if cursor is None else "AND (h.epoch_us, h.id) < (?, ?)"
+            with self._pool.reader() as conn:
+                rows = conn.execute(
+                    f"""
+                    {self.SUMMARY_SELECT}
+                    WHERE b.encrypted = 0 AND pasta_decode(b.content, b.codec, b.encrypted) LIKE ? {keyset}
+                    ORDER BY h.epoch_us DESC, h.id DESC
+                    LIMIT ?
+                    """,
+                    (f"%{query}%", *(cursor or ()), batch_size),
+                )
+                batch = [dict(row) for row in rows]
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            cursor = self.page_cursor(batch[-1])
+
+    @staticmethod
+    def _build_fts_query(query: str) -> str:
+        """Translate user input into an FTS5 MATCH expression.
+
+        Args:
+            query: Raw search text
+
+        Returns:
+            FTS5 query, or an empty string if there is nothing to search for
+        """
+        terms = []
+        for index, part in enumerate(query.split('"')):
+            # Odd parts were inside double quotes
+            if index % 2:
+                if part.strip():
+                    terms.append(f'"{part}"')
+                continue
+
+            for word in part.split():
+                word = word.rstrip("*")
+                if word:
+                    terms.append(f'"{word}"*')
+
+        return " ".join(terms)
+
+    def _search_entries_like(self, query: str, limit: int | None = None) -> list[dict[str, Any]]:
+        """Search entries with a substring scan when FTS5 isn't available.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results, or None for all
+
+        Returns:
+            List of matching entries
+        """
+        with self._pool.reader() as conn:
             # Don't search encrypted content
             cursor = conn.execute(
-                """
-                    SELECT * FROM clipboard_history
-                    WHERE encrypted = 0 AND content LIKE ?
-                    ORDER BY timestamp DESC
+                f"""
+                    {self.ENTRY_SELECT}
+                    WHERE b.encrypted = 0 AND pasta_decode(b.content, b.codec, b.encrypted) LIKE ?
+                    ORDER BY h.epoch_us DESC, h.id DESC
+                    LIMIT ?
                     """,
-                (f"%{query}%",),
+                (f"%{query}%", -1 if limit is None else limit),
             )
 
             return [self._row_to_dict(row) for row in cursor]
@@ -266,17 +1658,23 @@ class StorageManager:
     def cleanup_old_entries(self, days: int = 30) -> None:
         """Delete entries older than specified days.
 
+        Content blobs that are no longer referenced are deleted as well.
+
         Args:
             days: Number of days to keep
         """
         cutoff_date = datetime.now() - timedelta(days=days)
 
+        cutoff = self._epoch_us(cutoff_date)
+
         with self._lock, self._get_connection() as conn:
-            conn.execute(
-                "DELETE FROM clipboard_history WHERE timestamp < ?",
-                (cutoff_date,),
-            )
+            deleted = [row[0] for row in conn.execute("SELECT id FROM clipboard_history WHERE epoch_us < ?", (cutoff,))]
+            conn.execute("DELETE FROM clipboard_history WHERE epoch_us < ?", (cutoff,))
+            self._collect_garbage(conn)
             conn.commit()
+        if deleted:
+            self._decrypted.clear()
+            self._notify_observers("deleted", deleted)
 
     def get_history(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
         """Get clipboard history entries.
@@ -294,7 +1692,11 @@ class StorageManager:
         """Clear all clipboard history."""
         with self._lock, self._get_connection() as conn:
             conn.execute("DELETE FROM clipboard_history")
+            self._collect_garbage(conn)
             conn.commit()
+        self._decrypted.clear()
+
+        self._notify_observers("cleared", [])
 
     def get_statistics(self) -> dict[str, Any]:
         """Get storage statistics.
@@ -302,7 +1704,7 @@ class StorageManager:
         Returns:
             Statistics dictionary
         """
-        with self._lock, self._get_connection() as conn:
+        with self._pool.reader() as conn:
             # Total entries
             total = conn.execute("SELECT COUNT(*) FROM clipboard_history").fetchone()[0]
 
@@ -318,11 +1720,28 @@ class StorageManager:
             for row in cursor:
                 type_stats[row["content_type"]] = row["count"]
 
+            # Distinct payloads actually stored, and how well they compress
+            blobs = conn.execute(
+                f"""
+                    SELECT COUNT(*) AS unique_contents,
+                           COALESCE(SUM(size), 0) AS content_size,
+                           COALESCE(SUM(stored_size), 0) AS stored_size,
+                           COALESCE(SUM(codec NOT IN ('{self.CODEC_NONE}', '{self.CODEC_BINARY}')), 0) AS compressed_contents
+                    FROM blobs
+                    """
+            ).fetchone()
+
             # Database size
             db_size = Path(self.db_path).stat().st_size
 
             return {
                 "total_entries": total,
+                "unique_contents": blobs["unique_contents"],
+                "compressed_contents": blobs["compressed_contents"],
+                "content_size": blobs["content_size"],
+                "stored_size": blobs["stored_size"],
+                # Plaintext bytes per stored byte; 1.0 means no savings
+                "compression_ratio": blobs["content_size"] / blobs["stored_size"] if blobs["stored_size"] else 1.0,
                 "entries_by_type": type_stats,
                 "database_size": db_size,
             }
@@ -333,11 +1752,15 @@ class StorageManager:
         Returns:
             JSON string of entries
         """
-        entries = self.get_entries(limit=10000)  # Get all entries
+        entries = list(self.iter_entries())
 
-        # Convert datetime objects to strings
+        # Convert datetime objects and binary payloads to strings
         for entry in entries:
             entry["timestamp"] = entry["timestamp"].isoformat()
+            for key in ("content", "thumbnail"):
+                if isinstance(entry.get(key), bytes):
+                    entry[key] = base64.b64encode(entry[key]).decode()
+                    entry[f"{key}_encoding"] = "base64"
 
         return json.dumps(entries, indent=2)
 
@@ -357,41 +1780,247 @@ class StorageManager:
             # Convert timestamp string to datetime
             if isinstance(entry["timestamp"], str):
                 entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+            for key in ("content", "thumbnail"):
+                if entry.pop(f"{key}_encoding", None) == "base64":
+                    entry[key] = base64.b64decode(entry[key])
 
             if self.save_entry(entry):
                 count += 1
 
         return count
 
-    def rotate_encryption_key(self) -> None:
-        """Rotate encryption key and re-encrypt all sensitive data.
+    def rotate_encryption_key(self) -> int:
+        """Rotate the encryption key and re-encrypt all sensitive data.
 
-        This method generates a new encryption key and re-encrypts
-        all sensitive data in the database with the new key.
-        """
-        # Generate new key
-        new_key = Fernet.generate_key()
-        new_cipher = Fernet(new_key)
+        A new key is put in front of the current ones, so new content is
+        encrypted with it while existing content stays readable. Encrypted
+        blobs are then re-encrypted in batches of ``ROTATION_BATCH_SIZE``,
+        each in a short transaction of its own that also records how far
+        rotation got. Once all are done, the old keys are dropped.
+
+        An interrupted rotation is resumed instead of starting another.
 
-        # Re-encrypt all sensitive entries
+        Returns:
+            Number of blobs re-encrypted
+        """
+        keys = self._load_keys()
         with self._lock, self._get_connection() as conn:
-            cursor = conn.execute("SELECT id, content FROM clipboard_history WHERE encrypted = 1")
+            if len(keys) == 1:
+                keys = [Fernet.generate_key(), *keys]
+                # Persist the new key before anything is encrypted with it
+                self._write_keys(keys)
+                conn.execute("INSERT OR REPLACE INTO key_rotation (id, last_blob_id) VALUES (1, 0)")
+                last_id = 0
+            else:
+                row = conn.execute("SELECT last_blob_id FROM key_rotation").fetchone()
+                last_id = row[0] if row else 0
+            self.cipher = self._make_cipher(keys)
+        self._decrypted.clear()
+
+        rotated = 0
+        while True:
+            with self._pool.reader() as conn:
+                rows = conn.execute(
+                    "SELECT id, content FROM blobs WHERE encrypted = 1 AND id > ? ORDER BY id LIMIT ?",
+                    (last_id, self.ROTATION_BATCH_SIZE),
+                ).fetchall()
+
+            if not rows:
+                with self._lock, self._get_connection() as conn:
+                    # Content encrypted while the last batch was written
+                    if conn.execute("SELECT 1 FROM blobs WHERE encrypted = 1 AND id > ?", (last_id,)).fetchone():
+                        continue
+                    conn.execute("DELETE FROM key_rotation")
+                    self._write_keys(keys[:1])
+                    self.cipher = self._make_cipher(keys[:1])
+                self._decrypted.clear()
+                return rotated
+
+            updates = []
+            for row in rows:
+                with contextlib.suppress(InvalidToken):
+                    # Content no key can read is left as it is
+                    updates.append((self.cipher.rotate(row["content"].encode()).decode(), row["id"], row["content"]))
+            last_id = rows[-1]["id"]
+
+            with self._lock, self._get_connection() as conn:
+                # Skip blobs changed meanwhile, e.g. decrypted by a rescan
+                cursor = conn.executemany("UPDATE blobs SET content = ? WHERE id = ? AND content = ?", updates)
+                conn.execute("UPDATE key_rotation SET last_blob_id = ?", (last_id,))
+            rotated += max(cursor.rowcount, 0)
+
+
+class WriteBehindQueue:
+    """Persists clipboard entries in batches on a background thread.
+
+    Entries submitted within one flush window are written in a single
+    transaction, so a burst of copies costs one commit instead of one per
+    entry. The queue is bounded: when it is full, ``submit`` waits up to
+    ``put_timeout`` seconds for the writer to catch up and then rejects
+    the entry instead of stalling the caller.
 
-            for row in cursor.fetchall():
-                # Decrypt with old key
-                decrypted = self.cipher.decrypt(row["content"].encode()).decode()
+    Attributes:
+        storage: StorageManager entries are written to
+        batch_size: Maximum number of entries per transaction
+        flush_interval: Seconds to wait for more entries before committing
+        put_timeout: Seconds ``submit`` waits for room in a full queue
+        stats: Counters for written, failed and dropped entries and batches
+    """
 
-                # Encrypt with new key
-                encrypted = new_cipher.encrypt(decrypted.encode()).decode()
+    def __init__(
+        self,
+        storage: StorageManager,
+        max_pending: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        put_timeout: float = 0.05,
+    ) -> None:
+        """Initialize the queue.
 
-                # Update in database
-                conn.execute("UPDATE clipboard_history SET content = ? WHERE id = ?", (encrypted, row["id"]))
+        Args:
+            storage: StorageManager to write entries to
+            max_pending: Maximum number of entries waiting to be written
+            batch_size: Maximum number of entries per transaction
+            flush_interval: Seconds to wait for more entries before committing
+            put_timeout: Seconds ``submit`` waits for room in a full queue
+        """
+        self.storage = storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.stats = {"written": 0, "failed": 0, "dropped": 0, "batches": 0}
+        # Items are entries, flush markers (Event) or the stop sentinel (None)
+        self._queue: queue.Queue[Mapping[str, Any] | threading.Event | None] = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the writer thread if it isn't running."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pasta-history-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, entry: Mapping[str, Any], timeout: float | None = None) -> bool:
+        """Queue an entry to be written.
 
-            conn.commit()
+        Args:
+            entry: Clipboard entry to save
+            timeout: Seconds to wait for room, or None for ``put_timeout``
 
-        # Update cipher and save new key
-        self.cipher = new_cipher
-        key_file = Path(self.db_path).parent / ".pasta_key"
-        with open(key_file, "wb") as f:
-            f.write(new_key)
-        os.chmod(key_file, 0o600)
+        Returns:
+            True if the entry was queued, False if the queue stayed full
+        """
+        self.start()
+        try:
+            self._queue.put(entry, timeout=self.put_timeout if timeout is None else timeout)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every entry submitted so far has been written.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if all pending entries were written in time
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+
+        marker = threading.Event()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write all pending entries and stop the writer thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer to finish
+        """
+        with self._thread_lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None or not thread.is_alive():
+            return
+
+        with contextlib.suppress(queue.Full):
+            self._queue.put(None, timeout=timeout)
+        thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        """Approximate number of items waiting to be written."""
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        """Writer loop: collect a batch per flush window and commit it."""
+        while True:
+            item = self._queue.get()
+            batch: list[Mapping[str, Any]] = []
+            markers: list[threading.Event] = []
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is None:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    # Flush requested - commit what we have right away
+                    markers.append(item)
+                    break
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+            if stopping:
+                return
+
+    def _write_batch(self, batch: list[Mapping[str, Any]]) -> None:
+        """Write one batch of entries.
+
+        Args:
+            batch: Entries to write in a single transaction
+        """
+        if not batch:
+            return
+
+        try:
+            ids = list(self.storage.save_entries(batch))
+        except Exception:
+            # Never let a storage error kill the writer thread
+            ids = [None] * len(batch)
+
+        written = sum(1 for entry_id in ids if entry_id is not None)
+        self._count("batches")
+        self._count("written", written)
+        self._count("failed", len(batch) - written)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Increment a stats counter.
+
+        Args:
+            name: Counter to increment
+            amount: Amount to add
+        """
+        with self._stats_lock:
+            self.stats[name] += amount
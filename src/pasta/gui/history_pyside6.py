@@ -1,10 +1,26 @@
 """History window using PySide6."""
 
+import contextlib
+import sqlite3
 import sys
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from datetime import datetime
-
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QAction, QCloseEvent, QKeySequence, QShortcut
+from typing import Any
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    QRunnable,
+    Qt,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QAction, QCloseEvent, QImage, QKeySequence, QPixmap, QShortcut
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QApplication,
@@ -14,8 +30,7 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QMessageBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
@@ -24,12 +39,404 @@ from pasta.core.storage import StorageManager
 from pasta.utils.dock_manager import DockIconManager
 
 
+@dataclass(frozen=True, slots=True)
+class HistoryRow:
+    """Display values of one row of the history table.
+
+    Attributes:
+        entry_id: ID of the entry in storage
+        texts: Text of each column
+        thumbnail: PNG thumbnail of an image entry, if any
+    """
+
+    entry_id: int
+    texts: tuple[str, str, str, str]
+    thumbnail: bytes | None = None
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Table model that pages entry summaries in from storage on demand.
+
+    Rows are fetched newest first, one page at a time, as the view scrolls
+    towards the end of what has been loaded. Only the entry ID is kept for
+    every loaded row; display values are kept for the most recently used
+    pages and reloaded a page at a time when a row scrolled out of them is
+    shown again. Full content is loaded with ``StorageManager.get_entry``
+    when needed.
+
+    While showing search results, rows are supplied by ``append_rows``
+    instead of being fetched.
+    """
+
+    HEADERS = ("Content", "Type", "Timestamp", "Source")
+
+    # Number of decoded thumbnails kept
+    MAX_ICONS = 64
+
+    def __init__(self, storage_manager: StorageManager, page_size: int = 200, cached_pages: int = 3, parent: QObject | None = None) -> None:
+        """Initialize the model.
+
+        Args:
+            storage_manager: StorageManager to read summaries from
+            page_size: Number of rows fetched at a time
+            cached_pages: Number of pages of display values kept in memory
+            parent: Parent object (optional)
+        """
+        super().__init__(parent)
+        self.storage_manager = storage_manager
+        self.page_size = page_size
+        self.max_rows = page_size * max(cached_pages, 1)
+        # Entry ID of every loaded row, and display values of recently used ones
+        self._ids: list[int] = []
+        self._rows: OrderedDict[int, HistoryRow] = OrderedDict()
+        self._cursor: tuple[int, int] | None = None
+        self._has_more = True
+        self._searching = False
+        # Decoded thumbnails, made the first time a row is painted
+        self._icons: OrderedDict[int, QPixmap] = OrderedDict()
+
+    @property
+    def searching(self) -> bool:
+        """Whether the model is showing search results."""
+        return self._searching
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:  # noqa: N802
+        """Get the number of loaded rows.
+
+        Args:
+            parent: Parent index; the table has no children
+
+        Returns:
+            Number of rows
+        """
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:  # noqa: N802
+        """Get the number of columns.
+
+        Args:
+            parent: Parent index; the table has no children
+
+        Returns:
+            Number of columns
+        """
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Get the data shown in a cell.
+
+        Args:
+            index: Cell index
+            role: Requested data role
+
+        Returns:
+            Cell text for the display role, the entry ID for the user role,
+            an image entry's thumbnail for the decoration role, or None
+        """
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+
+        if role == Qt.ItemDataRole.UserRole:
+            return self._ids[index.row()]
+
+        row = self._row(index.row())
+        if row is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.texts[index.column()]
+        if role == Qt.ItemDataRole.DecorationRole and index.column() == 0 and row.thumbnail:
+            return self._icon(row)
+        return None
+
+    def _row(self, row: int) -> HistoryRow | None:
+        """Get the display values of a row, reloading its page if needed.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Display values, or None if the entry was deleted meanwhile
+        """
+        entry_id = self._ids[row]
+        cached = self._rows.get(entry_id)
+        if cached is not None:
+            self._rows.move_to_end(entry_id)
+            return cached
+
+        first = row - row % self.page_size
+        self._cache_rows(
+            self._make_row(entry) for entry in self.storage_manager.get_summaries_by_id(self._ids[first : first + self.page_size])
+        )
+        return self._rows.get(entry_id)
+
+    def _icon(self, row: HistoryRow) -> QPixmap:
+        """Get the decoded thumbnail of a row.
+
+        Args:
+            row: Display values with a thumbnail
+
+        Returns:
+            Thumbnail pixmap
+        """
+        icon = self._icons.get(row.entry_id)
+        if icon is not None:
+            self._icons.move_to_end(row.entry_id)
+            return icon
+
+        icon = self._icons[row.entry_id] = QPixmap()
+        icon.loadFromData(row.thumbnail or b"")
+        while len(self._icons) > self.MAX_ICONS:
+            self._icons.popitem(last=False)
+        return icon
+
+    def _cache_rows(self, rows: Iterable[HistoryRow]) -> list[int]:
+        """Keep the display values of rows, dropping the least recently used.
+
+        Args:
+            rows: Display values to keep
+
+        Returns:
+            Entry IDs of the rows, in order
+        """
+        ids = []
+        for row in rows:
+            self._rows[row.entry_id] = row
+            self._rows.move_to_end(row.entry_id)
+            ids.append(row.entry_id)
+        while len(self._rows) > self.max_rows:
+            entry_id, _ = self._rows.popitem(last=False)
+            self._icons.pop(entry_id, None)
+        return ids
+
+    def _reset_rows(self) -> None:
+        """Drop all loaded rows; call between beginResetModel and endResetModel."""
+        self._ids = []
+        self._rows.clear()
+        self._icons.clear()
+        self._cursor = None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:  # noqa: N802
+        """Get the column titles.
+
+        Args:
+            section: Column or row number
+            orientation: Header orientation
+            role: Requested data role
+
+        Returns:
+            Column title, or None
+        """
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> bool:  # noqa: N802
+        """Check whether storage may have older entries to load.
+
+        Args:
+            parent: Parent index; the table has no children
+
+        Returns:
+            True if another page can be fetched
+        """
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> None:  # noqa: N802
+        """Load the next page of entries.
+
+        Args:
+            parent: Parent index; the table has no children
+        """
+        if parent.isValid() or not self._has_more:
+            return
+
+        page = self.storage_manager.get_summaries(limit=self.page_size, cursor=self._cursor)
+        self._has_more = len(page) == self.page_size
+        if not page:
+            return
+
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._ids.extend(self._cache_rows(self._make_row(entry) for entry in page))
+        self.endInsertRows()
+        self._cursor = self.storage_manager.page_cursor(page[-1])
+
+    def reload(self) -> None:
+        """Drop all loaded rows and fetch the first page of history again."""
+        self.beginResetModel()
+        self._reset_rows()
+        self._has_more = True
+        self._searching = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def begin_search(self) -> None:
+        """Drop all loaded rows to make room for search results."""
+        self.beginResetModel()
+        self._reset_rows()
+        self._has_more = False
+        self._searching = True
+        self.endResetModel()
+
+    def append_rows(self, entries: list[dict[str, Any]]) -> None:
+        """Add entry summaries after the loaded rows.
+
+        Args:
+            entries: Entry summaries, e.g. a batch of search results
+        """
+        if not entries:
+            return
+
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._ids.extend(self._cache_rows(self._make_row(entry) for entry in entries))
+        self.endInsertRows()
+
+    def apply_change(self, event: str, payload: list[Any]) -> None:
+        """Apply a storage change notification to the loaded rows.
+
+        Args:
+            event: "inserted", "deleted" or "cleared"
+            payload: Summaries of inserted entries or IDs of deleted ones
+        """
+        if event == "inserted" and payload:
+            # New entries are the newest, so they go on top in the order given
+            self.beginInsertRows(QModelIndex(), 0, len(payload) - 1)
+            self._ids[0:0] = self._cache_rows(self._make_row(entry) for entry in payload)
+            self.endInsertRows()
+        elif event == "deleted":
+            deleted = set(payload)
+            rows = [row for row, entry_id in enumerate(self._ids) if entry_id in deleted]
+            # Remove contiguous runs from the bottom up so indices stay valid
+            while rows:
+                last = first = rows.pop()
+                while rows and rows[-1] == first - 1:
+                    first = rows.pop()
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self._ids[first : last + 1]
+                self.endRemoveRows()
+            for entry_id in deleted:
+                self._rows.pop(entry_id, None)
+                self._icons.pop(entry_id, None)
+        elif event == "cleared":
+            self.beginResetModel()
+            self._reset_rows()
+            self._has_more = False
+            self.endResetModel()
+
+    def entry_id(self, row: int) -> int | None:
+        """Get the storage ID of the entry shown in a row.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Entry ID, or None if the row doesn't exist
+        """
+        if 0 <= row < len(self._ids):
+            return self._ids[row]
+        return None
+
+    @staticmethod
+    def _make_row(entry: dict[str, Any]) -> HistoryRow:
+        """Build the display values for an entry summary.
+
+        Args:
+            entry: Entry summary from storage
+
+        Returns:
+            Table row
+        """
+        # Content preview (truncated for display); encrypted entries have none
+        content = "[Encrypted]" if entry.get("encrypted") else entry.get("preview", "")
+        if len(content) > 100:
+            content = content[:97] + "..."
+
+        timestamp = entry.get("timestamp", 0)
+
+        # Handle different timestamp formats
+        if isinstance(timestamp, datetime):
+            # Already a datetime object
+            dt = timestamp
+        elif isinstance(timestamp, str):
+            # ISO format string
+            dt = datetime.fromisoformat(timestamp)
+        elif isinstance(timestamp, int | float):
+            # Unix timestamp
+            dt = datetime.fromtimestamp(timestamp)
+        else:
+            # Fallback to current time
+            dt = datetime.now()
+
+        return HistoryRow(
+            entry_id=entry["id"],
+            texts=(content, entry.get("content_type", "text"), dt.strftime("%Y-%m-%d %H:%M:%S"), entry.get("source_app", "Unknown")),
+            thumbnail=entry.get("thumbnail"),
+        )
+
+
+class HistorySearchTask(QRunnable):
+    """Runs a history search on a worker thread and streams the results."""
+
+    def __init__(
+        self,
+        storage_manager: StorageManager,
+        query: str,
+        generation: int,
+        emit: Callable[[int, list[dict[str, Any]]], None],
+        is_stale: Callable[[int], bool],
+        batch_size: int = 200,
+    ) -> None:
+        """Initialize the task.
+
+        Args:
+            storage_manager: StorageManager to search
+            query: Search query
+            generation: Number identifying this search
+            emit: Called with the generation and each batch of results
+            is_stale: Called with the generation; True stops the search
+            batch_size: Number of results per batch
+        """
+        super().__init__()
+        self.storage_manager = storage_manager
+        self.query = query
+        self.generation = generation
+        self.emit = emit
+        self.is_stale = is_stale
+        self.batch_size = batch_size
+
+    def run(self) -> None:
+        """Search, emitting batches until done or superseded."""
+        if self.is_stale(self.generation):
+            return
+
+        try:
+            batches = self.storage_manager.iter_search_summaries(self.query, self.batch_size)
+            with contextlib.closing(batches):
+                for batch in batches:
+                    if self.is_stale(self.generation):
+                        return
+                    self.emit(self.generation, batch)
+        except (sqlite3.Error, RuntimeError):
+            # Storage closed or window deleted while searching
+            pass
+
+
 class HistoryWindow(QMainWindow):
     """Window for viewing and managing clipboard history."""
 
     # Signal emitted when window is closed
     closed = Signal()
 
+    # Carries storage change notifications to the GUI thread
+    storage_changed = Signal(str, object)
+
+    # Carries search result batches from the search thread: (generation, summaries)
+    search_results = Signal(int, object)
+
+    # Milliseconds of typing inactivity before a search runs
+    SEARCH_DEBOUNCE_MS = 250
+
     def __init__(self, storage_manager: StorageManager, parent: QWidget | None = None) -> None:
         """Initialize the history window.
 
@@ -74,18 +481,28 @@ class HistoryWindow(QMainWindow):
         self.search_input.textChanged.connect(self.filter_history)
         search_layout.addWidget(self.search_input)
 
+        # Searches run in storage on a worker thread once typing pauses;
+        # each gets a new generation so results of older ones are dropped
+        self._search_generation = 0
+        self._search_pool = QThreadPool(self)
+        self._search_pool.setMaxThreadCount(1)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._start_search)
+        self.search_results.connect(self._on_search_results)
+
         self.refresh_button = QPushButton("Refresh")
         self.refresh_button.clicked.connect(self.load_history)
         search_layout.addWidget(self.refresh_button)
 
         layout.addLayout(search_layout)
 
-        # History table
-        self.history_table = QTableWidget()
-        self.history_table.setColumnCount(4)
-        self.history_table.setHorizontalHeaderLabels(["Content", "Type", "Timestamp", "Source"])
+        # History table; rows are paged in from storage as the view scrolls
+        self.history_model = HistoryTableModel(storage_manager, parent=self)
+        self.history_table = QTableView()
+        self.history_table.setModel(self.history_model)
         self.history_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.history_table.setSortingEnabled(True)
 
         # Configure columns
         header = self.history_table.horizontalHeader()
@@ -125,10 +542,9 @@ class HistoryWindow(QMainWindow):
         # Load history
         self.load_history()
 
-        # Auto-refresh timer
-        self.refresh_timer = QTimer()
-        self.refresh_timer.timeout.connect(self.load_history)
-        self.refresh_timer.start(5000)  # Refresh every 5 seconds
+        # Keep the table in sync with storage instead of polling it
+        self.storage_changed.connect(self._apply_storage_change)
+        self.storage_manager.add_observer(self._on_storage_change)
 
     def _create_menu(self) -> None:
         """Create the menu bar."""
@@ -167,93 +583,111 @@ class HistoryWindow(QMainWindow):
         edit_menu.addAction(clear_action)
 
     def load_history(self) -> None:
-        """Load clipboard history from storage."""
-        history = self.storage_manager.get_history(limit=1000)
-
-        self.history_table.setRowCount(0)
-
-        for entry in history:
-            row = self.history_table.rowCount()
-            self.history_table.insertRow(row)
-
-            # Content (truncated for display)
-            content = entry.get("content", "")
-            if len(content) > 100:
-                content = content[:97] + "..."
-            content_item = QTableWidgetItem(content)
-            content_item.setData(Qt.ItemDataRole.UserRole, entry.get("id"))
-            self.history_table.setItem(row, 0, content_item)
-
-            # Type
-            content_type = entry.get("content_type", "text")
-            type_item = QTableWidgetItem(content_type)
-            self.history_table.setItem(row, 1, type_item)
-
-            # Timestamp
-            timestamp = entry.get("timestamp", 0)
-
-            # Handle different timestamp formats
-            if isinstance(timestamp, datetime):
-                # Already a datetime object
-                dt = timestamp
-            elif isinstance(timestamp, str):
-                # ISO format string
-                dt = datetime.fromisoformat(timestamp)
-            elif isinstance(timestamp, int | float):
-                # Unix timestamp
-                dt = datetime.fromtimestamp(timestamp)
-            else:
-                # Fallback to current time
-                dt = datetime.now()
-
-            time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-            time_item = QTableWidgetItem(time_str)
-            self.history_table.setItem(row, 2, time_item)
-
-            # Source
-            source = entry.get("source_app", "Unknown")
-            source_item = QTableWidgetItem(source)
-            self.history_table.setItem(row, 3, source_item)
+        """Load clipboard history from storage.
+
+        Only the first page of entry summaries is loaded; further pages are
+        fetched as the table scrolls, and full content when an entry is
+        copied. An active search is run again instead.
+        """
+        if self.search_input.text().strip():
+            self._start_search()
+        else:
+            self.history_model.reload()
+
+    def _on_storage_change(self, event: str, payload: list[Any]) -> None:
+        """Storage observer; may be called from the history writer thread.
+
+        Args:
+            event: "inserted", "deleted" or "cleared"
+            payload: Summaries of inserted entries or IDs of deleted ones
+        """
+        # Queued to the GUI thread when emitted from another thread
+        self.storage_changed.emit(event, payload)
+
+    def _apply_storage_change(self, event: str, payload: list[Any]) -> None:
+        """Apply a storage change to the table without reloading it.
+
+        Args:
+            event: "inserted", "deleted" or "cleared"
+            payload: Summaries of inserted entries or IDs of deleted ones
+        """
+        if event == "inserted" and self.history_model.searching:
+            # New entries may or may not match; search again once things settle
+            self._search_timer.start()
+            return
+        self.history_model.apply_change(event, payload)
 
     def filter_history(self, text: str) -> None:
-        """Filter history based on search text.
+        """Search history once typing pauses.
 
         Args:
             text: Search text
         """
-        for row in range(self.history_table.rowCount()):
-            match = False
-            for col in range(self.history_table.columnCount()):
-                item = self.history_table.item(row, col)
-                if item and text.lower() in item.text().lower():
-                    match = True
-                    break
-            self.history_table.setRowHidden(row, not match)
+        _ = text  # Read again when the search starts
+        self._search_timer.start()
+
+    def _start_search(self) -> None:
+        """Start searching storage for the current search text."""
+        self._search_timer.stop()
+        self._search_generation += 1
+        query = self.search_input.text().strip()
+        if not query:
+            self.history_model.reload()
+            return
+
+        self.history_model.begin_search()
+        self._search_pool.start(
+            HistorySearchTask(
+                self.storage_manager,
+                query,
+                self._search_generation,
+                self.search_results.emit,
+                self._is_stale_search,
+            )
+        )
+
+    def _is_stale_search(self, generation: int) -> bool:
+        """Check whether a newer search has started; called from the search thread.
+
+        Args:
+            generation: Generation of the search asking
+
+        Returns:
+            True if the search's results are no longer wanted
+        """
+        return generation != self._search_generation
+
+    def _on_search_results(self, generation: int, batch: list[dict[str, Any]]) -> None:
+        """Show a batch of search results if they belong to the current search.
+
+        Args:
+            generation: Generation of the search that produced the batch
+            batch: Entry summaries
+        """
+        if generation == self._search_generation and self.history_model.searching:
+            self.history_model.append_rows(batch)
 
     def copy_selected(self) -> None:
         """Copy selected item to clipboard."""
-        current_row = self.history_table.currentRow()
+        current_row = self.history_table.currentIndex().row()
         if current_row < 0:
             return
 
-        content_item = self.history_table.item(current_row, 0)
-        if content_item:
-            entry_id = content_item.data(Qt.ItemDataRole.UserRole)
-            if entry_id:
-                # Get full content from storage
-                entries = self.storage_manager.get_history(limit=1)
-                for entry in entries:
-                    if entry.get("id") == entry_id:
-                        content = entry.get("content", "")
-                        clipboard = QApplication.clipboard()
-                        clipboard.setText(content)
-                        break
+        entry_id = self.history_model.entry_id(current_row)
+        if entry_id:
+            # Get full content from storage
+            entry = self.storage_manager.get_entry(entry_id)
+            if entry:
+                clipboard = QApplication.clipboard()
+                content = entry.get("content", "")
+                if isinstance(content, bytes):
+                    clipboard.setImage(QImage.fromData(content))
+                else:
+                    clipboard.setText(content)
 
     def delete_selected(self) -> None:
         """Delete selected items from history."""
-        selected_rows = set()
-        for item in self.history_table.selectedItems():
-            selected_rows.add(item.row())
+        selected_rows = {index.row() for index in self.history_table.selectionModel().selectedRows()}
 
         if not selected_rows:
             return
@@ -269,19 +703,14 @@ class HistoryWindow(QMainWindow):
             # Get IDs to delete
             ids_to_delete = []
             for row in selected_rows:
-                content_item = self.history_table.item(row, 0)
-                if content_item:
-                    entry_id = content_item.data(Qt.ItemDataRole.UserRole)
-                    if entry_id:
-                        ids_to_delete.append(entry_id)
+                entry_id = self.history_model.entry_id(row)
+                if entry_id:
+                    ids_to_delete.append(entry_id)
 
-            # Delete from storage
+            # Delete from storage; rows are removed when storage reports the change
             for entry_id in ids_to_delete:
                 self.storage_manager.delete_entry(entry_id)
 
-            # Reload history
-            self.load_history()
-
     def clear_history(self) -> None:
         """Clear all history after confirmation."""
         reply = QMessageBox.question(
@@ -293,7 +722,6 @@ class HistoryWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             self.storage_manager.clear_history()
-            self.load_history()
 
     def closeEvent(self, event: QCloseEvent) -> None:  # noqa: N802
         """Handle window close event.
@@ -303,8 +731,10 @@ class HistoryWindow(QMainWindow):
         Args:
             event: The close event
         """
-        # Stop refresh timer
-        self.refresh_timer.stop()
+        # Stop listening for storage changes and abandon any running search
+        self.storage_manager.remove_observer(self._on_storage_change)
+        self._search_timer.stop()
+        self._search_generation += 1
 
         # Remove dock icon reference on macOS
         if sys.platform == "darwin":
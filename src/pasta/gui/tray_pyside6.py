@@ -4,6 +4,7 @@ import contextlib
 import sys
 import threading
 import webbrowser
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Any, cast
 
@@ -15,7 +16,7 @@ from pasta.core.clipboard import ClipboardManager
 from pasta.core.hotkeys import HotkeyManager
 from pasta.core.keyboard import PastaKeyboardEngine
 from pasta.core.settings import Settings, SettingsManager
-from pasta.core.storage import StorageManager
+from pasta.core.storage import StorageManager, WriteBehindQueue
 
 # We'll import these inline when needed to avoid circular imports
 from pasta.utils.permissions import PermissionChecker
@@ -24,7 +25,8 @@ from pasta.utils.permissions import PermissionChecker
 class ClipboardWorker(QObject):
     """Worker thread for clipboard monitoring."""
 
-    clipboard_changed = Signal(dict)
+    # ClipboardEntry objects or dicts, passed through without conversion
+    clipboard_changed = Signal(object)
 
     def __init__(self, clipboard_manager: ClipboardManager) -> None:
         """Initialize the worker."""
@@ -32,7 +34,7 @@ class ClipboardWorker(QObject):
         self.clipboard_manager = clipboard_manager
         self.clipboard_manager.register_callback(self._on_clipboard_change)
 
-    def _on_clipboard_change(self, entry: dict[str, Any]) -> None:
+    def _on_clipboard_change(self, entry: Mapping[str, Any]) -> None:
         """Handle clipboard change in worker thread."""
         self.clipboard_changed.emit(entry)
 
@@ -80,6 +82,9 @@ class SystemTray(QObject):
         self.paste_mode = self.settings_manager.settings.paste_mode
         self._lock = threading.Lock()
 
+        # Clipboard entries are persisted in batches off the GUI thread
+        self._history_writer = WriteBehindQueue(self.storage_manager)
+
         # Qt application
         self._app: QApplication | None = None
         self._init_qt_app()
@@ -305,16 +310,15 @@ class SystemTray(QObject):
             # Right-click is handled by context menu
             pass
 
-    def _on_clipboard_change(self, entry: dict[str, Any]) -> None:
+    def _on_clipboard_change(self, entry: Mapping[str, Any]) -> None:
         """Handle clipboard content change.
 
         Args:
             entry: Clipboard entry dict with content, timestamp, etc.
         """
-        # Always save to history, regardless of enabled state
-        with contextlib.suppress(Exception):
-            # Save to storage
-            self.storage_manager.save_entry(entry)
+        # Always save to history, regardless of enabled state. The entry is
+        # queued for the background writer so the event loop never waits on disk.
+        self._history_writer.submit(entry)
 
         # Note: Typing/clipboard modes now only affect how paste operations work,
         # not whether they happen automatically. Use the history window or
@@ -325,7 +329,8 @@ class SystemTray(QObject):
         if not self.enabled:
             return
 
-        # Get the most recent entry from history
+        # Get the most recent entry from history, including copies still queued for writing
+        self._history_writer.flush()
         entries = self.storage_manager.get_entries(limit=1)
         if not entries:
             return
@@ -427,6 +432,11 @@ class SystemTray(QObject):
         # Unregister hotkeys
         self.hotkey_manager.unregister_hotkeys()
 
+        # Write queued history entries, then release database connections
+        self._history_writer.stop()
+        with contextlib.suppress(Exception):
+            self.storage_manager.close()
+
         # Hide tray icon
         self.tray_icon.hide()
 
@@ -1,24 +1,139 @@
 """Security utilities for Pasta."""
 
+import hashlib
 import json
 import re
+import threading
 import time
-from collections import defaultdict
-from collections.abc import Callable
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 
+@dataclass(frozen=True, slots=True)
+class SensitiveMatch:
+    """A span of text matched by one sensitive data pattern.
+
+    Attributes:
+        data_type: Name of the pattern that matched
+        start: Index of the first matched character
+        end: Index after the last matched character
+    """
+
+    data_type: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True, slots=True)
+class Prefilter:
+    """Text that a pattern can't match without.
+
+    A pattern only needs to run on text containing one of its keywords,
+    or any digit if ``digits`` is set.
+
+    Attributes:
+        keywords: Literal strings, one of which every match contains
+        ignore_case: Whether keywords are matched ignoring case; they
+            must then be given in lowercase
+        digits: Whether every match contains a digit
+    """
+
+    keywords: tuple[str, ...] = ()
+    ignore_case: bool = False
+    digits: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledPatterns:
+    """One compiled set of patterns and their prefilters.
+
+    Attributes:
+        built_from: Patterns and prefilters this set was compiled from
+        patterns: Compiled pattern of each data type
+        unfiltered: Data types without a usable prefilter
+        digit_types: Data types only run on text with a digit
+        keywords: Case-sensitive keywords with the data types they select
+        folded_keywords: Ignore-case keywords with the data types they select
+    """
+
+    built_from: tuple[dict[str, str], dict[str, tuple[str, Prefilter]]]
+    patterns: dict[str, re.Pattern[str]]
+    unfiltered: tuple[str, ...]
+    digit_types: tuple[str, ...]
+    keywords: tuple[tuple[str, tuple[str, ...]], ...]
+    folded_keywords: tuple[tuple[str, tuple[str, ...]], ...]
+
+    @classmethod
+    def compile(cls, patterns: dict[str, str], prefilters: dict[str, tuple[str, Prefilter]]) -> "_CompiledPatterns":
+        """Compile patterns and index their prefilters.
+
+        Args:
+            patterns: Regex pattern of each data type; kept, so pass a copy
+            prefilters: Prefilter of each data type, with the pattern it
+                was written for; kept, so pass a copy
+
+        Returns:
+            Compiled set
+        """
+        unfiltered: list[str] = []
+        digit_types: list[str] = []
+        keywords: dict[str, list[str]] = defaultdict(list)
+        folded_keywords: dict[str, list[str]] = defaultdict(list)
+        for name, pattern in patterns.items():
+            written_for, prefilter = prefilters.get(name, (None, None))
+            if prefilter is None or written_for != pattern:
+                unfiltered.append(name)
+                continue
+            if prefilter.digits:
+                digit_types.append(name)
+            for keyword in prefilter.keywords:
+                (folded_keywords if prefilter.ignore_case else keywords)[keyword].append(name)
+        return cls(
+            built_from=(patterns, prefilters),
+            patterns={name: re.compile(pattern) for name, pattern in patterns.items()},
+            unfiltered=tuple(unfiltered),
+            digit_types=tuple(digit_types),
+            keywords=tuple((keyword, tuple(names)) for keyword, names in keywords.items()),
+            folded_keywords=tuple((keyword, tuple(names)) for keyword, names in folded_keywords.items()),
+        )
+
+
 class SensitiveDataDetector:
     """Detects sensitive data in clipboard content.
 
     This class identifies various types of sensitive information
     like credit cards, SSNs, passwords, etc.
 
+    Patterns are compiled once and recompiled only when ``patterns``
+    changes. One scan finds every match of every pattern; checking,
+    classifying and redacting the same text again reuse that scan. The
+    scanned text itself isn't kept, only a digest of it.
+
+    Before scanning, a prefilter looks for digits and for keywords the
+    patterns can't match without, and only the patterns whose keywords
+    occur are run. Most clipboard text clears the prefilter without any
+    pattern being run.
+
     Attributes:
         patterns: Dictionary of regex patterns for sensitive data
+        prefilters: Prefilter of each pattern, with the pattern it was
+            written for; it is ignored once that pattern changes
     """
 
+    # Characters that ignore-case regexes match to ASCII letters, but that
+    # str.lower() maps elsewhere: İ, ı and ſ (long s)
+    _FOLDED_CHARS = "\u0130\u0131\u017f"
+    _FOLD = str.maketrans(_FOLDED_CHARS, "iis")
+    _DIGIT = re.compile(r"\d")
+
+    # Characters is_sensitive_within() scans at a time, and how far each
+    # window reaches into the next so matches across the boundary are found
+    CHUNK_SIZE = 1 << 20
+    CHUNK_OVERLAP = 4096
+
     def __init__(self) -> None:
         """Initialize the sensitive data detector."""
         self.patterns: dict[str, str] = {
@@ -48,6 +163,145 @@ class SensitiveDataDetector:
             "db_url_postgres": r"postgres(?:ql)?://[^:]+:[^@]+@[^/]+(?:/\w+)?",
             "db_url_mysql": r"mysql://[^:]+:[^@]+@[^/]+(?:/\w+)?",
         }
+        digit = Prefilter(digits=True)
+        self.prefilters: dict[str, tuple[str, Prefilter]] = {
+            name: (self.patterns[name], prefilter)
+            for name, prefilter in {
+                "credit_card": digit,
+                "credit_card_no_space": digit,
+                "ssn": digit,
+                "password": Prefilter(("password", "passwd", "pwd"), ignore_case=True),
+                "api_key": Prefilter(("api",), ignore_case=True),
+                "secret": Prefilter(("secret", "token"), ignore_case=True),
+                "bearer_token": Prefilter(("bearer",), ignore_case=True),
+                "auth_header": Prefilter(("authorization", "x-api-key"), ignore_case=True),
+                "github_token": Prefilter(("github_pat_",)),
+                "gitlab_token": Prefilter(("glpat-",)),
+                "slack_token": Prefilter(("xox",)),
+                "aws_key": Prefilter(("AKIA",)),
+                "aws_secret": Prefilter(("aws_secret_access_key",), ignore_case=True),
+                "private_key_rsa": Prefilter(("-----BEGIN",)),
+                "private_key_general": Prefilter(("-----BEGIN",)),
+                "private_key_ec": Prefilter(("-----BEGIN",)),
+                "ssh_key": Prefilter(("ssh-rsa",)),
+                "db_url_postgres": Prefilter(("postgres",)),
+                "db_url_mysql": Prefilter(("mysql://",)),
+            }.items()
+        }
+        # Replaced as a whole when the patterns change, never modified, so
+        # scans on other threads always see one complete set
+        self._compiled = _CompiledPatterns.compile({}, {})
+        self._build_lock = threading.Lock()
+        self._last_scan: tuple[_CompiledPatterns, bytes, list[SensitiveMatch]] | None = None
+        self._metrics = {"scanned": 0, "cleared": 0, "patterns_run": 0, "patterns_skipped": 0, "over_budget": 0}
+        self._metrics_lock = threading.Lock()
+
+    def _build(self) -> _CompiledPatterns:
+        """Compile the patterns if they changed since the last call.
+
+        A changed set is compiled in full before it replaces the previous
+        one, so a scan running meanwhile uses one set or the other.
+
+        Returns:
+            Compiled patterns and prefilters
+        """
+        compiled = self._compiled
+        if (self.patterns, self.prefilters) != compiled.built_from:
+            with self._build_lock:
+                compiled = self._compiled
+                source = (dict(self.patterns), dict(self.prefilters))
+                if source != compiled.built_from:
+                    compiled = self._compiled = _CompiledPatterns.compile(*source)
+        return compiled
+
+    def _candidates(self, text: str, compiled: _CompiledPatterns) -> set[str]:
+        """Select the patterns that could match text.
+
+        Args:
+            text: Text to be scanned
+            compiled: Patterns and prefilters from ``_build()``
+
+        Returns:
+            Names of the patterns to run
+        """
+        candidates = set(compiled.unfiltered)
+        if compiled.digit_types and self._DIGIT.search(text):
+            candidates.update(compiled.digit_types)
+        for keyword, names in compiled.keywords:
+            if keyword in text:
+                candidates.update(names)
+        if compiled.folded_keywords:
+            if not text.isascii() and any(char in text for char in self._FOLDED_CHARS):
+                text = text.translate(self._FOLD)
+            folded = text.lower()
+            for keyword, names in compiled.folded_keywords:
+                if keyword in folded:
+                    candidates.update(names)
+        return candidates
+
+    def get_metrics(self) -> dict[str, int]:
+        """Get prefilter statistics.
+
+        Returns:
+            Number of texts scanned, of those cleared by the prefilter
+            alone and of those left undecided by a budget, and how many
+            pattern runs the prefilter made or saved
+        """
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def scan(self, text: str) -> list[SensitiveMatch]:
+        """Find all sensitive data in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by position, then by pattern
+        """
+        compiled = self._build()
+        digest = self._digest(text)
+        last = self._last_scan
+        # A scan with patterns since replaced doesn't count
+        if last is not None and last[0] is compiled and last[1] == digest:
+            return last[2]
+
+        candidates = self._candidates(text, compiled)
+        self._count(
+            scanned=1, cleared=not candidates, patterns_run=len(candidates), patterns_skipped=len(compiled.patterns) - len(candidates)
+        )
+
+        matches = [
+            SensitiveMatch(name, m.start(), m.end())
+            for name, pattern in compiled.patterns.items()
+            if name in candidates
+            for m in pattern.finditer(text)
+        ]
+        matches.sort(key=lambda match: match.start)
+        self._last_scan = (compiled, digest, matches)
+        return matches
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        """Identify text for the scan cache without keeping it.
+
+        Args:
+            text: Scanned text
+
+        Returns:
+            Digest of the text
+        """
+        return hashlib.blake2b(text.encode(errors="surrogatepass"), digest_size=16).digest()
+
+    def _count(self, **amounts: int) -> None:
+        """Add to the metrics.
+
+        Args:
+            **amounts: Amount to add to each counter
+        """
+        with self._metrics_lock:
+            for name, amount in amounts.items():
+                self._metrics[name] += amount
 
     def is_sensitive(self, text: str) -> bool:
         """Check if text contains sensitive data.
@@ -58,7 +312,76 @@ class SensitiveDataDetector:
         Returns:
             True if sensitive data is detected
         """
-        return any(re.search(pattern, text) for pattern in self.patterns.values())
+        return bool(self.scan(text))
+
+    def is_sensitive_within(self, text: str, time_budget: float | None = None, size_budget: int | None = None) -> bool | None:
+        """Check if text contains sensitive data, giving up past a budget.
+
+        Text is scanned in windows of ``CHUNK_SIZE`` characters, or of
+        ``size_budget`` characters if that is smaller, each prefiltered on
+        its own, and scanning stops at the first match. A window reaches
+        ``CHUNK_OVERLAP`` characters into the next one, so only matches
+        needing more than that to complete can be missed at a window
+        boundary. Windows end as if the text ended there, which can only
+        add matches. Nothing past ``size_budget`` is read.
+
+        The prefilter works on a copy of one window at a time, since
+        matching keywords regardless of case needs a lowercased copy
+        anyway. The patterns search the text in place, so lookbehinds and
+        word boundaries still see the text before a window. The deadline
+        is checked before the prefilter and before each pattern search.
+
+        Args:
+            text: Text to check
+            time_budget: Seconds to spend before giving up (optional)
+            size_budget: Characters to scan before giving up (optional)
+
+        Returns:
+            True or False, or None if the budget ran out first
+        """
+        compiled = self._build()
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        limit = len(text) if size_budget is None else min(len(text), max(size_budget, 0))
+        window = self.CHUNK_SIZE if size_budget is None else max(min(self.CHUNK_SIZE, size_budget), 1)
+
+        verdict, patterns_run = self._search_windows(text, compiled, limit, window, deadline)
+        if verdict is False and limit < len(text):
+            verdict = None
+        self._count(scanned=1, cleared=int(verdict is False and not patterns_run), over_budget=int(verdict is None))
+        return verdict
+
+    def _search_windows(
+        self, text: str, compiled: _CompiledPatterns, limit: int, window: int, deadline: float | None
+    ) -> tuple[bool | None, int]:
+        """Search the first ``limit`` characters of text window by window.
+
+        Args:
+            text: Text to search
+            compiled: Patterns and prefilters from ``_build()``
+            limit: Number of characters to search
+            window: Characters per window, not counting the overlap
+            deadline: ``time.monotonic()`` value to give up at (optional)
+
+        Returns:
+            Whether a pattern matched, or None if the deadline passed
+            first, and how many pattern searches ran
+        """
+        patterns_run = 0
+        for start in range(0, limit, window):
+            end = min(start + window + self.CHUNK_OVERLAP, limit)
+            if deadline is not None and time.monotonic() >= deadline:
+                return None, patterns_run
+            candidates = self._candidates(text[start:end], compiled)
+            self._count(patterns_skipped=len(compiled.patterns) - len(candidates))
+            for name in candidates:
+                # One search over a whole window can take a while
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None, patterns_run
+                patterns_run += 1
+                self._count(patterns_run=1)
+                if compiled.patterns[name].search(text, start, end):
+                    return True, patterns_run
+        return False, patterns_run
 
     def get_detected_types(self, text: str) -> list[str]:
         """Get types of sensitive data detected in text.
@@ -69,28 +392,32 @@ class SensitiveDataDetector:
         Returns:
             List of detected sensitive data types
         """
-        detected = []
-        for data_type, pattern in self.patterns.items():
-            if re.search(pattern, text):
-                detected.append(data_type)
-        return detected
+        found = {match.data_type for match in self.scan(text)}
+        return [data_type for data_type in self.patterns if data_type in found]
 
-    def add_pattern(self, pattern: str, name: str) -> None:
+    def add_pattern(self, pattern: str, name: str, prefilter: Prefilter | None = None) -> None:
         """Add a custom pattern for sensitive data detection.
 
         Args:
             pattern: Regex pattern to add
             name: Name for this pattern type
+            prefilter: Text the pattern can't match without, so it is
+                skipped for text without it (optional)
 
         Raises:
             ValueError: If pattern is invalid regex
         """
         try:
             re.compile(pattern)
-            self.patterns[name] = pattern
         except re.error as e:
             raise ValueError(f"Invalid regex pattern: {e}") from e
 
+        with self._build_lock:
+            self.patterns[name] = pattern
+            if prefilter is not None:
+                self.prefilters[name] = (pattern, prefilter)
+        self._build()
+
     def add_custom_pattern(self, name: str, pattern: str) -> None:
         """Add a custom pattern for sensitive data detection (alternate method).
 
@@ -113,17 +440,168 @@ class SensitiveDataDetector:
         Returns:
             Text with sensitive data replaced by redaction string
         """
-        redacted = text
-        for pattern in self.patterns.values():
-            redacted = re.sub(pattern, redaction, redacted)
-        return redacted
+        parts = []
+        position = 0
+        for match in self.scan(text):
+            if match.end <= position:
+                continue
+            if match.start >= position:
+                parts.append(text[position : match.start])
+                parts.append(redaction)
+            # Overlapping matches extend the span already redacted
+            position = match.end
+        parts.append(text[position:])
+        return "".join(parts)
+
+
+class SecretCache:
+    """Size-bounded LRU cache of decrypted content that wipes what it drops.
+
+    Values are kept in bytearrays, which are overwritten with zeros when
+    they are evicted, expire or the cache is cleared. Entries expire a
+    fixed time after they were added, however often they are used, and
+    a timer removes them even if the cache isn't touched again.
+
+    Attributes:
+        max_bytes: Total size of cached values
+        max_entries: Number of cached values
+        ttl: Seconds a value is kept
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 1 << 20,
+        max_entries: int = 256,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Total size of cached values
+            max_entries: Number of cached values
+            ttl: Seconds a value is kept
+            clock: Monotonic time source, replaceable for testing
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[bytearray, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        """Get the number of cached values."""
+        return len(self._entries)
+
+    def get(self, key: bytes) -> bytes | None:
+        """Get a cached value.
+
+        Args:
+            key: Key of the value
+
+        Returns:
+            Copy of the value, or None if it isn't cached or has expired
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[1] <= self._clock():
+                if item is not None:
+                    self._drop(key)
+                self._metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return bytes(item[0])
+
+    def put(self, key: bytes, value: bytes) -> None:
+        """Cache a value, evicting the least recently used ones to make room.
+
+        Args:
+            key: Key of the value
+            value: Value; not cached if larger than ``max_bytes``
+        """
+        if len(value) > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (bytearray(value), self._clock() + self.ttl)
+            self._size += len(value)
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._metrics["evictions"] += 1
+            if self._timer is None:
+                self._schedule()
+
+    def discard(self, key: bytes) -> None:
+        """Wipe and remove a value if it is cached.
+
+        Args:
+            key: Key of the value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self) -> None:
+        """Wipe and remove all values."""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def get_metrics(self) -> dict[str, int]:
+        """Get cache statistics.
+
+        Returns:
+            Hits, misses, evictions for lack of room, and cached bytes
+        """
+        with self._lock:
+            return {**self._metrics, "bytes": self._size}
+
+    def _drop(self, key: bytes) -> None:
+        """Wipe and remove a value; the lock must be held.
+
+        Args:
+            key: Key of the value
+        """
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+        # Overwrite in place, like SecurityManager.secure_wipe
+        value[:] = bytes(len(value))
+
+    def _schedule(self) -> None:
+        """Start a timer for the next expiry; the lock must be held."""
+        if not self._entries:
+            self._timer = None
+            return
+        delay = max(0.0, min(expires for _, expires in self._entries.values()) - self._clock())
+        self._timer = threading.Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self) -> None:
+        """Timer thread: wipe expired values."""
+        with self._lock:
+            now = self._clock()
+            for key in [key for key, (_, expires) in self._entries.items() if expires <= now]:
+                self._drop(key)
+            self._schedule()
 
 
 class RateLimiter:
     """Rate limiter to prevent abuse and system overload.
 
     This class implements a sliding window rate limiter
-    for different types of operations.
+    for different types of operations. Each action keeps at most
+    its request limit of timestamps, oldest first, so checks only
+    drop expired requests from the front of the window.
 
     Attributes:
         limits: Dictionary of action limits (count, window_seconds)
@@ -141,7 +619,8 @@ class RateLimiter:
             "clipboard_read": (100, 60),  # 100 clipboard reads per 60 seconds
             "large_paste": (5, 300),  # 5 large pastes per 5 minutes
         }
-        self.history: dict[str, list[float]] = defaultdict(list)
+        self.history: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.RLock()
         self._state_file: Path | None = None
 
     def set_limit(self, action: str, max_requests: int, window_seconds: int) -> None:
@@ -152,7 +631,51 @@ class RateLimiter:
             max_requests: Maximum requests allowed
             window_seconds: Time window in seconds
         """
-        self.limits[action] = (max_requests, window_seconds)
+        with self._lock:
+            self.limits[action] = (max_requests, window_seconds)
+            if action in self.history:
+                self._window(action)
+
+    def _window(self, action: str) -> deque[float]:
+        """Get the timestamps of a limited action, bounded to its limit.
+
+        Only the newest max_requests timestamps can ever decide a check,
+        so older ones are dropped as new requests are recorded.
+
+        Args:
+            action: Action listed in limits
+
+        Returns:
+            The action's timestamps, oldest first
+        """
+        max_count = self.limits[action][0]
+        window = self.history.get(action)
+        if window is None or window.maxlen != max_count:
+            window = deque(window or (), maxlen=max_count)
+            self.history[action] = window
+        return window
+
+    def _prune(self, action: str) -> tuple[deque[float], float]:
+        """Drop timestamps that have left an action's window.
+
+        Args:
+            action: Action listed in limits
+
+        Returns:
+            Tuple of the remaining timestamps and the window cutoff
+        """
+        window = self._window(action)
+        cutoff = time.time() - self.limits[action][1]
+        while window and window[0] <= cutoff:
+            window.popleft()
+        return window, cutoff
+
+    @staticmethod
+    def _resolve(action: str, size: int | None) -> str:
+        """Map large pastes onto their own limit."""
+        if action == "paste" and size and size > 10000:
+            return "large_paste"
+        return action
 
     def check_limit(self, action: str, size: int | None = None) -> bool:
         """Check if action is allowed under rate limits.
@@ -164,23 +687,15 @@ class RateLimiter:
         Returns:
             True if action is allowed
         """
-        # Auto-detect large paste
-        if action == "paste" and size and size > 10000:
-            action = "large_paste"
+        action = self._resolve(action, size)
 
         # Unknown actions are always allowed
         if action not in self.limits:
             return True
 
-        max_count, window_seconds = self.limits[action]
-        now = time.time()
-        cutoff = now - window_seconds
-
-        # Clean old entries
-        self.history[action] = [t for t in self.history[action] if t > cutoff]
-
-        # Check limit
-        return len(self.history[action]) < max_count
+        with self._lock:
+            window, _ = self._prune(action)
+            return len(window) < self.limits[action][0]
 
     def record_request(self, action: str, size: int | None = None) -> None:
         """Record that a request was made.
@@ -189,12 +704,11 @@ class RateLimiter:
             action: Action that was performed
             size: Size of data (for auto-detecting large operations)
         """
-        # Auto-detect large paste
-        if action == "paste" and size and size > 10000:
-            action = "large_paste"
+        action = self._resolve(action, size)
 
         if action in self.limits:
-            self.history[action].append(time.time())
+            with self._lock:
+                self._window(action).append(time.time())
 
     def reset(self, action: str) -> None:
         """Reset rate limit for specific action.
@@ -202,12 +716,16 @@ class RateLimiter:
         Args:
             action: Action to reset
         """
-        if action in self.history:
-            self.history[action].clear()
+        with self._lock:
+            if action in self.history:
+                self.history[action].clear()
 
     def is_allowed(self, action: str, size: int | None = None) -> bool:
         """Check if action is allowed under rate limits and record it.
 
+        The check and the record happen under one lock, so concurrent
+        callers can't both take the last slot.
+
         Args:
             action: Type of action to check
             size: Size of data (for auto-detecting large operations)
@@ -215,10 +733,11 @@ class RateLimiter:
         Returns:
             True if action is allowed
         """
-        if self.check_limit(action, size):
-            self.record_request(action, size)
-            return True
-        return False
+        with self._lock:
+            if self.check_limit(action, size):
+                self.record_request(action, size)
+                return True
+            return False
 
     def get_remaining_quota(self, action: str) -> int | None:
         """Get remaining quota for an action.
@@ -232,13 +751,29 @@ class RateLimiter:
         if action not in self.limits:
             return None
 
-        max_count, window_seconds = self.limits[action]
-        now = time.time()
-        cutoff = now - window_seconds
+        with self._lock:
+            window, _ = self._prune(action)
+            return self.limits[action][0] - len(window)
 
-        # Count recent actions
-        recent_count = sum(1 for t in self.history[action] if t > cutoff)
-        return max_count - recent_count
+    def get_retry_after(self, action: str) -> float:
+        """Get how long until an action is allowed again.
+
+        Args:
+            action: Action to check
+
+        Returns:
+            Seconds to wait, or 0.0 if the action is allowed now
+        """
+        if action not in self.limits:
+            return 0.0
+
+        with self._lock:
+            window, cutoff = self._prune(action)
+            if len(window) < self.limits[action][0]:
+                return 0.0
+
+            # The window holds exactly max_count requests; the oldest frees the next slot
+            return window[0] - cutoff
 
     def reset_action(self, action: str) -> None:
         """Reset rate limit for specific action.
@@ -246,17 +781,25 @@ class RateLimiter:
         Args:
             action: Action to reset
         """
-        if action in self.history:
-            self.history[action].clear()
+        self.reset(action)
 
     def save_state(self, file_path: str) -> None:
         """Save rate limiter state to file.
 
+        Only requests still inside their window are written.
+
         Args:
             file_path: Path to save state file
         """
-        state = {"limits": self.limits, "history": {k: list(v) for k, v in self.history.items()}}
-        Path(file_path).write_text(json.dumps(state, indent=2))
+        with self._lock:
+            history = {}
+            for action in list(self.history):
+                if action in self.limits:
+                    window, _ = self._prune(action)
+                    if window:
+                        history[action] = list(window)
+            state = {"limits": self.limits, "history": history}
+        Path(file_path).write_text(json.dumps(state, separators=(",", ":")))
 
     def load_state(self, file_path: str) -> None:
         """Load rate limiter state from file.
@@ -266,11 +809,88 @@ class RateLimiter:
         """
         try:
             state = json.loads(Path(file_path).read_text())
-            self.limits = state.get("limits", self.limits)
-            self.history = defaultdict(list, {k: list(v) for k, v in state.get("history", {}).items()})
+            limits = {action: (int(count), int(window)) for action, (count, window) in state.get("limits", {}).items()}
+            history = {action: sorted(map(float, stamps)) for action, stamps in state.get("history", {}).items()}
         except Exception:
             # If loading fails, start fresh
-            pass
+            return
+
+        with self._lock:
+            self.limits = limits or self.limits
+            self.history = defaultdict(deque)
+            for action, stamps in history.items():
+                if action in self.limits:
+                    self._window(action).extend(stamps)
+
+
+class ExclusionMatcher:
+    """Compiled privacy exclusions.
+
+    Excluded app names are folded into one alternation searched in the
+    lowercased window title; window and content patterns are compiled
+    once up front.
+    """
+
+    def __init__(self, apps: Iterable[str] = (), window_patterns: Iterable[str] = (), content_patterns: Iterable[str] = ()) -> None:
+        """Compile the exclusions.
+
+        Args:
+            apps: Application names matched as substrings of the window title
+            window_patterns: Regex patterns matched against the window title
+            content_patterns: Regex patterns matched against the content
+
+        Raises:
+            re.error: If a pattern is invalid regex
+        """
+        names = sorted({app.lower() for app in apps}, key=len, reverse=True)
+        self._apps = re.compile("|".join(map(re.escape, names))) if names else None
+        self._windows = tuple(re.compile(pattern) for pattern in window_patterns)
+        self._contents = tuple(re.compile(pattern) for pattern in content_patterns)
+
+    def excludes_app(self, window: str) -> bool:
+        """Check if a window belongs to an excluded application.
+
+        Args:
+            window: Active window title
+
+        Returns:
+            True if an excluded app name appears in the title
+        """
+        return self._apps is not None and self._apps.search(window.lower()) is not None
+
+    def excludes_window(self, window: str) -> bool:
+        """Check if a window is excluded by app name or window pattern.
+
+        Args:
+            window: Active window title
+
+        Returns:
+            True if the window is excluded
+        """
+        return self.excludes_app(window) or any(pattern.search(window) for pattern in self._windows)
+
+    def excludes_content(self, content: str) -> bool:
+        """Check if content matches an excluded pattern.
+
+        Args:
+            content: Clipboard content
+
+        Returns:
+            True if the content is excluded
+        """
+        return any(pattern.search(content) for pattern in self._contents)
+
+    def excludes(self, window: str, content: str) -> bool:
+        """Check window and content exclusions in one call.
+
+        Args:
+            window: Active window title
+            content: Clipboard content
+
+        Returns:
+            True if either is excluded
+        """
+        return self.excludes_window(window) or self.excludes_content(content)
 
 
 class PrivacyManager:
@@ -285,16 +905,21 @@ class PrivacyManager:
         excluded_patterns: List of regex patterns to exclude
     """
 
-    def __init__(self, default_excluded_apps: list[str] | None = None) -> None:
+    def __init__(self, default_excluded_apps: list[str] | None = None, active_window_ttl: float = 0.5) -> None:
         """Initialize the privacy manager.
 
         Args:
             default_excluded_apps: List of apps to exclude by default
+            active_window_ttl: Seconds an active window lookup is reused for
         """
         self.privacy_mode = False
         self.excluded_apps: set[str] = set()
         self.excluded_patterns: list[str] = []
         self.excluded_window_patterns: list[str] = []
+        self.active_window_ttl = active_window_ttl
+        self._matcher = ExclusionMatcher()
+        self._built_from: tuple[set[str], list[str], list[str]] = (set(), [], [])
+        self._active_window: tuple[float, str] | None = None
 
         # Add default exclusions
         if default_excluded_apps:
@@ -315,17 +940,18 @@ class PrivacyManager:
         if self.privacy_mode:
             return False
 
-        # Check excluded applications
-        window_lower = active_window.lower()
-        if any(app in window_lower for app in self.excluded_apps):
-            return False
+        return not self.get_matcher().excludes(active_window, content)
 
-        # Check excluded window patterns
-        if any(re.search(pattern, active_window) for pattern in self.excluded_window_patterns):
-            return False
+    def get_matcher(self) -> ExclusionMatcher:
+        """Get the compiled exclusions, rebuilding them if they changed.
 
-        # Check excluded patterns
-        return all(not re.search(pattern, content) for pattern in self.excluded_patterns)
+        Returns:
+            Matcher for the current exclusions
+        """
+        if (self.excluded_apps, self.excluded_window_patterns, self.excluded_patterns) != self._built_from:
+            self._matcher = ExclusionMatcher(self.excluded_apps, self.excluded_window_patterns, self.excluded_patterns)
+            self._built_from = (set(self.excluded_apps), list(self.excluded_window_patterns), list(self.excluded_patterns))
+        return self._matcher
 
     def set_privacy_mode(self, enabled: bool) -> None:
         """Enable or disable privacy mode.
@@ -466,6 +1092,28 @@ class PrivacyManager:
 
         return _temporary_privacy()
 
+    def get_active_window(self) -> str:
+        """Get the active window title, reusing a recent lookup.
+
+        Querying the window system spawns a process on macOS and Linux,
+        so a title is reused for active_window_ttl seconds.
+
+        Returns:
+            Active window title or empty string if unable to determine
+        """
+        now = time.monotonic()
+        cached = self._active_window
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        title = self._get_active_window()
+        self._active_window = (now + self.active_window_ttl, title)
+        return title
+
+    def invalidate_active_window(self) -> None:
+        """Forget the cached active window so the next lookup queries it."""
+        self._active_window = None
+
     def _get_active_window(self) -> str:
         """Get the active window title.
 
@@ -520,6 +1168,22 @@ class SecurityManager:
             self._audit_callback("sensitive_data_detected", {"content_length": len(text)})
         return is_sensitive
 
+    def is_sensitive_within(self, text: str, time_budget: float | None = None, size_budget: int | None = None) -> bool | None:
+        """Check if text contains sensitive data, giving up past a budget.
+
+        Args:
+            text: Text to check
+            time_budget: Seconds to spend before giving up (optional)
+            size_budget: Characters to scan before giving up (optional)
+
+        Returns:
+            True or False, or None if the budget ran out first
+        """
+        is_sensitive = self.detector.is_sensitive_within(text, time_budget, size_budget)
+        if is_sensitive and self._audit_callback:
+            self._audit_callback("sensitive_data_detected", {"content_length": len(text)})
+        return is_sensitive
+
     def enable_privacy_mode(self) -> None:
         """Enable privacy mode."""
         self._privacy_mode = True
@@ -573,10 +1237,7 @@ class SecurityManager:
             return False
 
         try:
-            from pasta.utils.platform import get_active_window_title
-
-            active_window = get_active_window_title()
-            return not any(app in active_window.lower() for app in self.privacy.excluded_apps)
+            return not self.privacy.get_matcher().excludes_app(self.privacy.get_active_window())
         except Exception:
             return True
 
@@ -633,7 +1294,7 @@ class SecurityManager:
             return False
 
         # Check excluded apps
-        return not any(app in window_title.lower() for app in self.privacy.excluded_apps)
+        return not self.privacy.get_matcher().excludes_app(window_title)
 
     def get_security_status(self) -> dict[str, Any]:
         """Get current security status.
@@ -332,6 +332,7 @@ class TestClipboardMonitoringE2E:
 
         # The worker would normally emit this to the tray
         tray._on_clipboard_change(test_entry)
+        assert tray._history_writer.flush()
 
         # Verify it was saved
         entries = storage_manager.get_entries()
@@ -83,7 +83,7 @@ class TestMacOSShortcuts(unittest.TestCase):
         """Test that history window has proper shortcuts."""
         # Create mock storage manager
         mock_storage = Mock(spec=StorageManager)
-        mock_storage.get_history.return_value = []
+        mock_storage.get_summaries.return_value = []
 
         # Create history window
         window = HistoryWindow(mock_storage)
@@ -99,7 +99,7 @@ class TestMacOSUIIntegration(unittest.TestCase):
         """Test history window behavior on macOS."""
         # Create mock storage manager
         mock_storage = Mock(spec=StorageManager)
-        mock_storage.get_history.return_value = []
+        mock_storage.get_summaries.return_value = []
 
         # Create history window
         window = HistoryWindow(mock_storage)
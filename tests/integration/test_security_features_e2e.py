@@ -173,6 +173,8 @@ class TestSecurityFeaturesE2E:
         with patch("pasta.utils.platform.get_active_window_title", return_value="1Password - Login"):
             assert security_manager.should_process_clipboard() is False
 
+        # Window lookups are cached briefly; simulate the focus change expiring it
+        security_manager.privacy.invalidate_active_window()
         with patch("pasta.utils.platform.get_active_window_title", return_value="Chrome - Google"):
             assert security_manager.should_process_clipboard() is True
 
@@ -95,7 +95,7 @@ class TestSystemTrayIntegration:
     def test_clipboard_to_paste_flow(self, tray, components):
         """Test full flow from clipboard change to history storage."""
         with (
-            patch.object(components["storage_manager"], "save_entry") as mock_save,
+            patch.object(components["storage_manager"], "save_entries") as mock_save,
             patch.object(components["keyboard_engine"], "paste_text") as mock_paste,
         ):
             # Simulate clipboard content through the tray's handler
@@ -103,9 +103,10 @@ class TestSystemTrayIntegration:
 
             # Call the tray's clipboard change handler directly
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
             # Verify entry was saved to storage (NOT pasted)
-            mock_save.assert_called_once_with(test_entry)
+            mock_save.assert_called_once_with([test_entry])
 
             # Verify paste was NOT triggered (this is the fix we implemented)
             mock_paste.assert_not_called()
@@ -155,7 +156,7 @@ class TestSystemTrayIntegration:
     def test_paste_mode_integration(self, tray, components):
         """Test paste mode triggers appropriate paste behavior."""
         with (
-            patch.object(components["storage_manager"], "save_entry") as mock_save,
+            patch.object(components["storage_manager"], "save_entries") as mock_save,
             patch.object(components["keyboard_engine"], "paste_text") as mock_paste,
         ):
             test_entry = {"content": "test", "timestamp": "2024-01-01", "hash": "abc", "type": "text"}
@@ -163,7 +164,8 @@ class TestSystemTrayIntegration:
             # Test auto mode - should only save to history, no paste
             tray.set_paste_mode("auto")
             tray._on_clipboard_change(test_entry)
-            mock_save.assert_called_with(test_entry)
+            assert tray._history_writer.flush()
+            mock_save.assert_called_with([test_entry])
             mock_paste.assert_not_called()
             mock_save.reset_mock()
             mock_paste.reset_mock()
@@ -171,7 +173,8 @@ class TestSystemTrayIntegration:
             # Test clipboard mode - should only save to history
             tray.set_paste_mode("clipboard")
             tray._on_clipboard_change(test_entry)
-            mock_save.assert_called_with(test_entry)
+            assert tray._history_writer.flush()
+            mock_save.assert_called_with([test_entry])
             mock_paste.assert_not_called()
             mock_save.reset_mock()
             mock_paste.reset_mock()
@@ -179,7 +182,8 @@ class TestSystemTrayIntegration:
             # Test typing mode - should only save to history
             tray.set_paste_mode("typing")
             tray._on_clipboard_change(test_entry)
-            mock_save.assert_called_with(test_entry)
+            assert tray._history_writer.flush()
+            mock_save.assert_called_with([test_entry])
             mock_paste.assert_not_called()
 
     def test_sensitive_data_handling(self, tray, components):
@@ -238,18 +242,20 @@ class TestSystemTrayIntegration:
         test_entry = {"content": "test content", "timestamp": "2024-01-01", "hash": "abc", "type": "text"}
 
         # Simulate storage error
-        with patch.object(components["storage_manager"], "save_entry", side_effect=Exception("Test error")):
+        with patch.object(components["storage_manager"], "save_entries", side_effect=Exception("Test error")):
             # Should not crash
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
         # System should still be functional
         assert tray.enabled is True
 
         # Next save should work
-        with patch.object(components["storage_manager"], "save_entry") as mock_save:
+        with patch.object(components["storage_manager"], "save_entries") as mock_save:
             test_entry2 = {"content": "another test", "timestamp": "2024-01-01", "hash": "def", "type": "text"}
             tray._on_clipboard_change(test_entry2)
-            mock_save.assert_called_once_with(test_entry2)
+            assert tray._history_writer.flush()
+            mock_save.assert_called_once_with([test_entry2])
 
     def test_cleanup_on_quit(self, tray, components):
         """Test proper cleanup when quitting."""
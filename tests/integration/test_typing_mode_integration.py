@@ -62,6 +62,7 @@ class TestTypingModeIntegration:
             }
 
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
             # Should NOT auto-paste
             mock_paste.assert_not_called()
@@ -110,6 +111,7 @@ class TestTypingModeIntegration:
             }
 
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
             # Should NOT auto-paste
             mock_paste.assert_not_called()
@@ -153,6 +155,7 @@ class TestTypingModeIntegration:
             }
 
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
             # Verify no paste was triggered
             mock_paste.assert_not_called()
@@ -1,12 +1,30 @@
 """Tests for the ClipboardManager module."""
 
+import ctypes
+import dataclasses
 import hashlib
+import io
+import os
+import queue
+import sqlite3
+import threading
 from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
 
-from pasta.core.clipboard import ClipboardManager
+from pasta.core.clipboard import (
+    ChangeCountWatcher,
+    ClipboardEntry,
+    ClipboardHistory,
+    ClipboardManager,
+    ClipboardWatcher,
+    PollScheduler,
+    QtClipboardWatcher,
+    XFixesClipboardWatcher,
+    default_clipboard_watchers,
+)
+from pasta.utils.security import RateLimiter
 
 
 class TestClipboardManager:
@@ -15,7 +33,7 @@ class TestClipboardManager:
     @pytest.fixture
     def manager(self):
         """Create a ClipboardManager instance for testing."""
-        return ClipboardManager(history_size=10)
+        return ClipboardManager(history_size=10, watchers=[])
 
     def test_initialization(self, manager):
         """Test ClipboardManager initializes correctly."""
@@ -67,8 +85,9 @@ class TestClipboardManager:
         assert len(manager.history) == 1
         assert manager.history[0]["content"] == "test content"
 
+    @patch.object(ClipboardManager, "_grab_clipboard", return_value=None)
     @patch("pyperclip.paste")
-    def test_clipboard_empty_content_ignored(self, mock_paste, manager):
+    def test_clipboard_empty_content_ignored(self, mock_paste, mock_grab, manager):
         """Test that empty clipboard content is ignored."""
         mock_paste.return_value = ""
 
@@ -77,8 +96,9 @@ class TestClipboardManager:
 
         assert len(manager.history) == 0
 
+    @patch.object(ClipboardManager, "_grab_clipboard", return_value=None)
     @patch("pyperclip.paste")
-    def test_clipboard_whitespace_only_ignored(self, mock_paste, manager):
+    def test_clipboard_whitespace_only_ignored(self, mock_paste, mock_grab, manager):
         """Test that whitespace-only content is ignored."""
         mock_paste.return_value = "   \n\t  "
 
@@ -271,3 +291,794 @@ class TestClipboardManager:
         assert "hash" in stored_entry
         assert "type" in stored_entry
         assert isinstance(stored_entry["timestamp"], datetime)
+
+
+class FakeWatcher(ClipboardWatcher):
+    """Watcher whose change notifications are triggered by the test."""
+
+    name = "fake"
+
+    def __init__(self, available=True):
+        self.available = available
+        self.on_change = None
+        self.stopped = False
+        self.alive = True
+
+    def start(self, on_change):
+        if self.available:
+            self.on_change = on_change
+        return self.available
+
+    def stop(self):
+        self.stopped = True
+
+    def is_alive(self):
+        return self.alive
+
+
+class TestClipboardWatchers:
+    """Test cases for event-driven change detection."""
+
+    @pytest.fixture
+    def iterations(self):
+        """Create a semaphore that ``_run`` releases after each monitor iteration."""
+        return threading.Semaphore(0)
+
+    def _run(self, manager, done):
+        manager._monitor_iteration = Mock(side_effect=lambda: done.release() or False)
+        manager.start_monitoring()
+
+    def test_first_available_watcher_is_used(self, iterations):
+        """Test that unavailable watchers are skipped."""
+        unavailable, available = FakeWatcher(available=False), FakeWatcher()
+        manager = ClipboardManager(watchers=[unavailable, available])
+        self._run(manager, iterations)
+        try:
+            assert manager.active_watcher is available
+            assert unavailable.on_change is None
+        finally:
+            manager.stop_monitoring()
+
+    def test_broken_watcher_falls_back(self, iterations):
+        """Test that a watcher raising on start is skipped."""
+        broken = FakeWatcher()
+        broken.start = Mock(side_effect=OSError("no display"))
+        manager = ClipboardManager(watchers=[broken], scheduler=PollScheduler(min_interval=0.01, max_interval=0.01))
+        self._run(manager, iterations)
+        try:
+            assert manager.active_watcher is None
+        finally:
+            manager.stop_monitoring()
+
+    def test_clipboard_read_only_after_change(self, iterations):
+        """Test that an active watcher replaces polling."""
+        watcher = FakeWatcher()
+        manager = ClipboardManager(watchers=[watcher], scheduler=PollScheduler(min_interval=0.01, max_interval=0.01))
+        self._run(manager, iterations)
+        try:
+            # Initial read on start, then nothing until a change is reported
+            assert iterations.acquire(timeout=1)
+            assert not iterations.acquire(timeout=0.1)
+
+            watcher.on_change()
+            assert iterations.acquire(timeout=1)
+            assert manager._monitor_iteration.call_count == 2
+        finally:
+            manager.stop_monitoring()
+
+    def test_dead_watcher_falls_back_to_polling(self, iterations):
+        """Test that capture continues by polling once the watcher dies."""
+        watcher = FakeWatcher()
+        manager = ClipboardManager(watchers=[watcher], scheduler=PollScheduler(min_interval=0.01, max_interval=0.01))
+        manager.WATCHER_CHECK_INTERVAL = 0.01
+        self._run(manager, iterations)
+        try:
+            assert iterations.acquire(timeout=1)
+            assert not iterations.acquire(timeout=0.1)
+
+            # E.g. the X connection was lost
+            watcher.alive = False
+            for _ in range(3):
+                assert iterations.acquire(timeout=1)
+            assert manager.active_watcher is None
+            assert watcher.stopped
+        finally:
+            manager.stop_monitoring()
+
+    def test_polls_without_watcher(self, iterations):
+        """Test that the clipboard is polled when no watcher is available."""
+        manager = ClipboardManager(watchers=[FakeWatcher(available=False)], scheduler=PollScheduler(min_interval=0.01, max_interval=0.01))
+        self._run(manager, iterations)
+        try:
+            for _ in range(3):
+                assert iterations.acquire(timeout=1)
+        finally:
+            manager.stop_monitoring()
+
+    def test_stop_wakes_monitor_thread(self, iterations):
+        """Test that stopping doesn't wait for a change or the poll interval."""
+        watcher = FakeWatcher()
+        manager = ClipboardManager(watchers=[watcher], scheduler=PollScheduler(min_interval=60, max_interval=60))
+        self._run(manager, iterations)
+        assert iterations.acquire(timeout=1)
+
+        thread = manager._monitor_thread
+        manager.stop_monitoring()
+
+        assert not thread.is_alive()
+        assert watcher.stopped
+        assert manager.active_watcher is None
+
+    def test_qt_watcher_reports_clipboard_changes(self, qapp_session):
+        """Test that the Qt watcher forwards QClipboard.dataChanged."""
+        on_change = Mock()
+        watcher = QtClipboardWatcher()
+        assert watcher.start(on_change)
+
+        watcher._clipboard.dataChanged.emit()
+        on_change.assert_called_once()
+
+        watcher.stop()
+        qapp_session.clipboard().dataChanged.emit()
+        on_change.assert_called_once()
+
+    def test_qt_watcher_needs_application(self):
+        """Test that the Qt watcher is unavailable without a GUI application."""
+        with patch("PySide6.QtGui.QGuiApplication.instance", return_value=None):
+            assert not QtClipboardWatcher().start(Mock())
+
+    def test_xfixes_watcher_needs_display(self, monkeypatch):
+        """Test that the XFixes watcher is unavailable without an X display."""
+        monkeypatch.delenv("DISPLAY", raising=False)
+        assert not XFixesClipboardWatcher().start(Mock())
+
+    def test_xfixes_watcher_reports_selection_changes(self, monkeypatch):
+        """Test the XFixes event thread against fake Xlib and XFixes libraries."""
+        event_base = 87
+        x_read, x_write = os.pipe()
+        pending = []
+
+        def next_event(_display, event):
+            ctypes.c_int.from_buffer(event).value = pending.pop(0)
+            os.read(x_read, 1)
+
+        def query_extension(_display, event_base_ref, _error_base_ref):
+            event_base_ref._obj.value = event_base
+            return 1
+
+        libx11 = Mock()
+        libx11.XOpenDisplay.return_value = 1
+        libx11.XConnectionNumber.return_value = x_read
+        libx11.XPending.side_effect = lambda _display: len(pending)
+        libx11.XNextEvent.side_effect = next_event
+        libxfixes = Mock()
+        libxfixes.XFixesQueryExtension.side_effect = query_extension
+
+        def send(event_type):
+            pending.append(event_type)
+            os.write(x_write, b"e")
+
+        monkeypatch.setenv("DISPLAY", ":0")
+        libraries = {"X11": libx11, "Xfixes": libxfixes}
+        monkeypatch.setattr(XFixesClipboardWatcher, "_load_library", staticmethod(libraries.get))
+
+        changed = threading.Event()
+        watcher = XFixesClipboardWatcher()
+        try:
+            assert watcher.start(changed.set)
+            libxfixes.XFixesSelectSelectionInput.assert_called_once()
+
+            send(event_base + 1)
+            send(event_base)
+            assert changed.wait(timeout=1)
+        finally:
+            watcher.stop()
+            os.close(x_read)
+            os.close(x_write)
+
+        libx11.XCloseDisplay.assert_called_once_with(1)
+
+    def test_xfixes_watcher_reports_lost_connection(self, monkeypatch):
+        """Test that the XFixes watcher is no longer alive once its connection fails."""
+        libx11 = Mock()
+        libx11.XOpenDisplay.return_value = 1
+        libx11.XPending.side_effect = OSError("connection lost")
+        libxfixes = Mock()
+        libxfixes.XFixesQueryExtension.return_value = 1
+        monkeypatch.setenv("DISPLAY", ":0")
+        libraries = {"X11": libx11, "Xfixes": libxfixes}
+        monkeypatch.setattr(XFixesClipboardWatcher, "_load_library", staticmethod(libraries.get))
+
+        watcher = XFixesClipboardWatcher()
+        assert watcher.start(Mock())
+        watcher._thread.join(timeout=1)
+
+        assert not watcher.is_alive()
+        libx11.XCloseDisplay.assert_called_once_with(1)
+        watcher.stop()
+
+    def test_change_count_watcher_reports_counter_changes(self):
+        """Test that counter increments are reported once each."""
+        count = [5]
+        changed = threading.Semaphore(0)
+        watcher = ChangeCountWatcher(counter=lambda: count[0], interval=0.01)
+        assert watcher.start(changed.release)
+        try:
+            assert not changed.acquire(timeout=0.05)
+            count[0] += 1
+            assert changed.acquire(timeout=1)
+            assert not changed.acquire(timeout=0.05)
+        finally:
+            watcher.stop()
+
+        assert watcher._thread is None
+
+    def test_change_count_watcher_needs_counter(self, monkeypatch):
+        """Test that the watcher is unavailable without a platform counter."""
+        monkeypatch.setattr(ChangeCountWatcher, "platform_counter", staticmethod(lambda: None))
+        assert not ChangeCountWatcher().start(Mock())
+
+        broken = Mock(side_effect=OSError("clipboard locked"))
+        assert not ChangeCountWatcher(counter=broken).start(Mock())
+
+    @pytest.mark.parametrize(
+        ("platform", "wayland", "expected"),
+        [
+            ("darwin", None, ["change-count"]),
+            ("linux", None, ["xfixes", "qt"]),
+            ("linux", "wayland-0", ["qt", "xfixes"]),
+            ("win32", None, ["qt", "change-count"]),
+            ("freebsd14", None, ["qt"]),
+        ],
+    )
+    def test_default_watchers(self, monkeypatch, platform, wayland, expected):
+        """Test the platform watcher preference order."""
+        monkeypatch.setattr("sys.platform", platform)
+        if wayland:
+            monkeypatch.setenv("WAYLAND_DISPLAY", wayland)
+        else:
+            monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+
+        assert [watcher.name for watcher in default_clipboard_watchers()] == expected
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPollScheduler:
+    """Test cases for adaptive poll scheduling."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a fake clock."""
+        return FakeClock()
+
+    @pytest.fixture
+    def scheduler(self, clock):
+        """Create a scheduler without a rate limit."""
+        return PollScheduler(min_interval=0.1, max_interval=1.0, backoff=2.0, clock=clock)
+
+    def test_invalid_configuration(self):
+        """Test that inconsistent intervals are rejected."""
+        with pytest.raises(ValueError):
+            PollScheduler(min_interval=2.0, max_interval=1.0)
+        with pytest.raises(ValueError):
+            PollScheduler(min_interval=0)
+        with pytest.raises(ValueError):
+            PollScheduler(backoff=0.5)
+
+    def test_backs_off_while_idle(self, scheduler):
+        """Test exponential backoff up to the cap."""
+        delays = []
+        for _ in range(6):
+            scheduler.record_read(changed=False)
+            delays.append(scheduler.next_delay())
+
+        assert delays == pytest.approx([0.2, 0.4, 0.8, 1.0, 1.0, 1.0])
+
+    def test_tightens_after_change(self, scheduler):
+        """Test that a change resets the interval to the minimum."""
+        for _ in range(5):
+            scheduler.record_read(changed=False)
+
+        scheduler.record_read(changed=True)
+        assert scheduler.next_delay() == pytest.approx(0.1)
+
+    def test_budget_delay_follows_rate_limiter(self, clock):
+        """Test that reads are held back once the clipboard_read budget is spent."""
+        limiter = RateLimiter({"clipboard_read": (3, 60)})
+        scheduler = PollScheduler(rate_limiter=limiter, clock=clock)
+
+        for _ in range(2):
+            scheduler.record_read(changed=False)
+        assert scheduler.budget_delay() == 0.0
+
+        scheduler.record_read(changed=False)
+        assert 59 < scheduler.budget_delay() <= 60
+
+    def test_polls_per_minute(self, scheduler, clock):
+        """Test that only reads from the last minute are counted."""
+        for _ in range(10):
+            scheduler.record_read(changed=False)
+            clock.now += 10
+
+        # Reads at -100 .. -10 seconds; those from -50 on are within the minute
+        assert scheduler.get_metrics()["polls_per_minute"] == 5
+
+    def test_detection_latency(self, scheduler, clock):
+        """Test latency from watcher notifications and estimated from polls."""
+        scheduler.record_read(changed=False)
+        clock.now += 0.4
+        # A polled change happened on average halfway between the two reads
+        scheduler.record_read(changed=True)
+
+        notified_at = clock.now
+        clock.now += 0.05
+        scheduler.record_read(changed=True, notified_at=notified_at)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["detection_latency_max"] == pytest.approx(0.2)
+        assert metrics["detection_latency_avg"] == pytest.approx(0.125)
+
+    def test_metrics_start_empty(self, scheduler):
+        """Test metrics before any read."""
+        assert scheduler.get_metrics() == {
+            "polls_per_minute": 0,
+            "interval": 0.1,
+            "detection_latency_avg": 0.0,
+            "detection_latency_max": 0.0,
+        }
+
+    def test_manager_holds_reads_back_for_budget(self):
+        """Test that the monitor loop doesn't read past the rate limit."""
+        limiter = RateLimiter({"clipboard_read": (2, 60)})
+        scheduler = PollScheduler(min_interval=0.01, max_interval=0.01, rate_limiter=limiter)
+        manager = ClipboardManager(watchers=[], scheduler=scheduler)
+        done = threading.Semaphore(0)
+        manager._monitor_iteration = Mock(side_effect=lambda: done.release() or False)
+
+        manager.start_monitoring()
+        try:
+            assert done.acquire(timeout=1)
+            assert done.acquire(timeout=1)
+            assert not done.acquire(timeout=0.2)
+        finally:
+            manager.stop_monitoring()
+
+        assert not manager._monitor_thread.is_alive()
+
+    def test_manager_metrics(self):
+        """Test that manager metrics report the watcher and its latency."""
+        watcher = FakeWatcher()
+        manager = ClipboardManager(watchers=[watcher])
+        done = threading.Semaphore(0)
+        manager._monitor_iteration = Mock(side_effect=lambda: done.release() or True)
+        manager.start_monitoring()
+        try:
+            assert done.acquire(timeout=1)
+            watcher.on_change()
+            assert done.acquire(timeout=1)
+            metrics = manager.get_metrics()
+        finally:
+            manager.stop_monitoring()
+
+        assert metrics["watcher"] == "fake"
+        assert metrics["polls_per_minute"] >= 1
+        assert 0 < metrics["detection_latency_max"] < 1
+
+
+class TestChangePrecheck:
+    """Test cases for the fingerprint check before hashing."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a ClipboardManager for testing."""
+        return ClipboardManager(watchers=[])
+
+    @patch("pyperclip.paste")
+    def test_unchanged_content_is_not_hashed(self, mock_paste, manager):
+        """Test that an unchanged fingerprint skips hashing."""
+        mock_paste.return_value = "x" * 100_000
+        assert manager._monitor_iteration()
+
+        with patch.object(ClipboardManager, "_content_hash") as mock_hash:
+            assert not manager._monitor_iteration()
+            mock_hash.assert_not_called()
+
+    @patch("pyperclip.paste")
+    def test_same_length_changes_detected(self, mock_paste, manager):
+        """Test that changes keeping the length are caught by the samples."""
+        content = "a" * 100_000
+        mock_paste.return_value = content
+        manager._monitor_iteration()
+
+        # Samples are taken every (100_000 - 512) // 64 = 1554 characters after the prefix
+        sampled = 256 + 32 * 1554
+        for changed in ("b" + content[1:], content[:-1] + "b", content[:sampled] + "b" + content[sampled + 1 :]):
+            mock_paste.return_value = changed
+            assert manager._monitor_iteration()
+            mock_paste.return_value = content
+            assert manager._monitor_iteration()
+
+    @patch("pyperclip.paste")
+    def test_reported_change_is_hashed(self, mock_paste, manager):
+        """Test that a watcher's report bypasses the fingerprint."""
+        content = "a" * 100_000
+        mock_paste.return_value = content
+        manager._monitor_iteration()
+
+        # Between two samples, so the fingerprint is unchanged
+        edited = content[:1000] + "b" + content[1001:]
+        assert manager._fingerprint(edited) == manager._last_fingerprint
+        mock_paste.return_value = edited
+        assert not manager._monitor_iteration()
+
+        manager._change_reported = True
+        assert manager._monitor_iteration()
+        assert manager.history[0]["content"] == edited
+
+    def test_monitor_loop_flags_reported_changes(self):
+        """Test that reads after a watcher notification are flagged as such."""
+        watcher = FakeWatcher()
+        manager = ClipboardManager(watchers=[watcher])
+        reads = queue.Queue()
+        manager._monitor_iteration = Mock(side_effect=lambda: reads.put(manager._change_reported) or False)
+        manager.start_monitoring()
+        try:
+            assert reads.get(timeout=1) is False
+            watcher.on_change()
+            assert reads.get(timeout=1) is True
+        finally:
+            manager.stop_monitoring()
+
+    @patch("pyperclip.paste")
+    def test_short_content_compared_completely(self, mock_paste, manager):
+        """Test that short content is covered by the fingerprint entirely."""
+        mock_paste.return_value = "abc def"
+        manager._monitor_iteration()
+
+        mock_paste.return_value = "abc xef"
+        assert manager._monitor_iteration()
+
+    @patch("pyperclip.paste")
+    def test_same_hash_after_fingerprint_change(self, mock_paste, manager):
+        """Test that a differing fingerprint with identical content isn't a change."""
+        mock_paste.return_value = "content"
+        manager._monitor_iteration()
+        manager._last_fingerprint = None
+
+        assert not manager._monitor_iteration()
+        assert len(manager.history) == 1
+
+    @patch("pyperclip.paste")
+    def test_clear_history_rereads_clipboard(self, mock_paste, manager):
+        """Test that clearing history lets current content be captured again."""
+        mock_paste.return_value = "content"
+        manager._monitor_iteration()
+        manager.clear_history()
+
+        assert manager._monitor_iteration()
+        assert len(manager.history) == 1
+
+    def test_content_hash(self):
+        """Test the content hash is a 128-bit BLAKE2b digest."""
+        digest = ClipboardManager._content_hash("test")
+        assert digest == hashlib.blake2b(b"test", digest_size=16).hexdigest()
+        assert len(digest) == 32
+
+
+class TestClipboardHistory:
+    """Test cases for the hash-indexed history."""
+
+    @staticmethod
+    def entry(name):
+        """Create an entry whose hash is its name."""
+        return {"content": name, "hash": name}
+
+    @pytest.fixture
+    def history(self):
+        """Create a history holding c, b, a (newest first)."""
+        history = ClipboardHistory()
+        for name in "abc":
+            history.add(self.entry(name))
+        return history
+
+    def test_sequence_access(self, history):
+        """Test indexing, iteration and length, newest first."""
+        assert len(history) == 3
+        assert [e["hash"] for e in history] == ["c", "b", "a"]
+        assert history[0]["hash"] == "c"
+        assert history[1]["hash"] == "b"
+        assert history[-1]["hash"] == "a"
+        assert [e["hash"] for e in history[1:]] == ["b", "a"]
+        with pytest.raises(IndexError):
+            history[3]
+        with pytest.raises(IndexError):
+            history[-4]
+
+    def test_duplicate_moves_to_front(self, history):
+        """Test that re-adding a hash replaces the entry and makes it newest."""
+        replacement = {"content": "a again", "hash": "a"}
+        history.add(replacement)
+
+        assert [e["hash"] for e in history] == ["a", "c", "b"]
+        assert history[0] is replacement
+        assert history.get("a") is replacement
+        assert history.get("missing") is None
+
+    def test_oldest_dropped_beyond_max_size(self, history):
+        """Test trimming to the size limit."""
+        history.add(self.entry("d"), max_size=2)
+        assert [e["hash"] for e in history] == ["d", "c"]
+
+    def test_newest(self, history):
+        """Test getting the newest entries as a list."""
+        assert [e["hash"] for e in history.newest(2)] == ["c", "b"]
+        assert len(history.newest()) == 3
+        assert history.newest(0) == []
+
+    def test_equality(self, history):
+        """Test comparison with lists."""
+        assert history == [self.entry("c"), self.entry("b"), self.entry("a")]
+        assert history != [self.entry("a")]
+        history.clear()
+        assert history == []
+        assert history != "abc"
+
+
+class TestHistoryByteBudget:
+    """Test cases for spilling history content beyond the byte budget."""
+
+    @staticmethod
+    def entry(name, size=1000):
+        """Create an entry with content of about ``size`` bytes."""
+        return {"content": name * size, "hash": name}
+
+    def test_oldest_content_spilled(self):
+        """Test that content beyond the budget is dropped oldest first."""
+        history = ClipboardHistory()
+        for name in "abc":
+            history.add(self.entry(name), max_bytes=2500)
+
+        assert [ClipboardHistory.is_spilled(e) for e in history] == [False, False, True]
+        assert history[-1] == {"hash": "a"}
+        assert history.resident_bytes <= 2500
+        assert len(history) == 3
+
+    def test_newest_entry_keeps_content(self):
+        """Test that an entry over the whole budget is kept while newest."""
+        history = ClipboardHistory()
+        history.add(self.entry("a"))
+        history.add(self.entry("b", size=10_000), max_bytes=100)
+
+        assert not ClipboardHistory.is_spilled(history[0])
+        assert ClipboardHistory.is_spilled(history[1])
+
+    def test_spill_copies_entry(self):
+        """Test that spilling doesn't modify the dict given to callbacks."""
+        history = ClipboardHistory()
+        first = self.entry("a")
+        history.add(first)
+        history.add(self.entry("b"), max_bytes=1500)
+
+        assert first["content"] == "a" * 1000
+
+    def test_resident_bytes_accounting(self):
+        """Test the byte count through re-adds, trimming and clearing."""
+        history = ClipboardHistory()
+        history.add(self.entry("a"))
+        size = history.resident_bytes
+        history.add(self.entry("a"))
+        assert history.resident_bytes == size
+
+        history.add(self.entry("b"), max_size=1)
+        assert history.resident_bytes == size
+
+        history.clear()
+        assert history.resident_bytes == 0
+
+    def test_get_history_loads_spilled_content(self):
+        """Test that get_history loads spilled content through the loader."""
+        loader = Mock(side_effect=lambda content_hash: "loaded " + content_hash)
+        manager = ClipboardManager(watchers=[], history_bytes=1500, content_loader=loader)
+        for name in "abc":
+            manager._add_to_history(self.entry(name))
+
+        contents = [e["content"] for e in manager.get_history()]
+
+        assert contents == ["c" * 1000, "loaded b", "loaded a"]
+        assert manager.get_history(limit=1)[0]["content"] == "c" * 1000
+        # Loaded content isn't kept in memory
+        assert ClipboardHistory.is_spilled(manager.history[1])
+
+    def test_get_history_skips_unavailable_content(self):
+        """Test that entries whose content can't be loaded are left out."""
+        manager = ClipboardManager(watchers=[], history_bytes=1500, content_loader=Mock(return_value=None))
+        for name in "ab":
+            manager._add_to_history(self.entry(name))
+        assert [e["hash"] for e in manager.get_history()] == ["b"]
+
+        manager.content_loader = None
+        assert [e["hash"] for e in manager.get_history()] == ["b"]
+
+        manager.content_loader = Mock(side_effect=sqlite3.Error("database is locked"))
+        assert [e["hash"] for e in manager.get_history()] == ["b"]
+
+
+class TestClipboardEntry:
+    """Test cases for the slotted entry record."""
+
+    @pytest.fixture
+    def entry(self):
+        """Create an entry captured at a fixed time."""
+        epoch_us = int(datetime(2024, 1, 2, 3, 4, 5, 678901).timestamp()) * 1_000_000 + 678901
+        return ClipboardEntry("héllo", "abc123", "text", epoch_us)
+
+    def test_mapping_interface(self, entry):
+        """Test that entries read like the dicts they replace."""
+        assert entry["content"] == "héllo"
+        assert entry["hash"] == "abc123"
+        assert entry["content_type"] == "text"
+        assert entry["timestamp"] == "2024-01-02T03:04:05.678901"
+        assert entry.get("missing") is None
+        assert entry == {
+            "content": "héllo",
+            "timestamp": "2024-01-02T03:04:05.678901",
+            "hash": "abc123",
+            "content_type": "text",
+        }
+        assert entry.to_dict() == dict(entry)
+
+    def test_immutable_and_slotted(self, entry):
+        """Test that fields can't be changed or added."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            entry.content = "changed"
+        assert not hasattr(entry, "__dict__")
+
+    def test_derived_fields(self, entry):
+        """Test lazily derived timestamp, datetime and size."""
+        assert entry.captured_at == datetime(2024, 1, 2, 3, 4, 5, 678901)
+        assert entry.timestamp is entry.timestamp
+        assert entry.size == len("héllo".encode())
+
+    def test_content_type_interned(self):
+        """Test that content types share one string object."""
+        first = ClipboardEntry("a", "1", "".join(["multi", "line"]), 0)
+        second = ClipboardEntry("b", "2", "".join(["multi", "line"]), 0)
+        assert first.content_type is second.content_type
+
+    def test_without_and_with_content(self, entry):
+        """Test dropping content and loading it back."""
+        spilled = entry.without_content()
+        assert "content" not in spilled
+        assert len(spilled) == 3
+        assert spilled.size == 0
+        assert spilled.epoch_us == entry.epoch_us
+        assert entry.content == "héllo"
+
+        assert spilled.with_content("héllo") == entry
+
+    @patch("pyperclip.paste")
+    def test_monitor_captures_entries(self, mock_paste):
+        """Test that captured clipboard content becomes a ClipboardEntry."""
+        manager = ClipboardManager(watchers=[])
+        mock_paste.return_value = "captured"
+        manager._monitor_iteration()
+
+        entry = manager.history[0]
+        assert isinstance(entry, ClipboardEntry)
+        assert entry.content_hash == ClipboardManager._content_hash("captured")
+        assert abs(entry.captured_at - datetime.now()).total_seconds() < 5
+
+    def test_spilled_entries_stay_entries(self):
+        """Test that the byte budget keeps ClipboardEntry objects."""
+        manager = ClipboardManager(watchers=[], history_bytes=1500, content_loader=lambda content_hash: "loaded")
+        for name in "ab":
+            manager._add_to_history(ClipboardEntry(name * 1000, name, "text", 0))
+
+        assert manager.history[1] == ClipboardEntry(None, "a", "text", 0)
+        loaded = manager.get_history()[1]
+        assert isinstance(loaded, ClipboardEntry)
+        assert loaded.content == "loaded"
+
+
+class TestRichCapture:
+    """Test cases for capturing images, HTML and file lists."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a manager with an empty text clipboard."""
+        manager = ClipboardManager(watchers=[])
+        yield manager
+        manager.stop_monitoring()
+
+    @pytest.fixture
+    def image(self):
+        """Create a small test image."""
+        from PIL import Image
+
+        image = Image.new("RGB", (400, 200), (200, 30, 30))
+        image.putpixel((10, 10), (0, 0, 0))
+        return image
+
+    def capture(self, manager, grabbed):
+        """Run one monitoring iteration with the given non-text content."""
+        with patch("pyperclip.paste", return_value=""), patch.object(ClipboardManager, "_grab_clipboard", return_value=grabbed):
+            changed = manager._monitor_iteration()
+        if manager._capture_executor is not None:
+            # Wait for the capture thread
+            manager._capture_executor.submit(lambda: None).result(timeout=5)
+        return changed
+
+    def test_image_capture(self, manager, image):
+        """Test that images are encoded off-thread and kept as thumbnails."""
+        from PIL import Image
+
+        captured = []
+        manager.register_callback(captured.append)
+        assert self.capture(manager, image)
+
+        entry = captured[0]
+        assert entry.content_type == "image"
+        assert entry.content.startswith(b"\x89PNG")
+        assert entry.content_hash == ClipboardManager._content_hash(entry.content)
+        thumbnail = Image.open(io.BytesIO(entry.thumbnail))
+        assert max(thumbnail.size) == 128
+
+        # History keeps only the thumbnail, and doesn't load the image back
+        manager.content_loader = Mock()
+        history = manager.get_history()
+        assert "content" not in history[0]
+        assert history[0]["thumbnail"] == entry.thumbnail
+        manager.content_loader.assert_not_called()
+
+    def test_unchanged_image_ignored(self, manager, image):
+        """Test that the same image is only captured once."""
+        assert self.capture(manager, image)
+        assert not self.capture(manager, image.copy())
+
+        changed = image.copy()
+        changed.putpixel((0, 0), (1, 2, 3))
+        assert self.capture(manager, changed)
+        assert len(manager.history) == 2
+
+    def test_image_grabbed_only_after_reported_change(self, manager, image):
+        """Test that a watcher's silence spares decoding the clipboard image again."""
+        manager.active_watcher = Mock()
+        assert self.capture(manager, image)
+
+        with patch("pyperclip.paste", return_value=""), patch.object(ClipboardManager, "_grab_clipboard", return_value=image) as grab:
+            assert not manager._monitor_iteration()
+            grab.assert_not_called()
+
+            manager._change_reported = True
+            assert not manager._monitor_iteration()
+            grab.assert_called_once()
+
+    def test_file_list_capture(self, manager):
+        """Test that copied files are captured as a list of paths."""
+        assert self.capture(manager, ["/tmp/a.txt", "/tmp/b.png"])
+        assert manager.history[0]["content"] == "/tmp/a.txt\n/tmp/b.png"
+        assert manager.history[0]["content_type"] == "files"
+        assert not self.capture(manager, [])
+
+    def test_grab_failure_ignored(self, manager):
+        """Test that unsupported clipboards capture nothing."""
+        with patch("PIL.ImageGrab.grabclipboard", side_effect=NotImplementedError):
+            assert ClipboardManager._grab_clipboard() is None
+        assert not self.capture(manager, None)
+        assert manager.history == []
+
+    def test_html_detection(self, manager):
+        """Test that markup is recognised as HTML."""
+        assert manager._detect_content_type("<!DOCTYPE html><html><body>Hi</body></html>") == "html"
+        assert manager._detect_content_type("<p class='x'>Hello <b>there</b></p>") == "html"
+        assert manager._detect_content_type("a < b and c </ d") == "text"
+        assert manager._detect_content_type("<paste>") == "text"
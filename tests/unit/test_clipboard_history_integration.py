@@ -5,7 +5,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from pasta.core.clipboard import ClipboardManager
+from pasta.core.clipboard import ClipboardEntry, ClipboardManager
 from pasta.core.storage import StorageManager
 from pasta.gui.tray_pyside6 import ClipboardWorker, SystemTray
 
@@ -102,6 +102,18 @@ class TestClipboardHistoryIntegration:
         assert len(emitted_entries) == 1
         assert emitted_entries[0] == test_entry
 
+    def test_clipboard_worker_passes_entries_through(self):
+        """Test that ClipboardWorker emits ClipboardEntry objects unconverted."""
+        worker = ClipboardWorker(ClipboardManager())
+        emitted_entries = []
+        worker.clipboard_changed.connect(lambda entry: emitted_entries.append(entry))
+
+        entry = ClipboardEntry.capture("Test content", "test_hash", "text")
+        worker._on_clipboard_change(entry)
+
+        assert emitted_entries == [entry]
+        assert emitted_entries[0] is entry
+
     def test_system_tray_saves_clipboard_to_storage(self, temp_db):
         """Test that SystemTray properly saves clipboard changes to storage."""
         # Create mocks
@@ -116,13 +128,13 @@ class TestClipboardHistoryIntegration:
 
         # Track what gets saved
         saved_entries = []
-        original_save = storage_manager.save_entry
+        original_save = storage_manager.save_entries
 
-        def track_save(entry):
-            saved_entries.append(entry)
-            return original_save(entry)
+        def track_save(entries):
+            saved_entries.extend(entries)
+            return original_save(entries)
 
-        storage_manager.save_entry = track_save
+        storage_manager.save_entries = track_save
 
         with (
             patch("PySide6.QtWidgets.QApplication"),
@@ -151,6 +163,7 @@ class TestClipboardHistoryIntegration:
 
             # Call the clipboard change handler
             tray._on_clipboard_change(test_entry)
+            assert tray._history_writer.flush()
 
             # Verify it was saved
             assert len(saved_entries) == 1
@@ -160,3 +173,38 @@ class TestClipboardHistoryIntegration:
         entries = storage_manager.get_entries()
         assert len(entries) > 0
         assert entries[0]["content"] == "System tray test content"
+
+    def test_paste_last_item_right_after_copy(self, temp_db):
+        """Test pasting the last item includes a copy still waiting to be written."""
+        storage_manager = StorageManager(temp_db)
+        mock_keyboard = Mock()
+        mock_keyboard.is_pasting.return_value = False
+        mock_settings = Mock()
+        mock_settings.settings.monitoring_enabled = True
+        mock_settings.settings.paste_mode = "auto"
+
+        with (
+            patch("PySide6.QtWidgets.QApplication"),
+            patch("PySide6.QtWidgets.QSystemTrayIcon"),
+            patch("PySide6.QtCore.QThread"),
+            patch("PySide6.QtGui.QIcon"),
+            patch("PySide6.QtWidgets.QMenu"),
+            patch("PySide6.QtGui.QAction"),
+        ):
+            tray = SystemTray(
+                clipboard_manager=Mock(spec=ClipboardManager),
+                keyboard_engine=mock_keyboard,
+                storage_manager=storage_manager,
+                permission_checker=Mock(),
+                settings_manager=mock_settings,
+            )
+            tray.enabled = True
+
+            for i, content in enumerate(("Older copy", "Newest copy")):
+                tray._on_clipboard_change(
+                    {"content": content, "timestamp": datetime(2024, 1, 1, 12, 0, i).isoformat(), "hash": f"h{i}", "content_type": "text"}
+                )
+            tray.paste_last_item()
+
+        mock_keyboard.paste_text.assert_called_once_with("Newest copy", method="clipboard")
+        tray._history_writer.stop()
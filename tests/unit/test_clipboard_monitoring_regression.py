@@ -77,7 +77,7 @@ class TestClipboardMonitoringRegression:
 
         # Track storage calls
         storage_calls = []
-        mock_storage.save_entry.side_effect = lambda entry: storage_calls.append(entry)
+        mock_storage.save_entries.side_effect = lambda entries: storage_calls.extend(entries)
         mock_keyboard.is_pasting.return_value = False
 
         with (
@@ -102,6 +102,7 @@ class TestClipboardMonitoringRegression:
 
             # This SHOULD save to storage
             tray._on_clipboard_change(clipboard_entry)
+            assert tray._history_writer.flush()
 
             # ASSERTION: content should be saved to storage
             assert len(storage_calls) > 0, "Clipboard content should be saved to history!"
@@ -143,7 +144,7 @@ class TestClipboardMonitoringRegression:
         mock_settings.settings.emergency_stop_hotkey = "Escape+Escape"
 
         storage_calls = []
-        mock_storage.save_entry.side_effect = lambda entry: storage_calls.append(entry)
+        mock_storage.save_entries.side_effect = lambda entries: storage_calls.extend(entries)
         mock_keyboard.is_pasting.return_value = False
 
         with (
@@ -166,6 +167,7 @@ class TestClipboardMonitoringRegression:
             clipboard_entry = {"content": "History should be saved", "timestamp": time.time(), "type": "text", "hash": "ghi789"}
 
             tray._on_clipboard_change(clipboard_entry)
+            assert tray._history_writer.flush()
 
             # History should still be saved even when paste is disabled
             # (Currently this will fail, showing the bug)
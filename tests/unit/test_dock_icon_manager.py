@@ -264,7 +264,7 @@ class TestDockIconIntegration(unittest.TestCase):
 
         # Create history window
         storage_manager = MagicMock(spec=StorageManager)
-        storage_manager.get_history.return_value = []
+        storage_manager.get_summaries.return_value = []
 
         with patch("pasta.gui.history_pyside6.DockIconManager") as mock_manager_class:
             mock_manager = MagicMock()
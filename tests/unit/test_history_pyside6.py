@@ -2,10 +2,11 @@
 
 import os
 import sys
+from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QModelIndex, Qt
 from PySide6.QtWidgets import QMessageBox
 
 # Mock DockIconManager in Nix environment to prevent AppKit conflicts
@@ -14,7 +15,8 @@ if os.environ.get("PASTA_TEST_SKIP_APPKIT") == "1":
     sys.modules["pasta.utils.dock_manager"].DockIconManager = Mock()
     sys.modules["pasta.utils.dock_manager"].DockIconManager.get_instance.return_value = Mock()
 
-from pasta.gui.history_pyside6 import HistoryWindow
+from pasta.core.storage import StorageManager
+from pasta.gui.history_pyside6 import HistoryTableModel, HistoryWindow
 
 
 @pytest.fixture(scope="module")
@@ -35,7 +37,7 @@ class TestHistoryWindow:
     def storage_manager(self):
         """Create a mock StorageManager."""
         manager = Mock()
-        manager.get_history.return_value = [
+        entries = [
             {
                 "id": 1,
                 "content": "Test content 1",
@@ -51,6 +53,17 @@ class TestHistoryWindow:
                 "source_app": "AnotherApp",
             },
         ]
+        manager.get_summaries.return_value = [
+            {
+                "id": e["id"],
+                "preview": e["content"],
+                "content_type": e["content_type"],
+                "timestamp": e["timestamp"],
+                "source_app": e["source_app"],
+            }
+            for e in entries
+        ]
+        manager.get_entry.side_effect = lambda entry_id: next((e for e in entries if e["id"] == entry_id), None)
         manager.clear_history.return_value = None
         return manager
 
@@ -72,43 +85,28 @@ class TestHistoryWindow:
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_history_table_setup(self, window):
         """Test history table is set up correctly."""
-        assert window.history_table.columnCount() == 4
+        assert window.history_model.columnCount() == 4
         headers = []
-        for i in range(window.history_table.columnCount()):
-            headers.append(window.history_table.horizontalHeaderItem(i).text())
+        for i in range(window.history_model.columnCount()):
+            headers.append(window.history_model.headerData(i, Qt.Orientation.Horizontal))
         assert headers == ["Content", "Type", "Timestamp", "Source"]
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_load_history(self, window, storage_manager):
         """Test loading history from storage."""
         # History should be loaded on initialization
-        assert window.history_table.rowCount() == 2
+        assert window.history_model.rowCount() == 2
 
         # Check first row
-        assert window.history_table.item(0, 0).text() == "Test content 1"
-        assert window.history_table.item(0, 1).text() == "text"
-        assert window.history_table.item(0, 3).text() == "TestApp"
+        assert window.history_model.index(0, 0).data() == "Test content 1"
+        assert window.history_model.index(0, 1).data() == "text"
+        assert window.history_model.index(0, 3).data() == "TestApp"
 
         # Check content truncation
-        content2 = window.history_table.item(1, 0).text()
+        content2 = window.history_model.index(1, 0).data()
         assert content2.endswith("...")
         assert len(content2) == 100
 
-    @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
-    def test_filter_history(self, window, qtbot):
-        """Test filtering history entries."""
-        # Set search text
-        window.search_input.setText("content 1")
-
-        # Check filtering
-        assert not window.history_table.isRowHidden(0)
-        assert window.history_table.isRowHidden(1)
-
-        # Clear filter
-        window.search_input.clear()
-        assert not window.history_table.isRowHidden(0)
-        assert not window.history_table.isRowHidden(1)
-
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_copy_selected(self, window, storage_manager, qtbot):
         """Test copying selected item to clipboard."""
@@ -150,8 +148,9 @@ class TestHistoryWindow:
             # Click delete button
             qtbot.mouseClick(window.delete_button, Qt.MouseButton.LeftButton)
 
-            # Should reload history
-            assert storage_manager.get_history.call_count == 2  # Once on init, once on delete
+            # Should delete without reloading; storage reports the change
+            storage_manager.delete_entry.assert_called_once_with(1)
+            assert storage_manager.get_summaries.call_count == 1
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_delete_cancelled(self, window, storage_manager, qtbot):
@@ -165,7 +164,7 @@ class TestHistoryWindow:
             qtbot.mouseClick(window.delete_button, Qt.MouseButton.LeftButton)
 
             # Should not reload history
-            assert storage_manager.get_history.call_count == 1  # Only on init
+            assert storage_manager.get_summaries.call_count == 1  # Only on init
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_clear_history(self, window, storage_manager, qtbot):
@@ -178,8 +177,8 @@ class TestHistoryWindow:
             # Should clear history in storage
             storage_manager.clear_history.assert_called_once()
 
-            # Should reload history
-            assert storage_manager.get_history.call_count == 2
+            # Should not reload history; storage reports the change
+            assert storage_manager.get_summaries.call_count == 1
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_clear_history_cancelled(self, window, storage_manager, qtbot):
@@ -199,32 +198,91 @@ class TestHistoryWindow:
         qtbot.mouseClick(window.refresh_button, Qt.MouseButton.LeftButton)
 
         # Should reload history
-        assert storage_manager.get_history.call_count == 2  # Once on init, once on refresh
+        assert storage_manager.get_summaries.call_count == 2  # Once on init, once on refresh
 
-    @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
-    def test_auto_refresh_timer(self, window, storage_manager, qtbot):
-        """Test auto-refresh timer functionality."""
-        # Timer should be active
-        assert window.refresh_timer.isActive()
-        assert window.refresh_timer.interval() == 5000
+    def test_observes_storage(self, window, storage_manager):
+        """Test the window listens for storage changes instead of polling."""
+        storage_manager.add_observer.assert_called_once_with(window._on_storage_change)
+        assert not hasattr(window, "refresh_timer")
 
-        # Trigger timer
-        window.refresh_timer.timeout.emit()
+    def test_storage_changes_applied_as_row_diffs(self, window, storage_manager):
+        """Test inserts, deletes and clears update rows without reloading."""
+        assert window.history_model.rowCount() == 2
+        window.history_table.selectRow(1)
 
-        # Should reload history
-        assert storage_manager.get_history.call_count == 2
+        window._on_storage_change(
+            "inserted", [{"id": 3, "preview": "New entry", "content_type": "url", "timestamp": "2024-01-01T12:00:00"}]
+        )
 
-    @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
-    def test_close_window(self, window, qtbot):
-        """Test closing the window."""
-        # Timer should be active
-        assert window.refresh_timer.isActive()
+        assert window.history_model.rowCount() == 3
+        assert window.history_model.index(0, 0).data() == "New entry"
+        assert window.history_model.entry_id(0) == 3
+        # The selection follows its row
+        assert window.history_table.currentIndex().row() == 2
+
+        window._on_storage_change("deleted", [1])
+        ids = [window.history_model.entry_id(row) for row in range(window.history_model.rowCount())]
+        assert ids == [3, 2]
+
+        window._on_storage_change("cleared", [])
+        assert window.history_model.rowCount() == 0
+        assert storage_manager.get_summaries.call_count == 1
+
+    def test_search_is_debounced_and_runs_in_storage(self, window, storage_manager, qtbot):
+        """Test typing triggers one storage search once it pauses."""
+        calls = []
+
+        def search(query, batch_size):
+            calls.append(query)
+            yield [{"id": 2, "preview": "Test content 2", "content_type": "text", "timestamp": 1234567900}]
+
+        storage_manager.iter_search_summaries.side_effect = search
+
+        for text in ("c", "co", "content 2"):
+            window.search_input.setText(text)
+        assert window._search_timer.isActive()
+        assert calls == []
+
+        qtbot.waitUntil(lambda: window.history_model.searching and window.history_model.rowCount() == 1)
+        assert calls == ["content 2"]
+        assert window.history_model.entry_id(0) == 2
+
+    def test_clearing_search_reloads_history(self, window, storage_manager):
+        """Test an empty search shows the full history again."""
+        window.search_input.setText("")
+        window._start_search()
 
-        # Close window
+        assert not window.history_model.searching
+        assert window.history_model.rowCount() == 2
+        assert storage_manager.get_summaries.call_count == 2
+        storage_manager.iter_search_summaries.assert_not_called()
+
+    def test_stale_search_results_are_dropped(self, window):
+        """Test batches from a superseded search are ignored."""
+        window.history_model.begin_search()
+        window._search_generation = 2
+
+        window._on_search_results(1, [{"id": 9, "preview": "old", "content_type": "text", "timestamp": 0}])
+        assert window.history_model.rowCount() == 0
+        assert window._is_stale_search(1)
+
+        window._on_search_results(2, [{"id": 10, "preview": "new", "content_type": "text", "timestamp": 0}])
+        assert window.history_model.entry_id(0) == 10
+
+    def test_insert_during_search_reruns_search(self, window):
+        """Test new entries trigger a new search rather than being shown unfiltered."""
+        window.history_model.begin_search()
+
+        window._on_storage_change("inserted", [{"id": 3, "preview": "unrelated", "content_type": "text", "timestamp": 0}])
+
+        assert window.history_model.rowCount() == 0
+        assert window._search_timer.isActive()
+
+    def test_close_window(self, window, storage_manager, qtbot):
+        """Test closing the window stops observing storage."""
         window.close()
 
-        # Timer should be stopped
-        assert not window.refresh_timer.isActive()
+        storage_manager.remove_observer.assert_called_once_with(window._on_storage_change)
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_menu_actions(self, window, storage_manager, qtbot):
@@ -242,45 +300,129 @@ class TestHistoryWindow:
         refresh_action.trigger()
 
         # Should reload history
-        assert storage_manager.get_history.call_count == 2
+        assert storage_manager.get_summaries.call_count == 2
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_timestamp_formatting(self, window):
         """Test timestamp is formatted correctly."""
         # Check timestamp formatting in table
-        timestamp_item = window.history_table.item(0, 2)
+        timestamp_text = window.history_model.index(0, 2).data()
         # Timestamp 1234567890 = 2009-02-13 23:31:30
-        assert "2009" in timestamp_item.text()
-        assert "02" in timestamp_item.text()
-        assert "13" in timestamp_item.text()
-
-    @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
-    def test_case_insensitive_search(self, window):
-        """Test search is case insensitive."""
-        # Search with uppercase
-        window.search_input.setText("CONTENT")
-
-        # Both rows should be visible (both contain "content")
-        assert not window.history_table.isRowHidden(0)
-        assert not window.history_table.isRowHidden(1)
-
-        # Search for specific app
-        window.search_input.setText("testapp")
-        assert not window.history_table.isRowHidden(0)
-        assert window.history_table.isRowHidden(1)
+        assert "2009" in timestamp_text
+        assert "02" in timestamp_text
+        assert "13" in timestamp_text
 
     @pytest.mark.skip(reason="Test passes individually but has Qt initialization issues in full test suite")
     def test_empty_history(self, window, storage_manager, qtbot):
         """Test behavior with empty history."""
         # Set empty history
-        storage_manager.get_history.return_value = []
+        storage_manager.get_summaries.return_value = []
 
         # Reload
         window.load_history()
 
         # Table should be empty
-        assert window.history_table.rowCount() == 0
+        assert window.history_model.rowCount() == 0
 
         # Operations should handle empty state gracefully
         qtbot.mouseClick(window.copy_button, Qt.MouseButton.LeftButton)
         qtbot.mouseClick(window.delete_button, Qt.MouseButton.LeftButton)
+
+
+class TestHistoryTableModel:
+    """Test cases for HistoryTableModel."""
+
+    @pytest.fixture
+    def storage_manager(self, tmp_path):
+        """Create a StorageManager with 25 entries."""
+        manager = StorageManager(db_path=str(tmp_path / "history.db"))
+        manager.save_entries(
+            [
+                {"content": f"Entry {i}", "timestamp": datetime(2024, 1, 1, 12, 0, i), "content_type": "text", "hash": f"h{i}"}
+                for i in range(25)
+            ]
+        )
+        return manager
+
+    def test_fetches_pages_on_demand(self, storage_manager):
+        """Test rows are loaded one page at a time until storage runs out."""
+        model = HistoryTableModel(storage_manager, page_size=10)
+        model.reload()
+
+        assert model.rowCount() == 10
+        assert model.canFetchMore(QModelIndex())
+
+        model.fetchMore(QModelIndex())
+        model.fetchMore(QModelIndex())
+
+        assert model.rowCount() == 25
+        assert not model.canFetchMore(QModelIndex())
+        assert [model.index(row, 0).data() for row in range(25)] == [f"Entry {i}" for i in reversed(range(25))]
+
+    def test_changes_update_loaded_rows(self, storage_manager):
+        """Test storage notifications are applied to the loaded rows."""
+        model = HistoryTableModel(storage_manager, page_size=10)
+        model.reload()
+        storage_manager.add_observer(model.apply_change)
+
+        storage_manager.save_entry({"content": "Newest", "timestamp": datetime(2024, 1, 2), "content_type": "url", "hash": "new"})
+        assert model.rowCount() == 11
+        assert model.index(0, 0).data() == "Newest"
+        assert model.index(0, 1).data() == "url"
+
+        storage_manager.delete_entry(model.entry_id(1))
+        storage_manager.delete_entry(model.entry_id(2))
+        assert model.rowCount() == 9
+        assert [model.index(row, 0).data() for row in range(3)] == ["Newest", "Entry 23", "Entry 21"]
+
+        # Paging continues where it left off
+        model.fetchMore(QModelIndex())
+        assert model.rowCount() == 19
+        assert model.index(9, 0).data() == "Entry 14"
+
+        storage_manager.clear_history()
+        assert model.rowCount() == 0
+        assert not model.canFetchMore(QModelIndex())
+
+    def test_encrypted_rows_show_placeholder(self, storage_manager):
+        """Test sensitive entries are listed without their content."""
+        storage_manager.save_entry(
+            {"content": "password: hunter2", "timestamp": datetime(2024, 1, 2), "content_type": "text", "hash": "pw"}
+        )
+        model = HistoryTableModel(storage_manager)
+        model.reload()
+
+        assert model.index(0, 0).data() == "[Encrypted]"
+
+    def test_only_recent_pages_kept(self, storage_manager):
+        """Test display values are kept for a bounded number of pages."""
+        model = HistoryTableModel(storage_manager, page_size=10, cached_pages=1)
+        model.reload()
+        model.fetchMore(QModelIndex())
+        model.fetchMore(QModelIndex())
+        assert model.rowCount() == 25
+        assert len(model._rows) == 10
+
+        with patch.object(storage_manager, "get_summaries_by_id", wraps=storage_manager.get_summaries_by_id) as load:
+            assert [model.index(row, 0).data() for row in range(25)] == [f"Entry {i}" for i in reversed(range(25))]
+            assert model.index(3, 0).data(Qt.ItemDataRole.UserRole) == model.entry_id(3)
+        # One query per page, since each page pushes the previous one out
+        assert load.call_count == 3
+        assert len(model._rows) == 10
+
+    def test_icon_cache_bounded(self, qapp, storage_manager):
+        """Test only the most recently painted thumbnails stay decoded."""
+        model = HistoryTableModel(storage_manager)
+        model.MAX_ICONS = 2
+        model.begin_search()
+        model.append_rows(
+            [{"id": i, "preview": "[Image 1×1]", "content_type": "image", "timestamp": 0, "thumbnail": b"png"} for i in range(4)]
+        )
+
+        for row in range(4):
+            model.index(row, 0).data(Qt.ItemDataRole.DecorationRole)
+        assert list(model._icons) == [2, 3]
+
+        model.index(2, 0).data(Qt.ItemDataRole.DecorationRole)
+        model.index(0, 0).data(Qt.ItemDataRole.DecorationRole)
+        assert list(model._icons) == [2, 0]
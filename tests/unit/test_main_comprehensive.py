@@ -294,7 +294,7 @@ class TestMainModule:
         mock_permission_checker_class.return_value = mock_permission_checker
         mock_permission_checker_class.side_effect = lambda: init_order.append("permission") or mock_permission_checker
 
-        mock_clipboard_class.side_effect = lambda: init_order.append("clipboard") or Mock()
+        mock_clipboard_class.side_effect = lambda **kwargs: init_order.append("clipboard") or Mock()
         mock_keyboard_class.side_effect = lambda: init_order.append("keyboard") or Mock()
         mock_storage_class.side_effect = lambda x: init_order.append("storage") or Mock()
         mock_settings_class.side_effect = lambda: init_order.append("settings") or Mock()
@@ -304,7 +304,9 @@ class TestMainModule:
         main()
 
         # Verify initialization order
-        assert init_order == ["permission", "clipboard", "keyboard", "storage", "settings", "tray"]
+        # Clipboard reloads spilled history content from storage, so storage comes first
+        assert init_order == ["permission", "keyboard", "storage", "clipboard", "settings", "tray"]
+        assert mock_clipboard_class.call_args.kwargs["content_loader"] is not None
 
     def test_main_module_entry_point(self):
         """Test that __main__ module can be executed."""
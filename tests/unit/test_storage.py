@@ -1,15 +1,18 @@
 """Tests for the StorageManager module."""
 
+import io
 import json
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
-from pasta.core.storage import StorageManager
+from pasta.core.clipboard import ClipboardEntry, ClipboardManager
+from pasta.core.storage import StorageManager, WriteBehindQueue
 
 
 class TestStorageManager:
@@ -50,15 +53,20 @@ class TestStorageManager:
         # Check columns
         cursor.execute("PRAGMA table_info(clipboard_history)")
         columns = {row[1] for row in cursor.fetchall()}
-        expected_columns = {"id", "content", "timestamp", "content_type", "encrypted", "hash"}
+        expected_columns = {"id", "blob_id", "timestamp", "content_type", "hash"}
         assert expected_columns.issubset(columns)
 
+        # Content lives in the blobs table
+        cursor.execute("PRAGMA table_info(blobs)")
+        columns = {row[1] for row in cursor.fetchall()}
+        assert {"id", "hash", "content", "encrypted", "refcount"}.issubset(columns)
+
         conn.close()
 
     def test_encryption_key_generation(self, manager):
         """Test encryption key is generated properly."""
         assert manager.cipher is not None
-        assert isinstance(manager.cipher, Fernet)
+        assert isinstance(manager.cipher, MultiFernet)
 
     def test_encryption_key_persistence(self, temp_db):
         """Test encryption key is persisted and loaded correctly."""
@@ -102,7 +110,10 @@ class TestStorageManager:
         # Verify it was encrypted in database
         conn = sqlite3.connect(manager.db_path)
         cursor = conn.cursor()
-        cursor.execute("SELECT content, encrypted FROM clipboard_history WHERE id = ?", (entry_id,))
+        cursor.execute(
+            "SELECT b.content, b.encrypted FROM clipboard_history AS h JOIN blobs AS b ON b.id = h.blob_id WHERE h.id = ?",
+            (entry_id,),
+        )
         row = cursor.fetchone()
         conn.close()
 
@@ -178,6 +189,592 @@ class TestStorageManager:
         assert len(entries) == 5
         assert entries[0]["content"] == "Entry 4"
 
+    def test_get_entries_after_pages_through_history(self, manager):
+        """Test keyset pagination visits every entry once, newest first."""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(25):
+            # Every two entries share a timestamp to exercise the id tie-breaker
+            manager.save_entry(
+                {"content": f"Entry {i}", "timestamp": base + timedelta(seconds=i // 2), "content_type": "text", "hash": f"p{i}"}
+            )
+
+        seen = []
+        cursor = None
+        while True:
+            page = manager.get_entries_after(cursor, limit=10)
+            if not page:
+                break
+            seen.extend(e["content"] for e in page)
+            cursor = manager.page_cursor(page[-1])
+
+        assert seen == [f"Entry {i}" for i in reversed(range(25))]
+        assert [e["content"] for e in manager.iter_entries(page_size=7)] == seen
+
+    def test_get_entries_after_uses_index(self, manager):
+        """Test keyset queries seek the composite index instead of sorting."""
+        with manager._pool.reader() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM clipboard_history WHERE (epoch_us, id) < (?, ?) ORDER BY epoch_us DESC, id DESC LIMIT 10",
+                (0, 0),
+            ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_epoch_id" in details
+        assert "TEMP B-TREE" not in details
+
+    def test_get_summaries(self, manager):
+        """Test summaries carry a preview and metadata but no content."""
+        long_text = "x" * 1000
+        manager.save_entry({"content": long_text, "timestamp": datetime(2024, 1, 1, 12, 0, 0), "content_type": "large_text", "hash": "l"})
+        manager.save_entry(
+            {"content": "password: hunter2", "timestamp": datetime(2024, 1, 1, 12, 0, 1), "content_type": "text", "hash": "p"}
+        )
+
+        with patch.object(manager, "cipher") as mock_cipher:
+            summaries = manager.get_summaries()
+        mock_cipher.decrypt.assert_not_called()
+
+        assert [s["id"] for s in summaries] == [2, 1]
+        secret, text = summaries
+        assert "content" not in text
+        assert text["preview"] == long_text[: manager.PREVIEW_LENGTH]
+        assert text["size"] == 1000
+        assert text["content_type"] == "large_text"
+        assert text["encrypted"] == 0
+        assert secret["encrypted"] == 1
+        assert secret["preview"] == ""
+
+        # Full content is loaded on demand
+        assert manager.get_entry(text["id"])["content"] == long_text
+
+    def test_get_summaries_pages_with_cursor(self, manager):
+        """Test summaries page with the same cursors as entries."""
+        for i in range(5):
+            manager.save_entry(
+                {"content": f"Entry {i}", "timestamp": datetime(2024, 1, 1, 12, 0, i), "content_type": "text", "hash": f"s{i}"}
+            )
+
+        first = manager.get_summaries(limit=3)
+        rest = manager.get_summaries(limit=3, cursor=manager.page_cursor(first[-1]))
+
+        assert [s["preview"] for s in first + rest] == [f"Entry {i}" for i in reversed(range(5))]
+
+    def test_epoch_backfilled_on_migration(self, temp_db):
+        """Test version 1 databases gain a populated epoch column."""
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                content_type TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+        old = datetime(2024, 1, 1, 12, 0, 0)
+        for i, stamp in enumerate([old.isoformat(), (old + timedelta(hours=1)).isoformat(" ")]):
+            conn.execute(
+                "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+                (f"Legacy {i}", stamp, "text", 0, f"l{i}"),
+            )
+        conn.commit()
+        conn.close()
+
+        manager = StorageManager(db_path=str(temp_db))
+        entries = manager.get_entries()
+
+        assert [e["content"] for e in entries] == ["Legacy 1", "Legacy 0"]
+        assert entries[1]["epoch_us"] == round(old.timestamp() * 1_000_000)
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == StorageManager.SCHEMA_VERSION
+
+    def test_failed_migration_rolled_back(self, temp_db):
+        """Test a failed upgrade leaves the database at its old version so it can be retried."""
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                content_type TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+        conn.execute(
+            "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+            ("Legacy", datetime(2024, 1, 1).isoformat(), "text", 0, "l0"),
+        )
+        conn.commit()
+        conn.close()
+
+        with (
+            patch.object(StorageManager, "_migrate_to_v5", side_effect=sqlite3.OperationalError("disk I/O error")),
+            pytest.raises(sqlite3.OperationalError),
+        ):
+            StorageManager(db_path=str(temp_db))
+
+        conn = sqlite3.connect(str(temp_db))
+        assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == 1
+        assert "epoch_us" not in {row[1] for row in conn.execute("PRAGMA table_info(clipboard_history)")}
+        conn.close()
+
+        manager = StorageManager(db_path=str(temp_db))
+
+        assert [e["content"] for e in manager.get_entries()] == ["Legacy"]
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == StorageManager.SCHEMA_VERSION
+
+    def test_repeated_content_stored_once(self, manager):
+        """Test identical payloads share a single blob."""
+        content = "large log line\n" * 1000
+        ids = [
+            manager.save_entry({"content": content, "timestamp": datetime.now(), "content_type": "multiline", "hash": f"dup{i}"})
+            for i in range(5)
+        ]
+
+        with manager._pool.reader() as conn:
+            blobs = conn.execute("SELECT refcount FROM blobs").fetchall()
+
+        assert len(blobs) == 1
+        assert blobs[0]["refcount"] == 5
+        assert all(manager.get_entry(entry_id)["content"] == content for entry_id in ids)
+        assert manager.get_statistics()["unique_contents"] == 1
+
+    def test_repeated_content_skips_detection(self, manager):
+        """Test known content isn't scanned or encrypted again."""
+        entry = {"content": "password: hunter2", "timestamp": datetime.now(), "content_type": "text", "hash": "pw"}
+        manager.save_entry(entry)
+
+        with patch.object(manager._security_manager, "is_sensitive_within") as mock_sensitive:
+            entry_id = manager.save_entry(entry)
+
+        mock_sensitive.assert_not_called()
+        assert manager.get_entry(entry_id)["content"] == "password: hunter2"
+
+    def test_blob_garbage_collection(self, manager):
+        """Test unreferenced blobs are removed."""
+        old_date = datetime.now() - timedelta(days=40)
+        shared = {"content": "shared", "content_type": "text", "hash": "sh"}
+        manager.save_entry({**shared, "timestamp": old_date})
+        manager.save_entry({**shared, "timestamp": datetime.now()})
+        manager.save_entry({"content": "only old", "timestamp": old_date, "content_type": "text", "hash": "old"})
+
+        manager.cleanup_old_entries(days=30)
+
+        with manager._pool.reader() as conn:
+            rows = conn.execute("SELECT content, refcount FROM blobs").fetchall()
+        assert [(r["content"], r["refcount"]) for r in rows] == [("shared", 1)]
+
+        # Deleting the last reference removes the content immediately
+        manager.delete_entry(manager.get_entries()[0]["id"])
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+
+    def test_migration_deduplicates_existing_history(self, temp_db):
+        """Test version 1 databases are moved into blobs."""
+        key = Fernet.generate_key()
+        cipher = Fernet(key)
+        (Path(temp_db).parent / ".pasta_key").write_bytes(key)
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                content_type TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+        rows = [("same", 0), ("same", 0), ("different", 0)]
+        # Fernet tokens differ each time, but both hold the same secret
+        rows += [(cipher.encrypt(b"password: legacy").decode(), 1) for _ in range(2)]
+        for i, (content, encrypted) in enumerate(rows):
+            conn.execute(
+                "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+                (content, datetime(2024, 1, 1, 12, 0, i).isoformat(), "text", encrypted, f"m{i}"),
+            )
+        conn.commit()
+        conn.close()
+
+        manager = StorageManager(db_path=str(temp_db))
+
+        entries = manager.get_entries()
+        assert [e["content"] for e in entries] == ["password: legacy", "password: legacy", "different", "same", "same"]
+        assert [e["id"] for e in entries] == [5, 4, 3, 2, 1]
+        assert manager.get_statistics()["unique_contents"] == 3
+        assert len(manager.search_entries("same")) == 2
+        assert manager.search_entries("legacy") == []
+
+    @pytest.mark.parametrize("codec", ["zlib", "lzma"])
+    def test_large_content_is_compressed(self, temp_db, codec):
+        """Test content above the threshold is stored compressed and read back transparently."""
+        manager = StorageManager(db_path=str(temp_db), compression_codec=codec)
+        log = "\n".join(f"2024-01-01 12:00:{i % 60:02d} INFO worker-{i % 4} processed request {i}" for i in range(500))
+        entry_id = manager.save_entry({"content": log, "timestamp": datetime.now(), "content_type": "large_text", "hash": "log"})
+
+        with manager._pool.reader() as conn:
+            blob = conn.execute("SELECT codec, size, stored_size, typeof(content) AS kind FROM blobs").fetchone()
+        assert blob["codec"] == codec
+        assert blob["kind"] == "blob"
+        assert blob["size"] == len(log.encode())
+        assert blob["stored_size"] < blob["size"] / 4
+
+        assert manager.get_entry(entry_id)["content"] == log
+        assert "codec" not in manager.get_entry(entry_id)
+        assert manager.get_entries()[0]["content"] == log
+
+        # Compressed content stays searchable
+        results = manager.search_entries("processed")
+        assert [r["content"] for r in results] == [log]
+        assert "[processed]" in results[0]["snippet"]
+        manager.fts_enabled = False
+        assert len(manager.search_entries("worker-3")) == 1
+
+        stats = manager.get_statistics()
+        assert stats["compressed_contents"] == 1
+        assert stats["compression_ratio"] > 4
+
+    def test_get_content_by_hash(self, manager):
+        """Test loading content by the clipboard's content hash."""
+        content = "Spilled content " * 1000
+        sensitive = "password: hunter22"
+        for text in (content, sensitive):
+            manager.save_entry({"content": text, "timestamp": datetime.now(), "content_type": "text", "hash": "unused"})
+
+        assert manager.get_content_by_hash(ClipboardManager._content_hash(content)) == content
+        assert manager.get_content_by_hash(ClipboardManager._content_hash(sensitive)) == sensitive
+        assert manager.get_content_by_hash("0" * 32) is None
+
+    def test_save_clipboard_entry(self, manager):
+        """Test saving a ClipboardEntry keeps its timestamp without parsing it."""
+        entry = ClipboardEntry.capture("From the clipboard", "h1", "text")
+        entry_id = manager.save_entry(entry)
+
+        saved = manager.get_entry(entry_id)
+        assert saved["content"] == "From the clipboard"
+        assert saved["timestamp"] == entry.captured_at
+        assert manager.get_summaries()[0]["epoch_us"] == entry.epoch_us
+
+    def test_binary_content(self, manager):
+        """Test images are stored as binary blobs with a thumbnail."""
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (640, 480)).save(buffer, format="PNG")
+        png = buffer.getvalue()
+        entry = ClipboardEntry(png, ClipboardManager._content_hash(png), "image", ClipboardEntry.now_us(), b"thumb")
+        entry_id = manager.save_entry(entry)
+
+        saved = manager.get_entry(entry_id)
+        assert saved["content"] == png
+        assert saved["thumbnail"] == b"thumb"
+        summary = manager.get_summaries()[0]
+        assert summary["preview"] == "[Image 640×480]"
+        assert summary["thumbnail"] == b"thumb"
+        assert manager.get_content_by_hash(entry.content_hash) == png
+        assert manager.search_entries("Image") == []
+
+        with manager._pool.reader() as conn:
+            blob = conn.execute("SELECT codec, encrypted FROM blobs").fetchone()
+        assert (blob["codec"], blob["encrypted"]) == ("binary", 0)
+        assert manager.get_statistics()["compressed_contents"] == 0
+
+    def test_export_import_binary_content(self, manager, tmp_path):
+        """Test binary content survives a JSON round trip."""
+        manager.save_entry(ClipboardEntry(b"\x00\x01raw", "h", "image", ClipboardEntry.now_us(), b"\xfft"))
+
+        other = StorageManager(db_path=str(tmp_path / "other.db"))
+        assert other.import_from_json(manager.export_to_json()) == 1
+        entry = other.get_entries()[0]
+        assert entry["content"] == b"\x00\x01raw"
+        assert entry["thumbnail"] == b"\xfft"
+
+    def test_content_prepared_outside_write_lock(self, manager):
+        """Test detection and encryption run before the write lock is taken."""
+        held = []
+
+        def try_lock():
+            acquired = manager._lock.acquire(timeout=1)
+            held.append(not acquired)
+            if acquired:
+                manager._lock.release()
+
+        def check(*args):
+            # Another thread can only take the lock if nobody holds it
+            probe = threading.Thread(target=try_lock)
+            probe.start()
+            probe.join()
+            return True
+
+        entries = [{"content": f"password: {i}", "timestamp": datetime.now(), "content_type": "text", "hash": str(i)} for i in range(4)]
+        with patch.object(manager._security_manager, "is_sensitive_within", side_effect=check):
+            ids = manager.save_entries(entries)
+            manager.save_entry({"content": "password: 9", "timestamp": datetime.now(), "content_type": "text", "hash": "9"})
+
+        assert held == [False] * 5
+        assert [manager.get_entry(entry_id)["content"] for entry_id in ids] == [f"password: {i}" for i in range(4)]
+        assert manager.get_entry(ids[0])["encrypted"] == 1
+
+    def test_malformed_entry_in_batch(self, manager):
+        """Test a malformed entry fails alone when prepared on the pool."""
+        entries = [
+            {"content": "first", "timestamp": datetime.now(), "content_type": "text", "hash": "1"},
+            {"timestamp": datetime.now(), "content_type": "text", "hash": "2"},
+            {"content": "third", "timestamp": datetime.now(), "content_type": "text", "hash": "3"},
+        ]
+        ids = manager.save_entries(entries)
+        assert ids[1] is None
+        assert [manager.get_entry(ids[i])["content"] for i in (0, 2)] == ["first", "third"]
+
+    def over_budget_manager(self, temp_db, policy):
+        """Create a manager that scans at most 16 characters per save."""
+        manager = StorageManager(db_path=str(temp_db), scan_size_budget=16, over_budget_policy=policy)
+        manager._security_manager.detector.CHUNK_SIZE = 16
+        manager._security_manager.detector.CHUNK_OVERLAP = 8
+        return manager
+
+    def test_over_budget_content_encrypted(self, temp_db):
+        """Test content not scanned within budget is encrypted."""
+        manager = self.over_budget_manager(temp_db, "encrypt")
+        content = "meeting notes " * 10
+        entry_id = manager.save_entry({"content": content, "timestamp": datetime.now(), "content_type": "text", "hash": "n"})
+
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT encrypted FROM blobs").fetchone()[0] == 1
+        assert manager.get_entry(entry_id)["content"] == content
+        assert manager._rescan_executor is None
+        assert manager._security_manager.detector.get_metrics()["over_budget"] == 1
+
+    def test_over_budget_rescan_submitted_after_commit(self, temp_db):
+        """Test the rescan is only handed off once the stored blob is visible to readers."""
+        manager = self.over_budget_manager(temp_db, "background")
+        # Run rescans as soon as they are submitted
+        manager._rescan_executor = Mock(submit=lambda fn, *args: fn(*args))
+        content = "meeting notes " * 10
+
+        manager.save_entry({"content": content, "timestamp": datetime.now(), "content_type": "text", "hash": "n"})
+
+        with manager._pool.reader() as conn:
+            assert tuple(conn.execute("SELECT encrypted, preview FROM blobs").fetchone()) == (0, content)
+
+    def test_over_budget_content_rescanned_in_background(self, temp_db):
+        """Test content scanned later is decrypted if nothing sensitive turns up."""
+        manager = self.over_budget_manager(temp_db, "background")
+        clean = "meeting notes " * 10
+        secret = "meeting notes " * 10 + "password: hunter2"
+        for text in (clean, secret):
+            manager.save_entry({"content": text, "timestamp": datetime.now(), "content_type": "text", "hash": "n"})
+        manager._rescan_executor.submit(lambda: None).result(timeout=5)
+
+        with manager._pool.reader() as conn:
+            rows = conn.execute("SELECT encrypted, preview FROM blobs ORDER BY id").fetchall()
+        assert [(row["encrypted"], row["preview"]) for row in rows] == [(0, clean), (1, "")]
+        assert [entry["content"] for entry in manager.search_entries("meeting")] == [clean]
+
+    def test_unknown_over_budget_policy(self, temp_db):
+        """Test an unknown over-budget policy is rejected."""
+        with pytest.raises(ValueError, match="ignore"):
+            StorageManager(db_path=str(temp_db), over_budget_policy="ignore")
+
+    def save_secrets(self, manager, count):
+        """Save entries that get encrypted."""
+        secrets = [f"password: secret{i}" for i in range(count)]
+        ids = [manager.save_entry({"content": text, "timestamp": datetime.now(), "content_type": "text", "hash": text}) for text in secrets]
+        return dict(zip(ids, secrets, strict=True))
+
+    def test_key_rotation_in_batches(self, manager, temp_db):
+        """Test rotation re-encrypts every blob and keeps only the new key."""
+        manager.ROTATION_BATCH_SIZE = 2
+        secrets = self.save_secrets(manager, 5)
+        key_file = Path(temp_db).parent / ".pasta_key"
+        old_key = key_file.read_bytes()
+
+        assert manager.rotate_encryption_key() == 5
+
+        new_key = key_file.read_bytes()
+        assert new_key != old_key and len(new_key.split()) == 1
+        old_cipher = Fernet(old_key)
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM key_rotation").fetchone()[0] == 0
+            for row in conn.execute("SELECT content FROM blobs"):
+                Fernet(new_key).decrypt(row["content"].encode())
+                with pytest.raises(InvalidToken):
+                    old_cipher.decrypt(row["content"].encode())
+        assert {entry_id: manager.get_entry(entry_id)["content"] for entry_id in secrets} == secrets
+
+    def test_interrupted_key_rotation_resumes(self, manager, temp_db):
+        """Test content stays readable mid-rotation and rotation picks up where it stopped."""
+        manager.ROTATION_BATCH_SIZE = 2
+        secrets = self.save_secrets(manager, 5)
+        rotate = MultiFernet.rotate
+        calls = []
+
+        def fail_after_two_batches(cipher, token):
+            calls.append(token)
+            if len(calls) > 4:
+                raise RuntimeError("interrupted")
+            return rotate(cipher, token)
+
+        with patch.object(MultiFernet, "rotate", fail_after_two_batches), pytest.raises(RuntimeError):
+            manager.rotate_encryption_key()
+
+        key_file = Path(temp_db).parent / ".pasta_key"
+        assert len(key_file.read_bytes().split()) == 2
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT last_blob_id FROM key_rotation").fetchone()[0] == sorted(secrets)[3]
+
+        # A fresh instance reads content under either key
+        reopened = StorageManager(db_path=str(temp_db))
+        assert {entry_id: reopened.get_entry(entry_id)["content"] for entry_id in secrets} == secrets
+
+        assert reopened.rotate_encryption_key() == 1
+        assert len(key_file.read_bytes().split()) == 1
+        assert {entry_id: reopened.get_entry(entry_id)["content"] for entry_id in secrets} == secrets
+
+    def test_content_encrypted_before_rotation(self, manager):
+        """Test content encrypted with the old key but stored after rotation stays readable."""
+        prepared = manager._prepare_blob("password: in flight")
+        manager.rotate_encryption_key()
+
+        with manager._lock, manager._get_connection() as conn:
+            manager._store_blob(conn, prepared)
+        assert manager.get_content_by_hash(prepared.hash) == "password: in flight"
+
+    def test_decrypted_content_cached(self, manager):
+        """Test repeated reads of encrypted content decrypt it once."""
+        entry_id = manager.save_entry({"content": "password: hunter2", "timestamp": datetime.now(), "content_type": "text", "hash": "pw"})
+
+        with patch.object(manager.cipher, "decrypt", wraps=manager.cipher.decrypt) as decrypt:
+            for _ in range(3):
+                assert manager.get_entry(entry_id)["content"] == "password: hunter2"
+            assert manager.get_content_by_hash(ClipboardManager._content_hash("password: hunter2")) == "password: hunter2"
+        assert decrypt.call_count == 1
+
+    def test_decrypted_cache_invalidated(self, manager):
+        """Test rotation, deletion and clearing wipe the decrypted cache."""
+        entry_id = manager.save_entry({"content": "password: hunter2", "timestamp": datetime.now(), "content_type": "text", "hash": "pw"})
+        manager.get_entry(entry_id)
+        assert len(manager._decrypted) == 1
+
+        manager.rotate_encryption_key()
+        assert len(manager._decrypted) == 0
+        assert manager.get_entry(entry_id)["content"] == "password: hunter2"
+
+        manager.clear_history()
+        assert len(manager._decrypted) == 0
+
+    def test_delete_evicts_only_deleted_content(self, manager):
+        """Test deleting an entry drops just its decrypted content from the cache."""
+        kept = manager.save_entry({"content": "password: kept", "timestamp": datetime.now(), "content_type": "text", "hash": "k"})
+        gone = manager.save_entry({"content": "password: gone", "timestamp": datetime.now(), "content_type": "text", "hash": "g"})
+        manager.get_entry(kept)
+        manager.get_entry(gone)
+        stored = list(manager._decrypted._entries.values())[1][0]
+
+        assert manager.delete_entry(gone)
+        assert len(manager._decrypted) == 1
+        assert stored == bytearray(len(stored))
+        with patch.object(manager.cipher, "decrypt", wraps=manager.cipher.decrypt) as decrypt:
+            assert manager.get_entry(kept)["content"] == "password: kept"
+        decrypt.assert_not_called()
+
+    def test_decrypted_cache_disabled(self, temp_db):
+        """Test a zero-sized cache decrypts on every read."""
+        manager = StorageManager(db_path=str(temp_db), decrypted_cache_bytes=0)
+        entry_id = manager.save_entry({"content": "password: hunter2", "timestamp": datetime.now(), "content_type": "text", "hash": "pw"})
+        with patch.object(manager.cipher, "decrypt", wraps=manager.cipher.decrypt) as decrypt:
+            manager.get_entry(entry_id)
+            manager.get_entry(entry_id)
+        assert decrypt.call_count == 2
+
+    def test_small_content_is_not_compressed(self, temp_db):
+        """Test small or incompressible content is stored as-is."""
+        manager = StorageManager(db_path=str(temp_db), compression_threshold=16)
+        manager.save_entry({"content": "short", "timestamp": datetime.now(), "content_type": "text", "hash": "s"})
+        # Above the threshold, but zlib can't make it any smaller
+        manager.save_entry({"content": "qwertyuiopasdfghjk", "timestamp": datetime.now(), "content_type": "text", "hash": "q"})
+
+        with manager._pool.reader() as conn:
+            rows = conn.execute("SELECT content, codec FROM blobs ORDER BY id").fetchall()
+        assert [(r["content"], r["codec"]) for r in rows] == [("short", "none"), ("qwertyuiopasdfghjk", "none")]
+        assert manager.get_statistics()["compression_ratio"] == 1.0
+
+    def test_compression_disabled(self, temp_db):
+        """Test no content is compressed without a codec."""
+        manager = StorageManager(db_path=str(temp_db), compression_codec=None)
+        manager.save_entry({"content": "a" * 10000, "timestamp": datetime.now(), "content_type": "large_text", "hash": "a"})
+
+        with manager._pool.reader() as conn:
+            assert conn.execute("SELECT codec FROM blobs").fetchone()[0] == "none"
+
+    def test_unknown_compression_codec(self, temp_db):
+        """Test an unknown codec is rejected."""
+        with pytest.raises(ValueError, match="brotli"):
+            StorageManager(db_path=str(temp_db), compression_codec="brotli")
+
+    def test_compressed_sensitive_content(self, manager):
+        """Test large sensitive content is compressed before it is encrypted."""
+        content = "password: hunter2\n" * 1000
+        entry_id = manager.save_entry({"content": content, "timestamp": datetime.now(), "content_type": "large_text", "hash": "pw"})
+
+        with manager._pool.reader() as conn:
+            blob = conn.execute("SELECT encrypted, codec, stored_size, size FROM blobs").fetchone()
+        assert blob["encrypted"] == 1
+        assert blob["codec"] == "zlib"
+        assert blob["stored_size"] < blob["size"]
+
+        manager.rotate_encryption_key()
+        assert manager.get_entry(entry_id)["content"] == content
+        assert manager.search_entries("hunter2") == []
+
+    def test_migration_compresses_existing_content(self, temp_db):
+        """Test large content saved by older versions is compressed on upgrade."""
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                content_type TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        dump = json.dumps([{"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(300)])
+        for i, content in enumerate([dump, "small"]):
+            conn.execute(
+                "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+                (content, datetime(2024, 1, 1, 12, 0, i).isoformat(), "text", 0, f"m{i}"),
+            )
+        conn.commit()
+        conn.close()
+
+        manager = StorageManager(db_path=str(temp_db))
+
+        with manager._pool.reader() as conn:
+            rows = conn.execute("SELECT codec FROM blobs ORDER BY id").fetchall()
+        assert [r["codec"] for r in rows] == ["zlib", "none"]
+        assert [s["preview"] for s in manager.get_summaries()] == ["small", dump[: manager.PREVIEW_LENGTH]]
+        assert [e["content"] for e in manager.get_entries()] == ["small", dump]
+        assert len(manager.search_entries("item")) == 1
+
     def test_delete_entry(self, manager):
         """Test deleting an entry."""
         entry = {
@@ -263,6 +860,131 @@ class TestStorageManager:
         results = manager.search_entries("python123")
         assert len(results) == 0
 
+    def test_search_prefix_and_phrase(self, manager):
+        """Test prefix and phrase queries against the full-text index."""
+        for i, content in enumerate(["hello world program", "world hello", "helicopter view"]):
+            manager.save_entry({"content": content, "timestamp": datetime.now(), "content_type": "text", "hash": f"s{i}"})
+
+        assert manager.fts_enabled
+        assert {r["content"] for r in manager.search_entries("hel")} == {"hello world program", "world hello", "helicopter view"}
+        assert [r["content"] for r in manager.search_entries('"hello world"')] == ["hello world program"]
+        assert manager.search_entries("   ") == []
+
+    def test_search_ranking_and_snippet(self, manager):
+        """Test results are ranked by relevance and carry highlighted snippets."""
+        manager.save_entry(
+            {"content": "python once among many other words here", "timestamp": datetime.now(), "content_type": "text", "hash": "r1"}
+        )
+        manager.save_entry({"content": "python python python", "timestamp": datetime.now(), "content_type": "text", "hash": "r2"})
+
+        results = manager.search_entries("python", markers=("<b>", "</b>"))
+
+        assert results[0]["content"] == "python python python"
+        assert "<b>python</b>" in results[0]["snippet"]
+        assert len(manager.search_entries("python", limit=1)) == 1
+
+    def test_search_index_follows_deletes(self, manager):
+        """Test deleted entries disappear from the full-text index."""
+        entry_id = manager.save_entry({"content": "ephemeral text", "timestamp": datetime.now(), "content_type": "text", "hash": "d1"})
+        assert len(manager.search_entries("ephemeral")) == 1
+
+        manager.delete_entry(entry_id)
+        assert manager.search_entries("ephemeral") == []
+
+        manager.save_entry({"content": "ephemeral again", "timestamp": datetime.now(), "content_type": "text", "hash": "d2"})
+        manager.clear_history()
+        assert manager.search_entries("ephemeral") == []
+
+    def test_iter_search_summaries(self, manager):
+        """Test searches stream summaries and cover content past the preview."""
+        filler = "lorem ipsum " * 500
+        for i in range(5):
+            manager.save_entry(
+                {"content": f"{filler} needle{i}", "timestamp": datetime(2024, 1, 1, 12, 0, i), "content_type": "text", "hash": f"n{i}"}
+            )
+        manager.save_entry({"content": "password: needle", "timestamp": datetime.now(), "content_type": "text", "hash": "pw"})
+
+        with patch.object(manager, "cipher") as mock_cipher:
+            batches = list(manager.iter_search_summaries("NEEDLE", batch_size=2))
+        mock_cipher.decrypt.assert_not_called()
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        results = [s for batch in batches for s in batch]
+        assert sorted(s["id"] for s in results) == [1, 2, 3, 4, 5]
+        assert "content" not in results[0]
+        assert results[0]["preview"].startswith("lorem ipsum")
+
+        assert list(manager.iter_search_summaries("   ")) == []
+
+        manager.fts_enabled = False
+        assert [s["id"] for batch in manager.iter_search_summaries("needle3") for s in batch] == [4]
+
+    @pytest.mark.parametrize("fts", [True, False])
+    def test_iter_search_summaries_releases_connection(self, tmp_path, monkeypatch, fts):
+        """Test no connection is held while a batch is being consumed."""
+        monkeypatch.chdir(tmp_path)
+        manager = StorageManager(":memory:")
+        manager.fts_enabled = manager.fts_enabled and fts
+        for i in range(5):
+            manager.save_entry(
+                {"content": f"needle {i}", "timestamp": datetime(2024, 1, 1, 12, 0, i), "content_type": "text", "hash": f"n{i}"}
+            )
+
+        batches = manager.iter_search_summaries("needle", batch_size=2)
+        first = next(batches)
+
+        # An in-memory database reads through the writer, so a held reader would block this
+        writer = threading.Thread(
+            target=manager.save_entry,
+            args=({"content": "other", "timestamp": datetime.now(), "content_type": "text", "hash": "o"},),
+        )
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+
+        assert [len(batch) for batch in [first, *batches]] == [2, 2, 1]
+        manager.close()
+
+    def test_search_like_fallback(self, manager):
+        """Test substring search is used when FTS5 is unavailable."""
+        manager.save_entry({"content": "JavaScript function", "timestamp": datetime.now(), "content_type": "text", "hash": "js1"})
+        manager.fts_enabled = False
+
+        results = manager.search_entries("Script")
+
+        assert len(results) == 1
+        assert "snippet" not in results[0]
+
+    def test_search_index_built_for_existing_database(self, temp_db):
+        """Test history saved before the index existed becomes searchable."""
+        conn = sqlite3.connect(str(temp_db))
+        conn.execute(
+            """
+            CREATE TABLE clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                content_type TEXT NOT NULL,
+                encrypted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+            ("legacy entry", datetime.now().isoformat(), "text", 0, "l1"),
+        )
+        conn.execute(
+            "INSERT INTO clipboard_history (content, timestamp, content_type, encrypted, hash) VALUES (?, ?, ?, ?, ?)",
+            ("legacy secret", datetime.now().isoformat(), "text", 1, "l2"),
+        )
+        conn.commit()
+        conn.close()
+
+        manager = StorageManager(db_path=str(temp_db))
+
+        assert [r["content"] for r in manager.search_entries("legacy")] == ["legacy entry"]
+
     def test_data_retention_cleanup(self, manager):
         """Test automatic cleanup of old entries."""
         # Save old and new entries
@@ -318,6 +1040,7 @@ class TestStorageManager:
         assert stats["entries_by_type"]["text"] == 3
         assert stats["entries_by_type"]["url"] == 2
         assert "database_size" in stats
+        assert stats["compression_ratio"] == 1.0
 
     def test_export_entries(self, manager):
         """Test exporting entries to JSON."""
@@ -441,3 +1164,224 @@ class TestStorageManager:
         assert expected_indexes.issubset(indexes)
 
         conn.close()
+
+    def test_save_entries_single_transaction(self, manager):
+        """Test batch saves return IDs and skip invalid entries."""
+        entries = [
+            {"content": "Batch 1", "timestamp": datetime.now(), "content_type": "text", "hash": "b1"},
+            {"content": "Missing fields"},
+            {"content": "Batch 2", "timestamp": datetime.now(), "content_type": "text", "hash": "b2"},
+        ]
+
+        statements = []
+        manager._pool.writer.set_trace_callback(statements.append)
+        ids = manager.save_entries(entries)
+        manager._pool.writer.set_trace_callback(None)
+
+        assert statements.count("COMMIT") == 1
+        assert ids[0] is not None
+        assert ids[1] is None
+        assert ids[2] is not None
+        assert [e["content"] for e in manager.get_entries()] == ["Batch 2", "Batch 1"]
+
+    def test_observers_notified_of_changes(self, manager):
+        """Test observers receive inserts, deletes and clears after commit."""
+        events = []
+        manager.add_observer(lambda event, payload: events.append((event, payload)))
+
+        entry_id = manager.save_entry({"content": "one", "timestamp": datetime.now(), "content_type": "text", "hash": "1"})
+        manager.save_entries(
+            [
+                {"content": "two", "timestamp": datetime(2024, 1, 1, 12, 0, 0), "content_type": "text", "hash": "2"},
+                {"bad": "entry"},
+                {"content": "three", "timestamp": datetime(2024, 1, 1, 12, 0, 1), "content_type": "url", "hash": "3"},
+            ]
+        )
+
+        assert events[0][0] == "inserted"
+        assert [s["id"] for s in events[0][1]] == [entry_id]
+        assert events[1][0] == "inserted"
+        assert [s["preview"] for s in events[1][1]] == ["three", "two"]
+        assert events[1][1][0]["content_type"] == "url"
+
+        events.clear()
+        manager.delete_entry(entry_id)
+        manager.delete_entry(9999)
+        assert events == [("deleted", [entry_id])]
+
+        events.clear()
+        manager.cleanup_old_entries(days=30)
+        assert events[0][0] == "deleted"
+        assert sorted(events[0][1]) == [2, 3]
+
+        events.clear()
+        manager.clear_history()
+        assert events == [("cleared", [])]
+
+    def test_observer_errors_are_contained(self, manager):
+        """Test a failing observer doesn't break saving or other observers."""
+        seen = []
+        failing = Mock(side_effect=RuntimeError("boom"))
+        manager.add_observer(failing)
+        manager.add_observer(lambda event, payload: seen.append(event))
+
+        assert manager.save_entry({"content": "x", "timestamp": datetime.now(), "content_type": "text", "hash": "x"}) is not None
+        assert seen == ["inserted"]
+
+        manager.remove_observer(failing)
+        manager.clear_history()
+        assert failing.call_count == 1
+
+    def test_wal_journal_mode(self, manager, temp_db):
+        """Test database is switched to WAL journaling."""
+        conn = sqlite3.connect(str(temp_db))
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+        assert mode == "wal"
+
+    def test_connections_are_reused(self, manager):
+        """Test writer and reader connections are long-lived."""
+        writer = manager._get_connection()
+        with manager._pool.reader() as first:
+            pass
+
+        manager.save_entry({"content": "Reuse", "timestamp": datetime.now(), "content_type": "text", "hash": "r1"})
+        manager.get_entries()
+
+        assert manager._get_connection() is writer
+        with manager._pool.reader() as second:
+            assert second is first
+
+    def test_reads_do_not_block_on_writer(self, manager):
+        """Test readers are served while the writer lock is held."""
+        import threading
+
+        manager.save_entry({"content": "Visible", "timestamp": datetime.now(), "content_type": "text", "hash": "v1"})
+
+        results = []
+        with manager._lock:
+            reader = threading.Thread(target=lambda: results.append(manager.get_entries()))
+            reader.start()
+            reader.join(timeout=2.0)
+            assert not reader.is_alive()
+
+        assert results[0][0]["content"] == "Visible"
+
+    def test_close(self, manager):
+        """Test close releases all pooled connections."""
+        with manager._pool.reader():
+            pass
+        manager.close()
+
+        assert manager._pool.closed
+        with pytest.raises(sqlite3.ProgrammingError):
+            manager.get_entries()
+
+    def test_in_memory_database(self, tmp_path, monkeypatch):
+        """Test in-memory databases share the writer connection for reads."""
+        monkeypatch.chdir(tmp_path)
+        manager = StorageManager(":memory:")
+        entry_id = manager.save_entry({"content": "password: Memory", "timestamp": datetime.now(), "content_type": "text", "hash": "m1"})
+
+        assert manager.get_entry(entry_id)["content"] == "password: Memory"
+        assert manager.rotate_encryption_key() == 1
+        assert manager.get_entry(entry_id)["content"] == "password: Memory"
+        manager.close()
+
+        # The key of a database that can't outlive the process stays in memory
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestWriteBehindQueue:
+    """Test cases for WriteBehindQueue."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a StorageManager instance for testing."""
+        manager = StorageManager(db_path=str(tmp_path / "test_pasta.db"))
+        yield manager
+        manager.close()
+
+    @staticmethod
+    def make_entry(index):
+        """Create a clipboard entry."""
+        return {"content": f"Queued {index}", "timestamp": datetime.now(), "content_type": "text", "hash": f"q{index}"}
+
+    def test_flush_writes_pending_entries(self, manager):
+        """Test submitted entries are persisted on flush."""
+        writer = WriteBehindQueue(manager, flush_interval=10.0)
+
+        for i in range(3):
+            assert writer.submit(self.make_entry(i))
+        assert writer.flush()
+
+        assert len(manager.get_entries()) == 3
+        assert writer.stats["written"] == 3
+        writer.stop()
+
+    def test_burst_is_written_in_one_batch(self, manager):
+        """Test a burst of entries costs a single transaction."""
+        writer = WriteBehindQueue(manager, flush_interval=10.0)
+
+        with patch.object(manager, "save_entries", wraps=manager.save_entries) as mock_save:
+            for i in range(20):
+                writer.submit(self.make_entry(i))
+            writer.flush()
+
+        assert mock_save.call_count == 1
+        assert len(mock_save.call_args[0][0]) == 20
+        writer.stop()
+
+    def test_batch_size_limit(self, manager):
+        """Test batches never exceed batch_size."""
+        writer = WriteBehindQueue(manager, batch_size=5, flush_interval=10.0)
+
+        with patch.object(manager, "save_entries", wraps=manager.save_entries) as mock_save:
+            for i in range(12):
+                writer.submit(self.make_entry(i))
+            writer.flush()
+
+        assert all(len(call.args[0]) <= 5 for call in mock_save.call_args_list)
+        assert writer.stats["written"] == 12
+        writer.stop()
+
+    def test_backpressure_drops_when_full(self, manager):
+        """Test submit gives up instead of blocking when the queue is full."""
+        import threading
+
+        release = threading.Event()
+        writer = WriteBehindQueue(manager, max_pending=2, batch_size=1, put_timeout=0.01)
+
+        with patch.object(manager, "save_entries", side_effect=lambda entries: release.wait(5) and [1]):
+            results = [writer.submit(self.make_entry(i)) for i in range(6)]
+            release.set()
+            writer.flush()
+
+        assert results.count(False) > 0
+        assert writer.stats["dropped"] == results.count(False)
+        writer.stop()
+
+    def test_stop_flushes_pending_entries(self, manager):
+        """Test stop writes everything still queued."""
+        writer = WriteBehindQueue(manager, flush_interval=10.0)
+        writer.submit(self.make_entry(0))
+
+        writer.stop()
+
+        assert len(manager.get_entries()) == 1
+
+    def test_storage_errors_do_not_kill_writer(self, manager):
+        """Test the writer survives a failing batch."""
+        writer = WriteBehindQueue(manager)
+
+        with patch.object(manager, "save_entries", side_effect=Exception("boom")):
+            writer.submit(self.make_entry(0))
+            assert writer.flush()
+
+        writer.submit(self.make_entry(1))
+        assert writer.flush()
+
+        assert writer.stats["failed"] == 1
+        assert [e["content"] for e in manager.get_entries()] == ["Queued 1"]
+        writer.stop()
@@ -197,9 +197,10 @@ class TestSystemTray:
         # Clipboard changes should save to storage, not trigger paste
         tray.enabled = True
         tray._on_clipboard_change(entry)
+        assert tray._history_writer.flush()
 
         # Should save to storage
-        mock_components["storage_manager"].save_entry.assert_called_with(entry)
+        mock_components["storage_manager"].save_entries.assert_called_with([entry])
 
         # Should NOT paste automatically
         mock_components["keyboard_engine"].paste_text.assert_not_called()
@@ -208,9 +209,10 @@ class TestSystemTray:
         tray.enabled = False
         mock_components["storage_manager"].reset_mock()
         tray._on_clipboard_change(entry)
+        assert tray._history_writer.flush()
 
         # Should still save to storage even when disabled
-        mock_components["storage_manager"].save_entry.assert_called_with(entry)
+        mock_components["storage_manager"].save_entries.assert_called_with([entry])
 
     def test_on_emergency_stop(self, tray, mock_components):
         """Test emergency stop functionality."""
@@ -267,6 +269,9 @@ class TestSystemTray:
         # Should unregister hotkeys
         tray.hotkey_manager.unregister_hotkeys.assert_called()
 
+        # Should close database connections
+        mock_components["storage_manager"].close.assert_called()
+
         # Should hide tray icon
         tray.tray_icon.hide.assert_called()
 
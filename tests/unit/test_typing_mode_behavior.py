@@ -60,9 +60,10 @@ class TestTypingModeBehavior:
 
         # Trigger clipboard change
         tray._on_clipboard_change(test_entry)
+        assert tray._history_writer.flush()
 
         # Should save to storage
-        mock_components["storage_manager"].save_entry.assert_called_once_with(test_entry)
+        mock_components["storage_manager"].save_entries.assert_called_once_with([test_entry])
 
         # Should NOT trigger automatic paste
         mock_components["keyboard_engine"].paste_text.assert_not_called()
@@ -80,9 +81,10 @@ class TestTypingModeBehavior:
 
         # Trigger clipboard change
         tray._on_clipboard_change(test_entry)
+        assert tray._history_writer.flush()
 
         # Should save to storage
-        mock_components["storage_manager"].save_entry.assert_called_once_with(test_entry)
+        mock_components["storage_manager"].save_entries.assert_called_once_with([test_entry])
 
         # Should NOT trigger automatic paste
         mock_components["keyboard_engine"].paste_text.assert_not_called()
@@ -100,9 +102,10 @@ class TestTypingModeBehavior:
 
         # Trigger clipboard change
         tray._on_clipboard_change(test_entry)
+        assert tray._history_writer.flush()
 
         # Should save to storage
-        mock_components["storage_manager"].save_entry.assert_called_once_with(test_entry)
+        mock_components["storage_manager"].save_entries.assert_called_once_with([test_entry])
 
         # Should NOT trigger paste in auto mode
         mock_components["keyboard_engine"].paste_text.assert_not_called()
@@ -120,9 +123,10 @@ class TestTypingModeBehavior:
 
         # Trigger clipboard change
         tray._on_clipboard_change(test_entry)
+        assert tray._history_writer.flush()
 
         # Should still save to storage
-        mock_components["storage_manager"].save_entry.assert_called_once_with(test_entry)
+        mock_components["storage_manager"].save_entries.assert_called_once_with([test_entry])
 
         # Should NOT trigger paste when disabled
         mock_components["keyboard_engine"].paste_text.assert_not_called()
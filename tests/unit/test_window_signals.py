@@ -48,7 +48,7 @@ class TestWindowSignals(unittest.TestCase):
     def test_history_window_has_closed_signal(self):
         """Test that HistoryWindow has a 'closed' signal."""
         storage_manager = MagicMock(spec=StorageManager)
-        storage_manager.get_history.return_value = []
+        storage_manager.get_summaries.return_value = []
 
         window = HistoryWindow(storage_manager)
 
@@ -91,7 +91,7 @@ class TestWindowSignals(unittest.TestCase):
     def test_history_window_emits_closed_signal(self):
         """Test that HistoryWindow emits 'closed' signal when closed."""
         storage_manager = MagicMock(spec=StorageManager)
-        storage_manager.get_history.return_value = []
+        storage_manager.get_summaries.return_value = []
 
         # Mock DockIconManager to prevent AppKit import
         from unittest.mock import patch
@@ -122,7 +122,7 @@ class TestWindowSignals(unittest.TestCase):
         settings_manager = MagicMock(spec=SettingsManager)
         settings_manager.settings = Settings()
         storage_manager = MagicMock(spec=StorageManager)
-        storage_manager.get_history.return_value = []
+        storage_manager.get_summaries.return_value = []
 
         # Mock DockIconManager
         from unittest.mock import patch